@@ -1,5 +1,9 @@
 # this version will be overwritten by poetry-dynamic-versioning
 __version__ = "0.0.0"
 
+from .adjustment import PriceAdjuster, adjust_prices
 from .client import Client
 from .enums import MARKET_API_SECTIONS
+from .panel import PricePanel
+from .pit import align_statements
+from .universe import ListedUniverse
@@ -0,0 +1,177 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+VOLUME_COLUMNS = ["Volume"]
+ADJUSTMENT_METHODS = ("backward", "forward")
+
+
+def _check_how(how: str) -> None:
+    if how not in ADJUSTMENT_METHODS:
+        raise ValueError(f"how must be one of {ADJUSTMENT_METHODS}: {how}")
+
+
+def _apply_multiplier(
+    df: pd.DataFrame,
+    multiplier: np.ndarray,
+    price_columns: Sequence[str],
+    volume_columns: Sequence[str],
+) -> pd.DataFrame:
+    ret = df[["Date", "Code"]].copy()
+    for col in price_columns:
+        ret[col] = df[col].to_numpy(dtype=float) * multiplier
+    for col in volume_columns:
+        ret[col] = df[col].to_numpy(dtype=float) / multiplier
+    return ret
+
+
+def _sorted_factors(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.sort_values(["Code", "Date"], kind="mergesort")
+    factor = pd.to_numeric(df["AdjustmentFactor"], errors="coerce").fillna(1.0)
+    return df.assign(AdjustmentFactor=factor.to_numpy(dtype=float))
+
+
+def adjust_prices(
+    df: pd.DataFrame,
+    how: str = "backward",
+    price_columns: Sequence[str] = PRICE_COLUMNS,
+    volume_columns: Sequence[str] = VOLUME_COLUMNS,
+) -> pd.DataFrame:
+    """
+    日足 (get_prices_daily_quotes / get_price_range の結果) から調整済み四本値を計算する
+
+    AdjustmentFactor を Code ごとに逆順の累積積で掛け合わせて乗数を求めるため、
+    銘柄ごとの Python ループは発生しない。
+
+    Args:
+        df: Date, Code, AdjustmentFactor と調整対象列を含む DataFrame
+        how: "backward" (最新の株数基準に過去を調整) or
+             "forward" (最初の株数基準に以降を調整)
+        price_columns: 価格として乗数を掛ける列
+        volume_columns: 出来高として乗数で割る列
+
+    Returns:
+        pd.DataFrame: Date, Code と調整済みの各列 (Code, Date列でソートされています)
+    """
+    _check_how(how)
+    df = _sorted_factors(df)
+    factor = df["AdjustmentFactor"]
+    code = df["Code"]
+    if how == "backward":
+        # 当日より後の調整係数の積 = 逆順累積積を1行ずらしたもの
+        rev = factor.iloc[::-1].groupby(code.iloc[::-1], sort=False).cumprod()
+        multiplier = (
+            rev.groupby(code.iloc[::-1], sort=False)
+            .shift(1)
+            .fillna(1.0)
+            .iloc[::-1]
+            .to_numpy()
+        )
+    else:
+        multiplier = 1.0 / factor.groupby(code, sort=False).cumprod().to_numpy()
+    return _apply_multiplier(df, multiplier, price_columns, volume_columns)
+
+
+class PriceAdjuster:
+    """
+    日足を追記しながら調整済み四本値を計算する
+
+    各行に当該銘柄の AdjustmentFactor の累積積を保持しておき、
+    新しい日付を追記するときは銘柄ごとの直近の累積積から続きを計算する。
+    過去分の累積積は再計算しないため、日次更新のコストは追記行数に比例する。
+    """
+
+    def __init__(
+        self,
+        df: Optional[pd.DataFrame] = None,
+        price_columns: Sequence[str] = PRICE_COLUMNS,
+        volume_columns: Sequence[str] = VOLUME_COLUMNS,
+    ) -> None:
+        """
+        Args:
+            df: 初期データ (Optional)
+            price_columns: 価格として乗数を掛ける列
+            volume_columns: 出来高として乗数で割る列
+        """
+        self.price_columns = list(price_columns)
+        self.volume_columns = list(volume_columns)
+        self._chunks: List[pd.DataFrame] = []
+        self._frame: Optional[pd.DataFrame] = None
+        self._last_cum = pd.Series(dtype=float)
+        self._last_date = pd.Series(dtype="datetime64[ns]")
+        if df is not None:
+            self.append(df)
+
+    def append(self, df: pd.DataFrame) -> None:
+        """
+        日足を追記する
+
+        Args:
+            df: Date, Code, AdjustmentFactor と調整対象列を含む DataFrame
+                (銘柄ごとに既存データより後の日付のみ)
+        """
+        if len(df) == 0:
+            return
+        cols = ["Date", "Code", "AdjustmentFactor"]
+        cols += self.price_columns + self.volume_columns
+        df = _sorted_factors(df[cols])
+        code = df["Code"]
+
+        last_date = self._last_date.reindex(code.unique())
+        first_date = df.groupby("Code", sort=False)["Date"].min()
+        overlap = first_date[last_date.notna() & (first_date <= last_date)]
+        if len(overlap) > 0:
+            raise ValueError(
+                f"dates must be newer than existing data: {list(overlap.index[:5])}"
+            )
+
+        base = self._last_cum.reindex(code).fillna(1.0).to_numpy()
+        cum = df["AdjustmentFactor"].groupby(code, sort=False).cumprod().to_numpy()
+        df = df.assign(CumulativeFactor=cum * base)
+
+        last = df.groupby("Code", sort=False).last()
+        self._last_cum = last["CumulativeFactor"].combine_first(self._last_cum)
+        self._last_date = last["Date"].combine_first(self._last_date)
+        self._chunks.append(df)
+        self._frame = None
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """
+        追記済みの日足 (CumulativeFactor 列付き)
+        """
+        if self._frame is None:
+            if len(self._chunks) == 0:
+                return pd.DataFrame(
+                    columns=["Date", "Code", "AdjustmentFactor"]
+                    + self.price_columns
+                    + self.volume_columns
+                    + ["CumulativeFactor"]
+                )
+            self._frame = pd.concat(self._chunks, ignore_index=True)
+            self._chunks = [self._frame]
+        return self._frame
+
+    def adjusted(self, how: str = "backward") -> pd.DataFrame:
+        """
+        調整済み四本値を取得
+
+        Args:
+            how: "backward" (最新の株数基準に過去を調整) or
+                 "forward" (最初の株数基準に以降を調整)
+
+        Returns:
+            pd.DataFrame: Date, Code と調整済みの各列 (Code, Date列でソートされています)
+        """
+        _check_how(how)
+        df = self.data
+        cum = df["CumulativeFactor"].to_numpy(dtype=float)
+        if how == "backward":
+            total = self._last_cum.reindex(df["Code"]).to_numpy(dtype=float)
+            multiplier = total / cum
+        else:
+            multiplier = 1.0 / cum
+        ret = _apply_multiplier(df, multiplier, self.price_columns, self.volume_columns)
+        return ret.sort_values(["Code", "Date"], kind="mergesort", ignore_index=True)
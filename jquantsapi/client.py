@@ -2,24 +2,51 @@ import json
 import os
 import platform
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Any, List, Mapping, Optional, Union
+from types import TracebackType
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 import pandas as pd  # type: ignore
 import requests
 from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
 from tenacity import (
+    RetryCallState,
     retry,
     retry_if_exception_type,
     stop_after_attempt,
-    wait_exponential,
+    wait_random_exponential,
 )
-from urllib3.util import Retry
-
-from jquantsapi import __version__, constants, enums
+from tenacity.stop import stop_base
+
+from jquantsapi import __version__, constants, enums, utils
+from jquantsapi.concurrency import (
+    AdaptiveConcurrencyLimiter,
+    ConcurrencyLimiter,
+    PriorityExecutor,
+    RequestCoalescer,
+    current_priority,
+    priority,
+    run_with_priority,
+)
+from jquantsapi.ratelimit import HostRateLimiter
+from jquantsapi.resilience import BudgetedRetry, CircuitBreakerRegistry, RetryBudget
 
 if sys.version_info >= (3, 11):
     import tomllib
@@ -30,6 +57,69 @@ else:
 DatetimeLike = Union[datetime, pd.Timestamp, str]
 _Data = Union[str, Mapping[str, Any]]
 
+_PAGINATION_KEY = '"pagination_key"'
+# 混雑 (同時実行数を減らすべき状況) を示すステータスコード
+_CONGESTION_STATUS = frozenset([429, 500, 502, 503, 504])
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _pagination_key(text: str) -> str:
+    """
+    raw API returns 全体をデコードせずに pagination_key を取り出す
+
+    pagination_key はレスポンスの最上位にのみ存在するため、末尾から検索して
+    値の部分だけをデコードする。
+
+    Args:
+        text: raw API returns
+    Returns:
+        str: pagination_key (存在しない場合は空文字)
+    """
+    pos = text.rfind(_PAGINATION_KEY)
+    if pos < 0:
+        return ""
+    pos = text.index(":", pos + len(_PAGINATION_KEY)) + 1
+    while text[pos] in " \t\r\n":
+        pos += 1
+    value, _ = _JSON_DECODER.raw_decode(text, pos)
+    return value
+
+
+def _is_congested(ret: requests.Response) -> bool:
+    """
+    レスポンス、もしくは urllib3 によるリトライの履歴に 429/5xx が含まれるか
+    """
+    if ret.status_code in _CONGESTION_STATUS:
+        return True
+    retries = getattr(ret.raw, "retries", None)
+    history = getattr(retries, "history", None) or ()
+    return any(h.status in _CONGESTION_STATUS for h in history)
+
+
+class _StopIfRetryBudgetExhausted(stop_base):
+    """
+    tenacity の stop 条件: Client の RetryBudget を使い切った場合はリトライしない
+    """
+
+    def __call__(self, retry_state: RetryCallState) -> bool:
+        return not retry_state.args[0].retry_budget.withdraw()
+
+
+def _load_pages(pages: List[str], key: str) -> list:
+    """
+    ページごとの raw API returns をデコードしてデータを連結する
+
+    Args:
+        pages: raw API returns (ページ順)
+        key: データが格納されているキー
+    Returns:
+        list: 連結したデータ
+    """
+    data: list = []
+    for page in pages:
+        data += json.loads(page)[key]
+    return data
+
 
 class TokenAuthRefreshBadRequestException(Exception):
     pass
@@ -53,12 +143,37 @@ class Client:
         *,
         mail_address: Optional[str] = None,
         password: Optional[str] = None,
+        decode_processes: int = 0,
+        max_workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        adaptive_concurrency: bool = False,
+        min_workers: int = 1,
+        retry_budget: Optional[RetryBudget] = None,
+        circuit_breakers: Optional[CircuitBreakerRegistry] = None,
+        coalesce_requests: bool = True,
+        rate_limiter: Optional[HostRateLimiter] = None,
     ) -> None:
         """
         Args:
             refresh_token: J-Quants API refresh token
             mail_address: J-Quants API login email address
             password: J-Quants API login password
+            decode_processes: range 系メソッドで JSON のデコードと DataFrame への変換を
+                行うプロセス数 (0 の場合は通信と同じスレッドで変換する)
+            max_workers: 全メソッドで共有する同時リクエスト数の上限
+                (省略時は MAX_WORKERS)
+            executor: range 系メソッドで共有する executor (省略時は max_workers の
+                スレッド数の PriorityExecutor を初回利用時に作成する)
+            adaptive_concurrency: True の場合、同時リクエスト数を応答時間と 429/5xx に
+                応じて [min_workers, max_workers] の範囲で自動調整する (AIMD)
+            min_workers: adaptive_concurrency 時の同時リクエスト数の下限
+            retry_budget: urllib3、get_id_token、DataPersister のリトライで共有する
+                リトライ予算 (省略時は作成する。複数の Client で共有することも可能)
+            circuit_breakers: エンドポイントごとのサーキットブレーカー (省略時は作成する)
+            coalesce_requests: True の場合、同じ URL・パラメーター (pagination_key を含む)
+                で実行中の GET リクエストがあれば、新たに送信せずにそのデコード済みの
+                レスポンス本文を共有する
+            rate_limiter: 同じホストの全プロセスで共有するレート制限 (Optional)
         """
         config = self._load_config()
 
@@ -83,7 +198,35 @@ class Client:
 
         self._id_token = ""
         self._id_token_expire = pd.Timestamp.utcnow()
+        # 複数スレッドから同時に期限切れを検知してもトークンの更新は1回にする
+        self._token_lock = threading.RLock()
         self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+        self._decode_processes = decode_processes
+        self._decode_executor: Optional[ProcessPoolExecutor] = None
+        self.max_workers = self.MAX_WORKERS if max_workers is None else max_workers
+        self._limiter: ConcurrencyLimiter
+        if adaptive_concurrency:
+            self._limiter = AdaptiveConcurrencyLimiter(
+                min_limit=min_workers,
+                max_limit=self.max_workers,
+                initial=min(self.MAX_WORKERS, self.max_workers),
+            )
+        else:
+            self._limiter = ConcurrencyLimiter(self.max_workers)
+        self._executor = executor
+        self._owns_executor = executor is None
+        self.retry_budget = RetryBudget() if retry_budget is None else retry_budget
+        if circuit_breakers is None:
+            circuit_breakers = CircuitBreakerRegistry()
+        self.circuit_breakers = circuit_breakers
+        self._coalescer: Optional[RequestCoalescer] = None
+        if coalesce_requests:
+            self._coalescer = RequestCoalescer()
+        self.rate_limiter = rate_limiter
+        # エンドポイントごとの送信済みリクエスト数 (request_stats 参照)
+        self._request_stats: Dict[str, Dict[str, float]] = {}
+        self._request_stats_lock = threading.Lock()
 
         if ((self._mail_address == "") or (self._password == "")) and (
             self._refresh_token == ""
@@ -194,20 +337,24 @@ class Client:
         if allowed_methods is None:
             allowed_methods = ["HEAD", "GET", "OPTIONS", "POST"]
 
-        if self._session is None:
-            retry_strategy = Retry(
-                total=3,
-                status_forcelist=status_forcelist,
-                allowed_methods=allowed_methods,
-            )
-            adapter = HTTPAdapter(
-                # 安全のため並列スレッド数に更に10追加しておく
-                pool_connections=self.MAX_WORKERS + 10,
-                pool_maxsize=self.MAX_WORKERS + 10,
-                max_retries=retry_strategy,
-            )
-            self._session = requests.Session()
-            self._session.mount("https://", adapter)
+        with self._session_lock:
+            if self._session is None:
+                retry_strategy = BudgetedRetry(
+                    total=3,
+                    status_forcelist=status_forcelist,
+                    allowed_methods=allowed_methods,
+                    backoff_factor=0.5,
+                    budget=self.retry_budget,
+                )
+                adapter = HTTPAdapter(
+                    # 安全のため並列スレッド数に更に10追加しておく
+                    pool_connections=self.max_workers + 10,
+                    pool_maxsize=self.max_workers + 10,
+                    max_retries=retry_strategy,
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                self._session = session
 
         return self._session
 
@@ -228,13 +375,99 @@ class Client:
         s = self._request_session()
 
         headers = self._base_headers()
-        ret = s.get(url, params=params, headers=headers, timeout=30)
+        # エンドポイントが遮断中の場合は、実行枠を確保せずに CircuitOpenError で失敗する
+        endpoint = url.replace(self.JQUANTS_API_BASE, "")
+        breaker = self.circuit_breakers.get(endpoint)
+        breaker.before_call()
+        # 実行枠やレート制限の待機中に例外が発生した場合は half-open の枠を解放する
+        recorded = False
+        try:
+            with self._limiter:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire()
+                self.retry_budget.deposit()
+                start = time.monotonic()
+                try:
+                    ret = s.get(url, params=params, headers=headers, timeout=30)
+                except requests.exceptions.RequestException:
+                    breaker.record_failure()
+                    recorded = True
+                    self._limiter.record(time.monotonic() - start, congested=True)
+                    self._record_request(endpoint, params, time.monotonic() - start)
+                    raise
+                self._limiter.record(time.monotonic() - start, _is_congested(ret))
+                self._record_request(endpoint, params, time.monotonic() - start)
+            if ret.status_code in _CONGESTION_STATUS:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            recorded = True
+        finally:
+            if not recorded:
+                breaker.release()
         if ret.status_code == 400:
             msg = f"{ret.status_code} for url: {ret.url} body: {ret.text}"
             raise HTTPError(msg, response=ret)
         ret.raise_for_status()
         return ret
 
+    def _get_text(self, url: str, params: Optional[dict] = None) -> str:
+        """
+        GET リクエストを送信してレスポンスの本文 (raw API returns) を取得
+
+        同じ URL・パラメーター (pagination_key を含む) で実行中のリクエストがあれば、
+        新たに送信せずにそのデコード済みの本文を共有する
+
+        Args:
+            url: アクセスするURL
+            params: パラメーター
+
+        Returns:
+            str: raw API returns
+        """
+        if self._coalescer is None:
+            return self._read_text(url, params)
+        key = (url, tuple(sorted((params or {}).items())))
+        return self._coalescer.call(key, self._read_text, url, params)
+
+    def _read_text(self, url: str, params: Optional[dict] = None) -> str:
+        """
+        GET リクエストを送信して本文をデコードする (_get_text 参照)
+        """
+        ret = self._get(url, params)
+        ret.encoding = self.RAW_ENCODING
+        return ret.text
+
+    def _record_request(
+        self, endpoint: str, params: Optional[dict], elapsed: float
+    ) -> None:
+        """
+        送信したリクエストをエンドポイントごとに集計する
+        """
+        first_page = "pagination_key" not in (params or {})
+        with self._request_stats_lock:
+            stats = self._request_stats.setdefault(
+                endpoint, {"calls": 0, "pages": 0, "seconds": 0.0}
+            )
+            stats["calls"] += int(first_page)
+            stats["pages"] += 1
+            stats["seconds"] += elapsed
+
+    def request_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        エンドポイントごとの送信済みリクエストの集計
+
+        共有中のリクエストやサーキットブレーカーで遮断したリクエストは含まない。
+
+        Returns:
+            Dict[str, Dict[str, float]]: {エンドポイント: {"calls": 1ページ目の
+                リクエスト数, "pages": 全ページのリクエスト数, "seconds": 応答時間の合計}}
+        """
+        with self._request_stats_lock:
+            return {
+                endpoint: dict(stats) for endpoint, stats in self._request_stats.items()
+            }
+
     def _post(
         self,
         url: str,
@@ -267,6 +500,153 @@ class Client:
         ret.raise_for_status()
         return ret
 
+    def _get_pages(self, raw: Callable[..., str], **params: Any) -> List[str]:
+        """
+        pagination_key を辿って全ページの raw API returns を取得
+
+        Args:
+            raw: _get_xxx_raw メソッド
+            params: raw に渡すパラメーター
+
+        Returns:
+            List[str]: raw API returns (ページ順)
+        """
+        pages = [raw(**params)]
+        pagination_key = _pagination_key(pages[-1])
+        while pagination_key != "":
+            pages.append(raw(pagination_key=pagination_key, **params))
+            pagination_key = _pagination_key(pages[-1])
+        return pages
+
+    def _get_decode_executor(self) -> ProcessPoolExecutor:
+        """
+        raw API returns の変換に使うプロセスプールを取得
+        """
+        if self._decode_executor is None:
+            self._decode_executor = ProcessPoolExecutor(
+                max_workers=self._decode_processes
+            )
+        return self._decode_executor
+
+    @property
+    def concurrency(self) -> int:
+        """
+        現在の同時リクエスト数の上限
+        """
+        return self._limiter.limit
+
+    @staticmethod
+    def priority(name: str) -> ContextManager[None]:
+        """
+        ブロック内で発行するリクエストの優先度を設定する (スレッドごと)
+
+        混雑時は "interactive" > "normal" > "bulk" の順に重み付きで実行枠を割り当てる。
+        未指定の場合、range 系メソッドは "bulk"、それ以外は "normal" として扱う。
+
+        例:
+            with cli.priority("interactive"):
+                cli.get_prices_daily_quotes(code="7203")
+
+        Args:
+            name: "interactive", "normal" or "bulk"
+        """
+        return priority(name)
+
+    def _get_executor(self) -> Executor:
+        """
+        range 系メソッドで共有する executor を取得
+        """
+        if self._executor is None:
+            self._executor = PriorityExecutor(
+                max_workers=self.max_workers, thread_name_prefix="jquantsapi"
+            )
+        return self._executor
+
+    def close(self) -> None:
+        """
+        executor、プロセスプールと requests の session を解放する
+
+        コンストラクタで渡された executor は停止しない。
+        """
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._decode_executor is not None:
+            self._decode_executor.shutdown()
+            self._decode_executor = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def _iter_range(
+        self,
+        getter: Callable[..., pd.DataFrame],
+        raw: Callable[..., str],
+        decode: Callable[[List[str]], pd.DataFrame],
+        params_list: List[Dict[str, str]],
+    ) -> Iterator[Tuple[Dict[str, str], pd.DataFrame]]:
+        """
+        range 系メソッドの共通処理
+
+        decode_processes が 0 の場合は getter をスレッドで並列に呼び出す。
+        1 以上の場合、スレッドは通信 (raw API returns の取得) だけを行い、
+        JSON のデコードと DataFrame への変換は取得が完了したものから順に
+        プロセスプールで行う。変換が GIL を奪い合わないため、コア数に応じて
+        スループットが伸びる。
+
+        Args:
+            getter: get_xxx メソッド
+            raw: _get_xxx_raw メソッド
+            decode: _decode_xxx メソッド (pickle 可能であること)
+            params_list: 呼び出しごとのパラメーター
+
+        Yields:
+            Tuple[Dict[str, str], pd.DataFrame]: パラメーターと結果 (完了順)
+        """
+        executor = self._get_executor()
+        # 優先度の指定がなければ range 系メソッドは bulk として扱う
+        # (run_with_priority は渡された executor にも優先度を引き継ぐため)
+        prio = current_priority(default="bulk")
+
+        def submit(fn: Callable[..., Any], **params: Any) -> Future:
+            with priority(prio):
+                return executor.submit(run_with_priority, prio, fn, **params)
+
+        if self._decode_processes <= 0:
+            futures = {submit(getter, **p): p for p in params_list}
+            try:
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+            finally:
+                # executor は共有しているため、中断時は未実行分を取り消す
+                for future in futures:
+                    future.cancel()
+            return
+
+        decode_executor = self._get_decode_executor()
+        fetches = {submit(self._get_pages, raw=raw, **p): p for p in params_list}
+        decodes = {}
+        try:
+            for future in as_completed(fetches):
+                pages = future.result()
+                decodes[decode_executor.submit(decode, pages)] = fetches[future]
+            for future in as_completed(decodes):
+                yield decodes[future], future.result()
+        finally:
+            for future in list(fetches) + list(decodes):
+                future.cancel()
+
     # /token
     def get_refresh_token(
         self, mail_address: Optional[str] = None, password: Optional[str] = None
@@ -280,6 +660,12 @@ class Client:
         Returns:
             refresh_token: J-Quants API refresh token
         """
+        with self._token_lock:
+            return self._get_refresh_token(mail_address, password)
+
+    def _get_refresh_token(
+        self, mail_address: Optional[str] = None, password: Optional[str] = None
+    ) -> str:
         if self._refresh_token_expire > pd.Timestamp.utcnow():
             return self._refresh_token
 
@@ -306,8 +692,8 @@ class Client:
 
     @retry(
         retry=retry_if_exception_type(TokenAuthRefreshBadRequestException),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=5, max=300),
+        stop=stop_after_attempt(3) | _StopIfRetryBudgetExhausted(),
+        wait=wait_random_exponential(multiplier=1, min=5, max=300),
     )
     def get_id_token(self, refresh_token: Optional[str] = None) -> str:
         """
@@ -318,6 +704,13 @@ class Client:
         Returns:
             id_token: J-Quants API id token
         """
+        if self._id_token_expire > pd.Timestamp.utcnow():
+            return self._id_token
+        with self._token_lock:
+            return self._get_id_token(refresh_token)
+
+    def _get_id_token(self, refresh_token: Optional[str] = None) -> str:
+        # ロック待ちの間に他のスレッドが更新している場合はそれを使う
         if self._id_token_expire > pd.Timestamp.utcnow():
             return self._id_token
 
@@ -378,9 +771,7 @@ class Client:
             params["date"] = date_yyyymmdd
         if pagination_key != "":
             params["pagination_key"] = pagination_key
-        ret = self._get(url, params)
-        ret.encoding = self.RAW_ENCODING
-        return ret.text
+        return self._get_text(url, params)
 
     def get_listed_info(self, code: str = "", date_yyyymmdd: str = "") -> pd.DataFrame:
         """
@@ -413,7 +804,7 @@ class Client:
             cols = constants.LISTED_INFO_COLUMNS
         if len(df) == 0:
             return pd.DataFrame([], columns=cols)
-        df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
+        utils.to_datetime_columns(df, ["Date"])
         df.sort_values("Code", inplace=True)
         return df[cols]
 
@@ -528,9 +919,7 @@ class Client:
                 params["to"] = to_yyyymmdd
         if pagination_key != "":
             params["pagination_key"] = pagination_key
-        ret = self._get(url, params)
-        ret.encoding = self.RAW_ENCODING
-        return ret.text
+        return self._get_text(url, params)
 
     def get_prices_daily_quotes(
         self,
@@ -551,24 +940,27 @@ class Client:
         Returns:
             pd.DataFrame: 株価情報 (Code, Date列でソートされています)
         """
-        j = self._get_prices_daily_quotes_raw(
+        pages = self._get_pages(
+            self._get_prices_daily_quotes_raw,
             code=code,
             from_yyyymmdd=from_yyyymmdd,
             to_yyyymmdd=to_yyyymmdd,
             date_yyyymmdd=date_yyyymmdd,
         )
-        d = json.loads(j)
-        data = d["daily_quotes"]
-        while "pagination_key" in d:
-            j = self._get_prices_daily_quotes_raw(
-                code=code,
-                from_yyyymmdd=from_yyyymmdd,
-                to_yyyymmdd=to_yyyymmdd,
-                date_yyyymmdd=date_yyyymmdd,
-                pagination_key=d["pagination_key"],
-            )
-            d = json.loads(j)
-            data += d["daily_quotes"]
+        return self._decode_prices_daily_quotes(pages)
+
+    @staticmethod
+    def _decode_prices_daily_quotes(pages: List[str]) -> pd.DataFrame:
+        """
+        get_prices_daily_quotes の raw API returns を DataFrame に変換
+
+        Args:
+            pages: raw API returns (ページ順)
+
+        Returns:
+            pd.DataFrame: 株価情報 (Code, Date列でソートされています)
+        """
+        data = _load_pages(pages, "daily_quotes")
         df = pd.DataFrame.from_dict(data)
         premium_flag = "MorningClose" in df.columns
         if premium_flag:
@@ -577,7 +969,7 @@ class Client:
             cols = constants.PRICES_DAILY_QUOTES_COLUMNS
         if len(df) == 0:
             return pd.DataFrame([], columns=cols)
-        df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
+        utils.to_datetime_columns(df, ["Date"])
         df.sort_values(["Code", "Date"], inplace=True)
         return df[cols]
 
@@ -598,18 +990,17 @@ class Client:
         """
         # pre-load id_token
         self.get_id_token()
-        buff = []
         dates = pd.date_range(start_dt, end_dt, freq="D")
-        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
-            futures = [
-                executor.submit(
-                    self.get_prices_daily_quotes, date_yyyymmdd=s.strftime("%Y-%m-%d")
-                )
-                for s in dates
-            ]
-            for future in as_completed(futures):
-                df = future.result()
-                buff.append(df)
+        params_list = [dict(date_yyyymmdd=s.strftime("%Y-%m-%d")) for s in dates]
+        buff = [
+            df
+            for _, df in self._iter_range(
+                self.get_prices_daily_quotes,
+                self._get_prices_daily_quotes_raw,
+                self._decode_prices_daily_quotes,
+                params_list,
+            )
+        ]
         return pd.concat(buff).sort_values(["Code", "Date"])
 
     def _get_prices_prices_am_raw(
@@ -635,9 +1026,7 @@ class Client:
         }
         if pagination_key != "":
             params["pagination_key"] = pagination_key
-        ret = self._get(url, params)
-        ret.encoding = self.RAW_ENCODING
-        return ret.text
+        return self._get_text(url, params)
 
     def get_prices_prices_am(
         self,
@@ -670,7 +1059,7 @@ class Client:
         cols = constants.PRICES_PRICES_AM_COLUMNS
         if len(df) == 0:
             return pd.DataFrame([], columns=cols)
-        df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
+        utils.to_datetime_columns(df, ["Date"])
         df.sort_values(["Code"], inplace=True)
         return df[cols]
 
@@ -704,9 +1093,7 @@ class Client:
             params["to"] = to_yyyymmdd
         if pagination_key != "":
             params["pagination_key"] = pagination_key
-        ret = self._get(url, params)
-        ret.encoding = self.RAW_ENCODING
-        return ret.text
+        return self._get_text(url, params)
 
     def get_markets_trades_spec(
         self,
@@ -742,9 +1129,7 @@ class Client:
         cols = constants.MARKETS_TRADES_SPEC
         if len(df) == 0:
             return pd.DataFrame([], columns=cols)
-        df["PublishedDate"] = pd.to_datetime(df["PublishedDate"], format="%Y-%m-%d")
-        df["StartDate"] = pd.to_datetime(df["StartDate"], format="%Y-%m-%d")
-        df["EndDate"] = pd.to_datetime(df["EndDate"], format="%Y-%m-%d")
+        utils.to_datetime_columns(df, constants.MARKETS_TRADES_SPEC_DATE_COLUMNS)
         df.sort_values(["PublishedDate", "Section"], inplace=True)
         return df[cols]
 
@@ -783,9 +1168,7 @@ class Client:
                 params["to"] = to_yyyymmdd
         if pagination_key != "":
             params["pagination_key"] = pagination_key
-        ret = self._get(url, params)
-        ret.encoding = self.RAW_ENCODING
-        return ret.text
+        return self._get_text(url, params)
 
     def get_markets_weekly_margin_interest(
         self,
@@ -807,29 +1190,32 @@ class Client:
         Returns:
             pd.DataFrame: weekly margin interest (Sorted by "Date" and "Code" columns)
         """
-        j = self._get_markets_weekly_margin_interest_raw(
+        pages = self._get_pages(
+            self._get_markets_weekly_margin_interest_raw,
             code=code,
             from_yyyymmdd=from_yyyymmdd,
             to_yyyymmdd=to_yyyymmdd,
             date_yyyymmdd=date_yyyymmdd,
         )
-        d = json.loads(j)
-        data = d["weekly_margin_interest"]
-        while "pagination_key" in d:
-            j = self._get_markets_weekly_margin_interest_raw(
-                code=code,
-                from_yyyymmdd=from_yyyymmdd,
-                to_yyyymmdd=to_yyyymmdd,
-                date_yyyymmdd=date_yyyymmdd,
-                pagination_key=d["pagination_key"],
-            )
-            d = json.loads(j)
-            data += d["weekly_margin_interest"]
+        return self._decode_markets_weekly_margin_interest(pages)
+
+    @staticmethod
+    def _decode_markets_weekly_margin_interest(pages: List[str]) -> pd.DataFrame:
+        """
+        get_markets_weekly_margin_interest の raw API returns を DataFrame に変換
+
+        Args:
+            pages: raw API returns (ページ順)
+
+        Returns:
+            pd.DataFrame: weekly margin interest (Sorted by "Date" and "Code" columns)
+        """
+        data = _load_pages(pages, "weekly_margin_interest")
         df = pd.DataFrame.from_dict(data)
         cols = constants.MARKETS_WEEKLY_MARGIN_INTEREST
         if len(df) == 0:
             return pd.DataFrame([], columns=cols)
-        df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
+        utils.to_datetime_columns(df, ["Date"])
         df.sort_values(["Date", "Code"], inplace=True)
         return df[cols]
 
@@ -850,19 +1236,17 @@ class Client:
         """
         # pre-load id_token
         self.get_id_token()
-        buff = []
         dates = pd.date_range(start_dt, end_dt, freq="D")
-        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
-            futures = [
-                executor.submit(
-                    self.get_markets_weekly_margin_interest,
-                    date_yyyymmdd=s.strftime("%Y-%m-%d"),
-                )
-                for s in dates
-            ]
-            for future in as_completed(futures):
-                df = future.result()
-                buff.append(df)
+        params_list = [dict(date_yyyymmdd=s.strftime("%Y-%m-%d")) for s in dates]
+        buff = [
+            df
+            for _, df in self._iter_range(
+                self.get_markets_weekly_margin_interest,
+                self._get_markets_weekly_margin_interest_raw,
+                self._decode_markets_weekly_margin_interest,
+                params_list,
+            )
+        ]
         return pd.concat(buff).sort_values(["Code", "Date"])
 
     def _get_markets_short_selling_raw(
@@ -898,9 +1282,7 @@ class Client:
                 params["to"] = to_yyyymmdd
         if pagination_key != "":
             params["pagination_key"] = date_yyyymmdd
-        ret = self._get(url, params)
-        ret.encoding = self.RAW_ENCODING
-        return ret.text
+        return self._get_text(url, params)
 
     def get_markets_short_selling(
         self,
@@ -921,30 +1303,33 @@ class Client:
             pd.DataFrame:
                 daily short sale ratios and trading value by industry (Sorted by "Date" and "Sector33Code" columns)
         """
-        j = self._get_markets_short_selling_raw(
+        pages = self._get_pages(
+            self._get_markets_short_selling_raw,
             sector_33_code=sector_33_code,
             from_yyyymmdd=from_yyyymmdd,
             to_yyyymmdd=to_yyyymmdd,
             date_yyyymmdd=date_yyyymmdd,
         )
+        return self._decode_markets_short_selling(pages)
 
-        d = json.loads(j)
-        data = d["short_selling"]
-        while "pagination_key" in d:
-            j = self._get_markets_short_selling_raw(
-                sector_33_code=sector_33_code,
-                from_yyyymmdd=from_yyyymmdd,
-                to_yyyymmdd=to_yyyymmdd,
-                date_yyyymmdd=date_yyyymmdd,
-                pagination_key=d["pagination_key"],
-            )
-            d = json.loads(j)
-            data += d["short_selling"]
+    @staticmethod
+    def _decode_markets_short_selling(pages: List[str]) -> pd.DataFrame:
+        """
+        get_markets_short_selling の raw API returns を DataFrame に変換
+
+        Args:
+            pages: raw API returns (ページ順)
+
+        Returns:
+            pd.DataFrame:
+                daily short sale ratios and trading value by industry (Sorted by "Date" and "Sector33Code" columns)
+        """
+        data = _load_pages(pages, "short_selling")
         df = pd.DataFrame.from_dict(data)
         cols = constants.MARKET_SHORT_SELLING_COLUMNS
         if len(df) == 0:
             return pd.DataFrame([], columns=cols)
-        df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
+        utils.to_datetime_columns(df, ["Date"])
         df.sort_values(["Date", "Sector33Code"], inplace=True)
         return df[cols]
 
@@ -965,18 +1350,17 @@ class Client:
         """
         # pre-load id_token
         self.get_id_token()
-        buff = []
         dates = pd.date_range(start_dt, end_dt, freq="D")
-        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
-            futures = [
-                executor.submit(
-                    self.get_markets_short_selling, date_yyyymmdd=s.strftime("%Y-%m-%d")
-                )
-                for s in dates
-            ]
-            for future in as_completed(futures):
-                df = future.result()
-                buff.append(df)
+        params_list = [dict(date_yyyymmdd=s.strftime("%Y-%m-%d")) for s in dates]
+        buff = [
+            df
+            for _, df in self._iter_range(
+                self.get_markets_short_selling,
+                self._get_markets_short_selling_raw,
+                self._decode_markets_short_selling,
+                params_list,
+            )
+        ]
         return pd.concat(buff).sort_values(["Sector33Code", "Date"])
 
     def _get_markets_breakdown_raw(
@@ -1014,9 +1398,7 @@ class Client:
                 params["to"] = to_yyyymmdd
         if pagination_key != "":
             params["pagination_key"] = pagination_key
-        ret = self._get(url, params)
-        ret.encoding = self.RAW_ENCODING
-        return ret.text
+        return self._get_text(url, params)
 
     def get_markets_breakdown(
         self,
@@ -1038,29 +1420,32 @@ class Client:
         Returns:
             pd.DataFrame: detail breakdown trading data (Sorted by "Code")
         """
-        j = self._get_markets_breakdown_raw(
+        pages = self._get_pages(
+            self._get_markets_breakdown_raw,
             code=code,
             from_yyyymmdd=from_yyyymmdd,
             to_yyyymmdd=to_yyyymmdd,
             date_yyyymmdd=date_yyyymmdd,
         )
-        d = json.loads(j)
-        data = d["breakdown"]
-        while "pagination_key" in d:
-            j = self._get_markets_breakdown_raw(
-                code=code,
-                from_yyyymmdd=from_yyyymmdd,
-                to_yyyymmdd=to_yyyymmdd,
-                date_yyyymmdd=date_yyyymmdd,
-                pagination_key=d["pagination_key"],
-            )
-            d = json.loads(j)
-            data += d["breakdown"]
+        return self._decode_markets_breakdown(pages)
+
+    @staticmethod
+    def _decode_markets_breakdown(pages: List[str]) -> pd.DataFrame:
+        """
+        get_markets_breakdown の raw API returns を DataFrame に変換
+
+        Args:
+            pages: raw API returns (ページ順)
+
+        Returns:
+            pd.DataFrame: detail breakdown trading data (Sorted by "Code")
+        """
+        data = _load_pages(pages, "breakdown")
         df = pd.DataFrame.from_dict(data)
         cols = constants.MARKETS_BREAKDOWN_COLUMNS
         if len(df) == 0:
             return pd.DataFrame([], columns=cols)
-        df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
+        utils.to_datetime_columns(df, ["Date"])
         df.sort_values(["Code"], inplace=True)
         return df[cols]
 
@@ -1081,18 +1466,17 @@ class Client:
         """
         # pre-load id_token
         self.get_id_token()
-        buff = []
         dates = pd.date_range(start_dt, end_dt, freq="D")
-        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
-            futures = [
-                executor.submit(
-                    self.get_markets_breakdown, date_yyyymmdd=s.strftime("%Y-%m-%d")
-                )
-                for s in dates
-            ]
-            for future in as_completed(futures):
-                df = future.result()
-                buff.append(df)
+        params_list = [dict(date_yyyymmdd=s.strftime("%Y-%m-%d")) for s in dates]
+        buff = [
+            df
+            for _, df in self._iter_range(
+                self.get_markets_breakdown,
+                self._get_markets_breakdown_raw,
+                self._decode_markets_breakdown,
+                params_list,
+            )
+        ]
         return pd.concat(buff).sort_values(["Code", "Date"])
 
     # /indices
@@ -1130,9 +1514,7 @@ class Client:
                 params["to"] = to_yyyymmdd
         if pagination_key != "":
             params["pagination_key"] = pagination_key
-        ret = self._get(url, params)
-        ret.encoding = self.RAW_ENCODING
-        return ret.text
+        return self._get_text(url, params)
 
     def get_indices(
         self,
@@ -1174,7 +1556,7 @@ class Client:
         cols = constants.INDICES_COLUMNS
         if len(df) == 0:
             return pd.DataFrame([], columns=cols)
-        df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
+        utils.to_datetime_columns(df, ["Date"])
         df.sort_values(["Code", "Date"], inplace=True)
         return df[cols]
 
@@ -1202,9 +1584,7 @@ class Client:
             params["to"] = to_yyyymmdd
         if pagination_key != "":
             params["pagination_key"] = pagination_key
-        ret = self._get(url, params)
-        ret.encoding = self.RAW_ENCODING
-        return ret.text
+        return self._get_text(url, params)
 
     def get_indices_topix(
         self,
@@ -1237,7 +1617,7 @@ class Client:
         cols = constants.INDICES_TOPIX_COLUMNS
         if len(df) == 0:
             return pd.DataFrame([], columns=cols)
-        df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
+        utils.to_datetime_columns(df, ["Date"])
         df.sort_values(["Date"], inplace=True)
         return df[cols]
 
@@ -1263,10 +1643,7 @@ class Client:
         }
         if pagination_key != "":
             params["pagination_key"] = pagination_key
-        ret = self._get(url, params)
-        ret.encoding = self.RAW_ENCODING
-
-        return ret.text
+        return self._get_text(url, params)
 
     def get_fins_statements(
         self, code: str = "", date_yyyymmdd: str = ""
@@ -1281,40 +1658,30 @@ class Client:
         Returns:
             pd.DataFrame: 財務情報 (DisclosedDate, DisclosedTime, 及びLocalCode列でソートされています)
         """
-        j = self._get_fins_statements_raw(code=code, date_yyyymmdd=date_yyyymmdd)
-        d = json.loads(j)
-        data = d["statements"]
-        while "pagination_key" in d:
-            j = self._get_fins_statements_raw(
-                code=code,
-                date_yyyymmdd=date_yyyymmdd,
-                pagination_key=d["pagination_key"],
-            )
-            d = json.loads(j)
-            data += d["statements"]
+        pages = self._get_pages(
+            self._get_fins_statements_raw,
+            code=code,
+            date_yyyymmdd=date_yyyymmdd,
+        )
+        return self._decode_fins_statements(pages)
+
+    @staticmethod
+    def _decode_fins_statements(pages: List[str]) -> pd.DataFrame:
+        """
+        get_fins_statements の raw API returns を DataFrame に変換
+
+        Args:
+            pages: raw API returns (ページ順)
+
+        Returns:
+            pd.DataFrame: 財務情報 (DisclosedDate, DisclosedTime, 及びLocalCode列でソートされています)
+        """
+        data = _load_pages(pages, "statements")
         df = pd.DataFrame.from_dict(data)
         cols = constants.FINS_STATEMENTS_COLUMNS
         if len(df) == 0:
             return pd.DataFrame([], columns=cols)
-        df["DisclosedDate"] = pd.to_datetime(df["DisclosedDate"], format="%Y-%m-%d")
-        df["CurrentPeriodStartDate"] = pd.to_datetime(
-            df["CurrentPeriodStartDate"], format="%Y-%m-%d"
-        )
-        df["CurrentPeriodEndDate"] = pd.to_datetime(
-            df["CurrentPeriodEndDate"], format="%Y-%m-%d"
-        )
-        df["CurrentFiscalYearStartDate"] = pd.to_datetime(
-            df["CurrentFiscalYearStartDate"], format="%Y-%m-%d"
-        )
-        df["CurrentFiscalYearEndDate"] = pd.to_datetime(
-            df["CurrentFiscalYearEndDate"], format="%Y-%m-%d"
-        )
-        df["NextFiscalYearStartDate"] = pd.to_datetime(
-            df["NextFiscalYearStartDate"], format="%Y-%m-%d"
-        )
-        df["NextFiscalYearEndDate"] = pd.to_datetime(
-            df["NextFiscalYearEndDate"], format="%Y-%m-%d"
-        )
+        utils.to_datetime_columns(df, constants.FINS_STATEMENTS_DATE_COLUMNS)
         df.sort_values(["DisclosedDate", "DisclosedTime", "LocalCode"], inplace=True)
         return df[cols]
 
@@ -1339,56 +1706,34 @@ class Client:
         self.get_id_token()
 
         buff = []
-        futures = {}
+        params_list = []
         dates = pd.date_range(start_dt, end_dt, freq="D")
-        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
-            for s in dates:
-                # fetch data via API or cache file
-                yyyymmdd = s.strftime("%Y%m%d")
-                yyyy = yyyymmdd[:4]
-                cache_file = f"fins_statements_{yyyymmdd}.csv.gz"
-                if (cache_dir != "") and os.path.isfile(
-                    f"{cache_dir}/{yyyy}/{cache_file}"
-                ):
-                    df = pd.read_csv(f"{cache_dir}/{yyyy}/{cache_file}", dtype=str)
-                    df["DisclosedDate"] = pd.to_datetime(
-                        df["DisclosedDate"], format="%Y-%m-%d"
-                    )
-                    df["CurrentPeriodStartDate"] = pd.to_datetime(
-                        df["CurrentPeriodStartDate"], format="%Y-%m-%d"
-                    )
-                    df["CurrentPeriodEndDate"] = pd.to_datetime(
-                        df["CurrentPeriodEndDate"], format="%Y-%m-%d"
-                    )
-                    df["CurrentFiscalYearStartDate"] = pd.to_datetime(
-                        df["CurrentFiscalYearStartDate"], format="%Y-%m-%d"
-                    )
-                    df["CurrentFiscalYearEndDate"] = pd.to_datetime(
-                        df["CurrentFiscalYearEndDate"], format="%Y-%m-%d"
-                    )
-                    df["NextFiscalYearStartDate"] = pd.to_datetime(
-                        df["NextFiscalYearStartDate"], format="%Y-%m-%d"
-                    )
-                    df["NextFiscalYearEndDate"] = pd.to_datetime(
-                        df["NextFiscalYearEndDate"], format="%Y-%m-%d"
-                    )
-                    buff.append(df)
-                else:
-                    future = executor.submit(
-                        self.get_fins_statements, date_yyyymmdd=yyyymmdd
-                    )
-                    futures[future] = yyyymmdd
-            for future in as_completed(futures):
-                df = future.result()
+        for s in dates:
+            # fetch data via API or cache file
+            yyyymmdd = s.strftime("%Y%m%d")
+            yyyy = yyyymmdd[:4]
+            cache_file = f"fins_statements_{yyyymmdd}.csv.gz"
+            if (cache_dir != "") and os.path.isfile(f"{cache_dir}/{yyyy}/{cache_file}"):
+                df = pd.read_csv(f"{cache_dir}/{yyyy}/{cache_file}", dtype=str)
+                utils.to_datetime_columns(df, constants.FINS_STATEMENTS_DATE_COLUMNS)
                 buff.append(df)
-                yyyymmdd = futures[future]
-                yyyy = yyyymmdd[:4]
-                cache_file = f"fins_statements_{yyyymmdd}.csv.gz"
-                if cache_dir != "":
-                    # create year directory
-                    os.makedirs(f"{cache_dir}/{yyyy}", exist_ok=True)
-                    # write cache file
-                    df.to_csv(f"{cache_dir}/{yyyy}/{cache_file}", index=False)
+            else:
+                params_list.append(dict(date_yyyymmdd=yyyymmdd))
+        for params, df in self._iter_range(
+            self.get_fins_statements,
+            self._get_fins_statements_raw,
+            self._decode_fins_statements,
+            params_list,
+        ):
+            buff.append(df)
+            yyyymmdd = params["date_yyyymmdd"]
+            yyyy = yyyymmdd[:4]
+            cache_file = f"fins_statements_{yyyymmdd}.csv.gz"
+            if cache_dir != "":
+                # create year directory
+                os.makedirs(f"{cache_dir}/{yyyy}", exist_ok=True)
+                # write cache file
+                df.to_csv(f"{cache_dir}/{yyyy}/{cache_file}", index=False)
 
         return pd.concat(buff).sort_values(
             ["DisclosedDate", "DisclosedTime", "LocalCode"]
@@ -1415,10 +1760,7 @@ class Client:
         }
         if pagination_key != "":
             params["pagination_key"] = pagination_key
-        ret = self._get(url, params)
-        ret.encoding = self.RAW_ENCODING
-
-        return ret.text
+        return self._get_text(url, params)
 
     def get_fins_fs_details(
         self, code: str = "", date_yyyymmdd: str = ""
@@ -1433,22 +1775,30 @@ class Client:
         Returns:
             pd.DataFrame: 財務諸表(BS/PL) (DisclosedDate, DisclosedTime, 及びLocalCode列でソートされています)
         """
-        j = self._get_fins_fs_details_raw(code=code, date_yyyymmdd=date_yyyymmdd)
-        d = json.loads(j)
-        data = d["fs_details"]
-        while "pagination_key" in d:
-            j = self._get_fins_fs_details_raw(
-                code=code,
-                date_yyyymmdd=date_yyyymmdd,
-                pagination_key=d["pagination_key"],
-            )
-            d = json.loads(j)
-            data += d["fs_details"]
+        pages = self._get_pages(
+            self._get_fins_fs_details_raw,
+            code=code,
+            date_yyyymmdd=date_yyyymmdd,
+        )
+        return self._decode_fins_fs_details(pages)
+
+    @staticmethod
+    def _decode_fins_fs_details(pages: List[str]) -> pd.DataFrame:
+        """
+        get_fins_fs_details の raw API returns を DataFrame に変換
+
+        Args:
+            pages: raw API returns (ページ順)
+
+        Returns:
+            pd.DataFrame: 財務諸表(BS/PL) (DisclosedDate, DisclosedTime, 及びLocalCode列でソートされています)
+        """
+        data = _load_pages(pages, "fs_details")
         df = pd.json_normalize(data=data)
         cols = constants.FINS_FS_DETAILS_COLUMNS
         if len(df) == 0:
             return pd.DataFrame([], columns=cols)
-        df["DisclosedDate"] = pd.to_datetime(df["DisclosedDate"], format="%Y-%m-%d")
+        utils.to_datetime_columns(df, ["DisclosedDate"])
         df.sort_values(["DisclosedDate", "DisclosedTime", "LocalCode"], inplace=True)
         return df
 
@@ -1473,38 +1823,34 @@ class Client:
         self.get_id_token()
 
         buff = []
-        futures = {}
+        params_list = []
         dates = pd.date_range(start_dt, end_dt, freq="D")
-        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
-            for s in dates:
-                # fetch data via API or cache file
-                yyyymmdd = s.strftime("%Y%m%d")
-                yyyy = yyyymmdd[:4]
-                cache_file = f"fins_fs_details_{yyyymmdd}.csv.gz"
-                if (cache_dir != "") and os.path.isfile(
-                    f"{cache_dir}/{yyyy}/{cache_file}"
-                ):
-                    df = pd.read_csv(f"{cache_dir}/{yyyy}/{cache_file}", dtype=str)
-                    df["DisclosedDate"] = pd.to_datetime(
-                        df["DisclosedDate"], format="%Y-%m-%d"
-                    )
-                    buff.append(df)
-                else:
-                    future = executor.submit(
-                        self.get_fins_fs_details, date_yyyymmdd=yyyymmdd
-                    )
-                    futures[future] = yyyymmdd
-            for future in as_completed(futures):
-                df = future.result()
+        for s in dates:
+            # fetch data via API or cache file
+            yyyymmdd = s.strftime("%Y%m%d")
+            yyyy = yyyymmdd[:4]
+            cache_file = f"fins_fs_details_{yyyymmdd}.csv.gz"
+            if (cache_dir != "") and os.path.isfile(f"{cache_dir}/{yyyy}/{cache_file}"):
+                df = pd.read_csv(f"{cache_dir}/{yyyy}/{cache_file}", dtype=str)
+                utils.to_datetime_columns(df, ["DisclosedDate"])
                 buff.append(df)
-                yyyymmdd = futures[future]
-                yyyy = yyyymmdd[:4]
-                cache_file = f"fins_fs_details_{yyyymmdd}.csv.gz"
-                if cache_dir != "":
-                    # create year directory
-                    os.makedirs(f"{cache_dir}/{yyyy}", exist_ok=True)
-                    # write cache file
-                    df.to_csv(f"{cache_dir}/{yyyy}/{cache_file}", index=False)
+            else:
+                params_list.append(dict(date_yyyymmdd=yyyymmdd))
+        for params, df in self._iter_range(
+            self.get_fins_fs_details,
+            self._get_fins_fs_details_raw,
+            self._decode_fins_fs_details,
+            params_list,
+        ):
+            buff.append(df)
+            yyyymmdd = params["date_yyyymmdd"]
+            yyyy = yyyymmdd[:4]
+            cache_file = f"fins_fs_details_{yyyymmdd}.csv.gz"
+            if cache_dir != "":
+                # create year directory
+                os.makedirs(f"{cache_dir}/{yyyy}", exist_ok=True)
+                # write cache file
+                df.to_csv(f"{cache_dir}/{yyyy}/{cache_file}", index=False)
 
         return pd.concat(buff).sort_values(
             ["DisclosedDate", "DisclosedTime", "LocalCode"]
@@ -1545,9 +1891,7 @@ class Client:
                 params["to"] = to_yyyymmdd
         if pagination_key != "":
             params["pagination_key"] = pagination_key
-        ret = self._get(url, params)
-        ret.encoding = self.RAW_ENCODING
-        return ret.text
+        return self._get_text(url, params)
 
     def get_fins_dividend(
         self,
@@ -1569,31 +1913,32 @@ class Client:
         Returns:
             pd.DataFrame: information on dividends data (Sorted by "Code")
         """
-        j = self._get_fins_dividend_raw(
+        pages = self._get_pages(
+            self._get_fins_dividend_raw,
             code=code,
             from_yyyymmdd=from_yyyymmdd,
             to_yyyymmdd=to_yyyymmdd,
             date_yyyymmdd=date_yyyymmdd,
         )
-        d = json.loads(j)
-        data = d["dividend"]
-        while "pagination_key" in d:
-            j = self._get_fins_dividend_raw(
-                code=code,
-                from_yyyymmdd=from_yyyymmdd,
-                to_yyyymmdd=to_yyyymmdd,
-                date_yyyymmdd=date_yyyymmdd,
-                pagination_key=d["pagination_key"],
-            )
-            d = json.loads(j)
-            data += d["dividend"]
+        return self._decode_fins_dividend(pages)
+
+    @staticmethod
+    def _decode_fins_dividend(pages: List[str]) -> pd.DataFrame:
+        """
+        get_fins_dividend の raw API returns を DataFrame に変換
+
+        Args:
+            pages: raw API returns (ページ順)
+
+        Returns:
+            pd.DataFrame: information on dividends data (Sorted by "Code")
+        """
+        data = _load_pages(pages, "dividend")
         df = pd.DataFrame.from_dict(data)
         cols = constants.FINS_DIVIDEND_COLUMNS
         if len(df) == 0:
             return pd.DataFrame([], columns=cols)
-        df["AnnouncementDate"] = pd.to_datetime(
-            df["AnnouncementDate"], format="%Y-%m-%d"
-        )
+        utils.to_datetime_columns(df, ["AnnouncementDate"])
         df.sort_values(["Code"], inplace=True)
         return df[cols]
 
@@ -1614,18 +1959,17 @@ class Client:
         """
         # pre-load id_token
         self.get_id_token()
-        buff = []
         dates = pd.date_range(start_dt, end_dt, freq="D")
-        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
-            futures = [
-                executor.submit(
-                    self.get_fins_dividend, date_yyyymmdd=s.strftime("%Y-%m-%d")
-                )
-                for s in dates
-            ]
-            for future in as_completed(futures):
-                df = future.result()
-                buff.append(df)
+        params_list = [dict(date_yyyymmdd=s.strftime("%Y-%m-%d")) for s in dates]
+        buff = [
+            df
+            for _, df in self._iter_range(
+                self.get_fins_dividend,
+                self._get_fins_dividend_raw,
+                self._decode_fins_dividend,
+                params_list,
+            )
+        ]
         return pd.concat(buff).sort_values(
             ["AnnouncementDate", "AnnouncementTime", "Code"]
         )
@@ -1647,9 +1991,7 @@ class Client:
         params = {}
         if pagination_key != "":
             params["pagination_key"] = pagination_key
-        ret = self._get(url, params)
-        ret.encoding = self.RAW_ENCODING
-        return ret.text
+        return self._get_text(url, params)
 
     def get_fins_announcement(self) -> pd.DataFrame:
         """
@@ -1672,7 +2014,7 @@ class Client:
         cols = constants.FINS_ANNOUNCEMENT_COLUMNS
         if len(df) == 0:
             return pd.DataFrame([], columns=cols)
-        df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
+        utils.to_datetime_columns(df, ["Date"])
         df.sort_values(["Date", "Code"], inplace=True)
         return df[cols]
 
@@ -1697,9 +2039,7 @@ class Client:
         }
         if pagination_key != "":
             params["pagination_key"] = pagination_key
-        ret = self._get(url, params)
-        ret.encoding = self.RAW_ENCODING
-        return ret.text
+        return self._get_text(url, params)
 
     def get_option_index_option(
         self,
@@ -1714,23 +2054,30 @@ class Client:
             pd.DataFrame:
                 Nikkei 225 Options' OHLC etc. (Sorted by "Code")
         """
-        j = self._get_option_index_option_raw(
+        pages = self._get_pages(
+            self._get_option_index_option_raw,
             date_yyyymmdd=date_yyyymmdd,
         )
-        d = json.loads(j)
-        data = d["index_option"]
-        while "pagination_key" in d:
-            j = self._get_option_index_option_raw(
-                date_yyyymmdd=date_yyyymmdd,
-                pagination_key=d["pagination_key"],
-            )
-            d = json.loads(j)
-            data += d["index_option"]
+        return self._decode_option_index_option(pages)
+
+    @staticmethod
+    def _decode_option_index_option(pages: List[str]) -> pd.DataFrame:
+        """
+        get_option_index_option の raw API returns を DataFrame に変換
+
+        Args:
+            pages: raw API returns (ページ順)
+
+        Returns:
+            pd.DataFrame:
+                Nikkei 225 Options' OHLC etc. (Sorted by "Code")
+        """
+        data = _load_pages(pages, "index_option")
         df = pd.DataFrame.from_dict(data)
         cols = constants.OPTION_INDEX_OPTION_COLUMNS
         if len(df) == 0:
             return pd.DataFrame([], columns=cols)
-        df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
+        utils.to_datetime_columns(df, ["Date"])
         df.sort_values(["Code"], inplace=True)
         return df[cols]
 
@@ -1751,18 +2098,17 @@ class Client:
         """
         # pre-load id_token
         self.get_id_token()
-        buff = []
         dates = pd.date_range(start_dt, end_dt, freq="D")
-        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
-            futures = [
-                executor.submit(
-                    self.get_option_index_option, date_yyyymmdd=s.strftime("%Y-%m-%d")
-                )
-                for s in dates
-            ]
-            for future in as_completed(futures):
-                df = future.result()
-                buff.append(df)
+        params_list = [dict(date_yyyymmdd=s.strftime("%Y-%m-%d")) for s in dates]
+        buff = [
+            df
+            for _, df in self._iter_range(
+                self.get_option_index_option,
+                self._get_option_index_option_raw,
+                self._decode_option_index_option,
+                params_list,
+            )
+        ]
         return pd.concat(buff).sort_values(["Code", "Date"])
 
     # /trading_calendar
@@ -1791,9 +2137,7 @@ class Client:
             params["from"] = from_yyyymmdd
         if to_yyyymmdd != "":
             params["to"] = to_yyyymmdd
-        ret = self._get(url, params)
-        ret.encoding = self.RAW_ENCODING
-        return ret.text
+        return self._get_text(url, params)
 
     def get_markets_trading_calendar(
         self,
@@ -1822,7 +2166,7 @@ class Client:
         cols = constants.MARKETS_TRADING_CALENDAR
         if len(df) == 0:
             return pd.DataFrame([], columns=cols)
-        df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
+        utils.to_datetime_columns(df, ["Date"])
         df.sort_values(["Date"], inplace=True)
         return df[cols]
 
@@ -1851,9 +2195,7 @@ class Client:
         }
         if pagination_key != "":
             params["pagination_key"] = pagination_key
-        ret = self._get(url, params)
-        ret.encoding = self.RAW_ENCODING
-        return ret.text
+        return self._get_text(url, params)
 
     def get_derivatives_futures(
         self,
@@ -1870,27 +2212,32 @@ class Client:
             pd.DataFrame:
                 Futures' OHLC etc. (Sorted by "Code")
         """
-        j = self._get_derivatives_futures_raw(
+        pages = self._get_pages(
+            self._get_derivatives_futures_raw,
             category=category,
             date_yyyymmdd=date_yyyymmdd,
             contract_flag=contract_flag,
         )
-        d = json.loads(j)
-        data = d["futures"]
-        while "pagination_key" in d:
-            j = self._get_derivatives_futures_raw(
-                category=category,
-                date_yyyymmdd=date_yyyymmdd,
-                contract_flag=contract_flag,
-                pagination_key=d["pagination_key"],
-            )
-            d = json.loads(j)
-            data += d["futures"]
+        return self._decode_derivatives_futures(pages)
+
+    @staticmethod
+    def _decode_derivatives_futures(pages: List[str]) -> pd.DataFrame:
+        """
+        get_derivatives_futures の raw API returns を DataFrame に変換
+
+        Args:
+            pages: raw API returns (ページ順)
+
+        Returns:
+            pd.DataFrame:
+                Futures' OHLC etc. (Sorted by "Code")
+        """
+        data = _load_pages(pages, "futures")
         df = pd.DataFrame.from_dict(data)
         cols = constants.DERIVATIVES_FUTURES_COLUMNS
         if len(df) == 0:
             return pd.DataFrame([], columns=cols)
-        df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
+        utils.to_datetime_columns(df, ["Date"])
         df.sort_values(["Code"], inplace=True)
         return df[cols]
 
@@ -1913,21 +2260,24 @@ class Client:
         """
         # pre-load id_token
         self.get_id_token()
-        buff = []
         dates = pd.date_range(start_dt, end_dt, freq="D")
-        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
-            futures = [
-                executor.submit(
-                    self.get_derivatives_futures,
-                    date_yyyymmdd=s.strftime("%Y-%m-%d"),
-                    category=category,
-                    contract_flag=contract_flag,
-                )
-                for s in dates
-            ]
-            for future in as_completed(futures):
-                df = future.result()
-                buff.append(df)
+        params_list = [
+            dict(
+                date_yyyymmdd=s.strftime("%Y-%m-%d"),
+                category=category,
+                contract_flag=contract_flag,
+            )
+            for s in dates
+        ]
+        buff = [
+            df
+            for _, df in self._iter_range(
+                self.get_derivatives_futures,
+                self._get_derivatives_futures_raw,
+                self._decode_derivatives_futures,
+                params_list,
+            )
+        ]
         return pd.concat(buff).sort_values(["Code", "Date"])
 
     def _get_derivatives_options_raw(
@@ -1956,9 +2306,7 @@ class Client:
         }
         if pagination_key != "":
             params["pagination_key"] = pagination_key
-        ret = self._get(url, params)
-        ret.encoding = self.RAW_ENCODING
-        return ret.text
+        return self._get_text(url, params)
 
     def get_derivatives_options(
         self,
@@ -1976,29 +2324,33 @@ class Client:
             pd.DataFrame:
                 Futures' OHLC etc. (Sorted by "Code")
         """
-        j = self._get_derivatives_options_raw(
+        pages = self._get_pages(
+            self._get_derivatives_options_raw,
             category=category,
             date_yyyymmdd=date_yyyymmdd,
             contract_flag=contract_flag,
             code=code,
         )
-        d = json.loads(j)
-        data = d["options"]
-        while "pagination_key" in d:
-            j = self._get_derivatives_options_raw(
-                category=category,
-                date_yyyymmdd=date_yyyymmdd,
-                contract_flag=contract_flag,
-                code=code,
-                pagination_key=d["pagination_key"],
-            )
-            d = json.loads(j)
-            data += d["options"]
+        return self._decode_derivatives_options(pages)
+
+    @staticmethod
+    def _decode_derivatives_options(pages: List[str]) -> pd.DataFrame:
+        """
+        get_derivatives_options の raw API returns を DataFrame に変換
+
+        Args:
+            pages: raw API returns (ページ順)
+
+        Returns:
+            pd.DataFrame:
+                Futures' OHLC etc. (Sorted by "Code")
+        """
+        data = _load_pages(pages, "options")
         df = pd.DataFrame.from_dict(data)
         cols = constants.DERIVATIVES_OPTIONS_COLUMNS
         if len(df) == 0:
             return pd.DataFrame([], columns=cols)
-        df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
+        utils.to_datetime_columns(df, ["Date"])
         df.sort_values(["Code"], inplace=True)
         return df[cols]
 
@@ -2022,22 +2374,25 @@ class Client:
         """
         # pre-load id_token
         self.get_id_token()
-        buff = []
         dates = pd.date_range(start_dt, end_dt, freq="D")
-        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
-            options = [
-                executor.submit(
-                    self.get_derivatives_options,
-                    date_yyyymmdd=s.strftime("%Y-%m-%d"),
-                    category=category,
-                    contract_flag=contract_flag,
-                    code=code,
-                )
-                for s in dates
-            ]
-            for option in as_completed(options):
-                df = option.result()
-                buff.append(df)
+        params_list = [
+            dict(
+                date_yyyymmdd=s.strftime("%Y-%m-%d"),
+                category=category,
+                contract_flag=contract_flag,
+                code=code,
+            )
+            for s in dates
+        ]
+        buff = [
+            df
+            for _, df in self._iter_range(
+                self.get_derivatives_options,
+                self._get_derivatives_options_raw,
+                self._decode_derivatives_options,
+                params_list,
+            )
+        ]
         return pd.concat(buff).sort_values(["Code", "Date"])
 
     def _get_markets_short_selling_positions_raw(
@@ -2079,9 +2434,7 @@ class Client:
             params["calculated_date"] = calculated_date
         if pagination_key != "":
             params["pagination_key"] = pagination_key
-        ret = self._get(url, params)
-        ret.encoding = self.RAW_ENCODING
-        return ret.text
+        return self._get_text(url, params)
 
     def get_markets_short_selling_positions(
         self,
@@ -2107,38 +2460,35 @@ class Client:
             pd.DataFrame: short selling positions (Sorted by "DisclosedDate",
             "CalculatedDate", and "Code" columns)
         """
-        j = self._get_markets_short_selling_positions_raw(
+        pages = self._get_pages(
+            self._get_markets_short_selling_positions_raw,
             code=code,
             disclosed_date=disclosed_date,
             disclosed_date_from=disclosed_date_from,
             disclosed_date_to=disclosed_date_to,
             calculated_date=calculated_date,
         )
-        d = json.loads(j)
-        data = d["short_selling_positions"]
-        while "pagination_key" in d:
-            j = self._get_markets_short_selling_positions_raw(
-                code=code,
-                disclosed_date=disclosed_date,
-                disclosed_date_from=disclosed_date_from,
-                disclosed_date_to=disclosed_date_to,
-                calculated_date=calculated_date,
-                pagination_key=d["pagination_key"],
-            )
-            d = json.loads(j)
-            data += d["short_selling_positions"]
+        return self._decode_markets_short_selling_positions(pages)
+
+    @staticmethod
+    def _decode_markets_short_selling_positions(pages: List[str]) -> pd.DataFrame:
+        """
+        get_markets_short_selling_positions の raw API returns を DataFrame に変換
+
+        Args:
+            pages: raw API returns (ページ順)
+
+        Returns:
+            pd.DataFrame: short selling positions (Sorted by "DisclosedDate",
+                "CalculatedDate", and "Code" columns)
+        """
+        data = _load_pages(pages, "short_selling_positions")
         df = pd.DataFrame.from_dict(data)
         cols = constants.SHORT_SELLING_POSITIONS_COLUMNS
         if len(df) == 0:
             return pd.DataFrame([], columns=cols)
-        df["DisclosedDate"] = pd.to_datetime(
-            df["DisclosedDate"], format="%Y-%m-%d", errors="coerce"
-        )
-        df["CalculatedDate"] = pd.to_datetime(
-            df["CalculatedDate"], format="%Y-%m-%d", errors="coerce"
-        )
-        df["CalculationInPreviousReportingDate"] = pd.to_datetime(
-            df["CalculationInPreviousReportingDate"], format="%Y-%m-%d", errors="coerce"
+        utils.to_datetime_columns(
+            df, constants.SHORT_SELLING_POSITIONS_DATE_COLUMNS, errors="coerce"
         )
         df.sort_values(["DisclosedDate", "CalculatedDate", "Code"], inplace=True)
         return df[cols]
@@ -2161,17 +2511,15 @@ class Client:
         """
         # pre-load id_token
         self.get_id_token()
-        buff = []
         dates = pd.date_range(start_dt, end_dt, freq="D")
-        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
-            futures = [
-                executor.submit(
-                    self.get_markets_short_selling_positions,
-                    disclosed_date=s.strftime("%Y-%m-%d"),
-                )
-                for s in dates
-            ]
-            for future in as_completed(futures):
-                df = future.result()
-                buff.append(df)
+        params_list = [dict(disclosed_date=s.strftime("%Y-%m-%d")) for s in dates]
+        buff = [
+            df
+            for _, df in self._iter_range(
+                self.get_markets_short_selling_positions,
+                self._get_markets_short_selling_positions_raw,
+                self._decode_markets_short_selling_positions,
+                params_list,
+            )
+        ]
         return pd.concat(buff).sort_values(["DisclosedDate", "CalculatedDate", "Code"])
@@ -0,0 +1,443 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from types import TracebackType
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+# 優先度クラスと、混雑時に割り当てる実行枠の比率
+PRIORITIES = ("interactive", "normal", "bulk")
+DEFAULT_PRIORITY_WEIGHTS: Dict[str, float] = {"interactive": 16, "normal": 4, "bulk": 1}
+
+_local = threading.local()
+
+
+@contextmanager
+def priority(name: str) -> Iterator[None]:
+    """
+    ブロック内で発行するリクエストの優先度を設定する (スレッドごと)
+
+    Args:
+        name: "interactive", "normal" or "bulk"
+    """
+    if name not in PRIORITIES:
+        raise ValueError(f"priority must be one of {PRIORITIES}: {name}")
+    prev = getattr(_local, "priority", None)
+    _local.priority = name
+    try:
+        yield
+    finally:
+        _local.priority = prev
+
+
+def current_priority(default: str = "normal") -> str:
+    """
+    現在のスレッドの優先度 (未設定の場合は default)
+    """
+    return getattr(_local, "priority", None) or default
+
+
+def run_with_priority(
+    name: str, fn: Callable[..., T], /, *args: Any, **kwargs: Any
+) -> T:
+    """
+    優先度を設定して fn を実行する (任意の executor に優先度を引き継ぐ)
+    """
+    with priority(name):
+        return fn(*args, **kwargs)
+
+
+class _WeightedQueues:
+    """
+    優先度クラスごとのキュー
+
+    stride scheduling で取り出すため、混雑時は各クラスに重みに比例した順番が回り、
+    重みの小さいクラス (bulk) も飢餓状態にならない。
+    """
+
+    def __init__(self, weights: Mapping[str, float]) -> None:
+        self.weights = dict(weights)
+        self._queues: Dict[str, Deque[Any]] = {p: deque() for p in self.weights}
+        self._pass = {p: 0.0 for p in self.weights}
+        self._vtime = 0.0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, name: str, item: Any) -> None:
+        queue = self._queues[name]
+        if not queue:
+            # 待ちのなかったクラスが溜め込んだ順番で他を追い越し続けないようにする
+            self._pass[name] = max(self._pass[name], self._vtime)
+        queue.append(item)
+        self._size += 1
+
+    def pop(self) -> Tuple[str, Any]:
+        name = min(
+            (p for p, q in self._queues.items() if q), key=lambda p: self._pass[p]
+        )
+        self._vtime = self._pass[name]
+        self._pass[name] += 1.0 / self.weights[name]
+        self._size -= 1
+        return name, self._queues[name].popleft()
+
+    def drain(self) -> List[Any]:
+        items = [item for q in self._queues.values() for item in q]
+        for q in self._queues.values():
+            q.clear()
+        self._size = 0
+        return items
+
+
+class ConcurrencyLimiter:
+    """
+    同時実行数 (in-flight なリクエスト数) の上限を設ける
+
+    Client の全メソッドで共有し、range 系メソッドを複数同時に呼び出した場合や
+    利用者のスレッドから直接呼び出した場合も、合計の同時実行数を上限以下に保つ。
+    上限は実行中に変更できる。
+    空きを待つスレッドは優先度 (priority 参照) ごとに並び、重み付きの順番で実行枠を得る。
+
+    例:
+        limiter = ConcurrencyLimiter(5)
+        with limiter:
+            session.get(url)
+    """
+
+    def __init__(
+        self, limit: int, weights: Mapping[str, float] = DEFAULT_PRIORITY_WEIGHTS
+    ) -> None:
+        """
+        Args:
+            limit: 同時実行数の上限
+            weights: 優先度クラスごとの重み
+        """
+        if limit < 1:
+            raise ValueError(f"limit must be >= 1: {limit}")
+        self._limit = limit
+        self._in_flight = 0
+        self._waiters = _WeightedQueues(weights)
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        """
+        同時実行数の上限
+        """
+        return self._limit
+
+    @limit.setter
+    def limit(self, limit: int) -> None:
+        if limit < 1:
+            raise ValueError(f"limit must be >= 1: {limit}")
+        with self._lock:
+            self._set_limit(limit)
+
+    def _set_limit(self, limit: int) -> None:
+        self._limit = limit
+        self._grant()
+
+    def _grant(self) -> None:
+        while self._in_flight < self._limit and len(self._waiters) > 0:
+            _, ticket = self._waiters.pop()
+            self._in_flight += 1
+            ticket.set()
+
+    @property
+    def in_flight(self) -> int:
+        """
+        実行中の数
+        """
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        """
+        空きを待っている数
+        """
+        return len(self._waiters)
+
+    def record(self, latency: float, congested: bool = False) -> None:
+        """
+        リクエストの結果を記録する (上限は固定のため何もしない)
+
+        Args:
+            latency: 応答時間 (秒)
+            congested: 429/5xx などの混雑を示す応答があったか
+        """
+
+    def acquire(self) -> None:
+        """
+        空きができるまで待ってから実行枠を確保する
+        """
+        with self._lock:
+            if self._in_flight < self._limit and len(self._waiters) == 0:
+                self._in_flight += 1
+                return
+            ticket = threading.Event()
+            self._waiters.push(current_priority(), ticket)
+        ticket.wait()
+
+    def release(self) -> None:
+        """
+        実行枠を解放する
+        """
+        with self._lock:
+            self._in_flight -= 1
+            self._grant()
+
+    def __enter__(self) -> "ConcurrencyLimiter":
+        self.acquire()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self.release()
+
+
+class PriorityExecutor(Executor):
+    """
+    優先度付きのスレッドプール
+
+    ThreadPoolExecutor は投入順 (FIFO) に実行するため、大量の bulk なタスクの後に
+    投入した interactive なタスクが待たされる。このクラスは投入したスレッドの優先度
+    (priority 参照) ごとにタスクを並べ、重み付きの順番で取り出して、実行中も
+    同じ優先度を設定する。
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        weights: Mapping[str, float] = DEFAULT_PRIORITY_WEIGHTS,
+        thread_name_prefix: str = "",
+    ) -> None:
+        """
+        Args:
+            max_workers: スレッド数
+            weights: 優先度クラスごとの重み
+            thread_name_prefix: スレッド名の接頭辞
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be >= 1: {max_workers}")
+        self._max_workers = max_workers
+        self._thread_name_prefix = thread_name_prefix or "PriorityExecutor"
+        self._queues = _WeightedQueues(weights)
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._idle = 0
+        self._shutdown = False
+
+    def submit(  # type: ignore[override]
+        self, fn: Callable[..., T], /, *args: Any, **kwargs: Any
+    ) -> "Future[T]":
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            future: "Future[T]" = Future()
+            self._queues.push(current_priority(), (future, fn, args, kwargs))
+            if (
+                len(self._queues) > self._idle
+                and len(self._threads) < self._max_workers
+            ):
+                t = threading.Thread(
+                    target=self._worker,
+                    name=f"{self._thread_name_prefix}_{len(self._threads)}",
+                    daemon=True,
+                )
+                self._threads.append(t)
+                t.start()
+            self._cond.notify()
+        return future
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while len(self._queues) == 0 and not self._shutdown:
+                    self._idle += 1
+                    self._cond.wait()
+                    self._idle -= 1
+                if len(self._queues) == 0:
+                    return
+                name, (future, fn, args, kwargs) = self._queues.pop()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                with priority(name):
+                    result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._cond:
+            self._shutdown = True
+            if cancel_futures:
+                for future, _, _, _ in self._queues.drain():
+                    future.cancel()
+            self._cond.notify_all()
+        if wait:
+            for t in self._threads:
+                t.join()
+
+
+class AdaptiveConcurrencyLimiter(ConcurrencyLimiter):
+    """
+    応答状況に応じて同時実行数の上限を AIMD で調整する
+
+    混雑の兆候 (429/5xx、もしくは応答時間の移動平均が基準値の latency_tolerance 倍超)
+    がなければ上限を1往復あたり increase ずつ増やし、兆候があれば decrease 倍に減らす。
+    同じ混雑に対して並行中のリクエストが一斉に失敗しても何度も減らさないよう、
+    減少は直近の応答時間あたり1回までとする。上限は [min_limit, max_limit] に収める。
+    """
+
+    def __init__(
+        self,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        initial: Optional[int] = None,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_tolerance: float = 2.0,
+        latency_alpha: float = 0.1,
+    ) -> None:
+        """
+        Args:
+            min_limit: 上限の最小値
+            max_limit: 上限の最大値
+            initial: 上限の初期値 (省略時は min_limit)
+            increase: 1往復あたりの上限の増分
+            decrease: 混雑時に上限に掛ける係数 (0 < decrease < 1)
+            latency_tolerance: 応答時間の基準値に対する許容倍率
+            latency_alpha: 応答時間の指数移動平均の平滑化係数
+        """
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError(
+                f"must be 1 <= min_limit <= max_limit: {min_limit}, {max_limit}"
+            )
+        if not 0 < decrease < 1:
+            raise ValueError(f"decrease must be in (0, 1): {decrease}")
+        if initial is None:
+            initial = min_limit
+        initial = min(max(initial, min_limit), max_limit)
+        super().__init__(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.latency_alpha = latency_alpha
+        self._window = float(initial)
+        self._latency: Optional[float] = None
+        self._base_latency = 0.0
+        self._last_decrease = float("-inf")
+
+    @property
+    def latency(self) -> Optional[float]:
+        """
+        応答時間の指数移動平均 (秒)
+        """
+        return self._latency
+
+    def record(self, latency: float, congested: bool = False) -> None:
+        """
+        リクエストの結果を記録し、上限を調整する
+
+        Args:
+            latency: 応答時間 (秒)
+            congested: 429/5xx などの混雑を示す応答があったか
+        """
+        with self._lock:
+            if self._latency is None:
+                self._latency = latency
+                self._base_latency = latency
+            else:
+                self._latency += self.latency_alpha * (latency - self._latency)
+                if self._latency < self._base_latency:
+                    self._base_latency = self._latency
+                else:
+                    # 基準値が古い最小値に張り付かないよう、ゆっくり追従させる
+                    drift = self._latency - self._base_latency
+                    self._base_latency += self.latency_alpha * 0.1 * drift
+            slow = 0 < self._base_latency * self.latency_tolerance < self._latency
+
+            if congested or slow:
+                now = time.monotonic()
+                if now - self._last_decrease >= self._latency:
+                    self._window = max(
+                        float(self.min_limit), self._window * self.decrease
+                    )
+                    self._last_decrease = now
+            else:
+                self._window = min(
+                    float(self.max_limit), self._window + self.increase / self._window
+                )
+            self._set_limit(int(self._window))
+
+
+class RequestCoalescer:
+    """
+    同じキーで実行中の呼び出しを1つにまとめる (thundering herd 対策)
+
+    最初の呼び出しだけが func を実行し、実行中に同じキーで呼び出したスレッドは
+    その結果 (もしくは例外) を共有する。完了後の呼び出しは改めて実行する。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+
+    def call(
+        self, key: Hashable, func: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> T:
+        """
+        func(*args, **kwargs) を実行する (同じキーで実行中の場合はその結果を待つ)
+
+        Args:
+            key: 呼び出しを同一視するキー
+            func: 実行する関数
+
+        Returns:
+            func の戻り値
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if future is None:
+                future = Future()
+                self._in_flight[key] = future
+        if not leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
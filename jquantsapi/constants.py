@@ -248,6 +248,8 @@ MARKETS_TRADES_SPEC = [
     "OtherFinancialInstitutionsBalance",
 ]
 
+MARKETS_TRADES_SPEC_DATE_COLUMNS = ["PublishedDate", "StartDate", "EndDate"]
+
 # ref. ja https://jpx.gitbook.io/j-quants-ja/api-reference/weekly_margin_interest
 # ref. en https://jpx.gitbook.io/j-quants-en/api-reference/weekly_margin_interest
 MARKETS_WEEKLY_MARGIN_INTEREST = [
@@ -284,6 +286,16 @@ MARKET_SEGMENT_DATA = [
 
 # ref ja https://jpx.gitbook.io/j-quants-ja/api-reference/statements
 # ref en https://jpx.gitbook.io/j-quants-en/api-reference/statements
+FINS_STATEMENTS_DATE_COLUMNS = [
+    "DisclosedDate",
+    "CurrentPeriodStartDate",
+    "CurrentPeriodEndDate",
+    "CurrentFiscalYearStartDate",
+    "CurrentFiscalYearEndDate",
+    "NextFiscalYearStartDate",
+    "NextFiscalYearEndDate",
+]
+
 FINS_STATEMENTS_COLUMNS = [
     "DisclosedDate",
     "DisclosedTime",
@@ -591,6 +603,12 @@ DERIVATIVES_OPTIONS_COLUMNS = [
     "CentralContractMonthFlag",
 ]
 
+SHORT_SELLING_POSITIONS_DATE_COLUMNS = [
+    "DisclosedDate",
+    "CalculatedDate",
+    "CalculationInPreviousReportingDate",
+]
+
 SHORT_SELLING_POSITIONS_COLUMNS = [
     "DisclosedDate",
     "CalculatedDate",
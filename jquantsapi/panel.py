@@ -0,0 +1,297 @@
+import io
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+PANEL_FIELDS = ["Open", "High", "Low", "Close", "Volume", "AdjustmentFactor"]
+PANEL_DTYPE = np.float32
+DEFAULT_CODE_CAPACITY = 8192
+
+_META_FILE = "meta.json"
+_DATES_FILE = "dates.npy"
+
+PathLike = Union[str, Path]
+
+
+def _npy_header(dtype: np.dtype, shape: tuple) -> bytes:
+    buf = io.BytesIO()
+    np.lib.format.write_array_header_1_0(
+        buf,
+        {
+            "descr": np.lib.format.dtype_to_descr(dtype),
+            "fortran_order": False,
+            "shape": shape,
+        },
+    )
+    return buf.getvalue()
+
+
+def _read_npy_header(path: Path) -> tuple:
+    with open(path, "rb") as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, _, dtype = np.lib.format.read_array_header_2_0(f)
+        return shape, dtype, f.tell()
+
+
+def _resize_rows(path: Path, n_rows: int, block: Optional[np.ndarray] = None) -> None:
+    """
+    .npy ファイルの先頭軸を、既存データを書き換えずに伸縮する
+
+    numpy は先頭軸の桁数が増えても収まるようにヘッダーに余白を確保しているため、
+    データ部の末尾への追記とヘッダーの書き換えだけで行数を変更できる。
+
+    Args:
+        path: .npy ファイル
+        n_rows: 変更後の行数 (block を渡す場合は追記前の行数)
+        block: 末尾に追記する行 (Optional)
+    """
+    shape, dtype, offset = _read_npy_header(path)
+    row_bytes = int(np.prod(shape[1:], dtype=np.int64)) * dtype.itemsize
+    if block is not None:
+        block = np.ascontiguousarray(block, dtype=dtype)
+        new_shape = (n_rows + block.shape[0],) + tuple(shape[1:])
+    else:
+        new_shape = (n_rows,) + tuple(shape[1:])
+    header = _npy_header(dtype, new_shape)
+    if len(header) != offset:
+        raise ValueError(f"cannot resize {path} in place: header size changed")
+    with open(path, "r+b") as f:
+        f.truncate(offset + n_rows * row_bytes)
+        if block is not None:
+            f.seek(0, os.SEEK_END)
+            f.write(block.tobytes())
+        f.seek(0)
+        f.write(header)
+
+
+class PricePanel:
+    """
+    日足を (日付 × 銘柄) の float32 配列として保持するパネル
+
+    各項目を memory-mapped な .npy ファイルとして保存するため、
+    複数のプロセスから同じパネルをコピーなしで参照できる。
+    銘柄の列位置と日付の行位置は一度割り当てたら変わらない。
+
+    ディレクトリ構成:
+        meta.json: 項目名、銘柄コード (列順)、銘柄数の上限
+        dates.npy: 日付 (行順)。行数の正はこのファイルで、最後に更新する
+        {field}.npy: 項目ごとの (日付数, 銘柄数の上限) の配列
+
+    例:
+        PricePanel.build("panel", cli.get_price_range("20220101", "20221231"))
+        panel = PricePanel("panel")
+        panel["Close"][panel.date_loc("2022-04-01"), panel.code_loc("72030")]
+    """
+
+    def __init__(self, path: PathLike, mode: str = "r") -> None:
+        """
+        Args:
+            path: パネルのディレクトリ
+            mode: "r" (読み取り専用) or "r+" (追記可能)
+        """
+        if mode not in ("r", "r+"):
+            raise ValueError(f"mode must be 'r' or 'r+': {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self._load()
+
+    def _load(self) -> None:
+        with open(self.path / _META_FILE, encoding="utf-8") as f:
+            meta = json.load(f)
+        self.fields: List[str] = meta["fields"]
+        self.code_capacity: int = meta["code_capacity"]
+        self._codes = pd.Index(meta["codes"], dtype=object)
+        self._dates = pd.DatetimeIndex(
+            np.load(self.path / _DATES_FILE).astype("datetime64[ns]")
+        )
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def create(
+        cls,
+        path: PathLike,
+        fields: Sequence[str] = PANEL_FIELDS,
+        code_capacity: int = DEFAULT_CODE_CAPACITY,
+    ) -> "PricePanel":
+        """
+        空のパネルを作成
+
+        Args:
+            path: パネルのディレクトリ
+            fields: 保持する項目
+            code_capacity: 銘柄数の上限 (超えた場合はファイルを作り直して拡張する)
+
+        Returns:
+            PricePanel: 追記可能なパネル
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for field in fields:
+            np.save(path / f"{field}.npy", np.empty((0, code_capacity), PANEL_DTYPE))
+        np.save(path / _DATES_FILE, np.empty(0, dtype="datetime64[D]"))
+        meta = {"fields": list(fields), "codes": [], "code_capacity": code_capacity}
+        with open(path / _META_FILE, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        return cls(path, mode="r+")
+
+    @classmethod
+    def build(
+        cls,
+        path: PathLike,
+        df: pd.DataFrame,
+        fields: Sequence[str] = PANEL_FIELDS,
+        code_capacity: Optional[int] = None,
+    ) -> "PricePanel":
+        """
+        日足からパネルを作成
+
+        Args:
+            path: パネルのディレクトリ
+            df: get_prices_daily_quotes / get_price_range の結果
+            fields: 保持する項目 (df に存在しない項目は無視する)
+            code_capacity: 銘柄数の上限 (省略時は銘柄数に余裕を持たせた値)
+
+        Returns:
+            PricePanel: 追記可能なパネル
+        """
+        fields = [f for f in fields if f in df.columns]
+        if code_capacity is None:
+            n_codes = df["Code"].nunique()
+            code_capacity = max(DEFAULT_CODE_CAPACITY, int(n_codes * 1.25))
+        panel = cls.create(path, fields=fields, code_capacity=code_capacity)
+        panel.append(df)
+        return panel
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        """
+        日付 (行順)
+        """
+        return self._dates
+
+    @property
+    def codes(self) -> pd.Index:
+        """
+        銘柄コード (列順)
+        """
+        return self._codes
+
+    def date_loc(self, date: Union[str, pd.Timestamp]) -> int:
+        """
+        日付の行位置
+        """
+        return int(self._dates.get_loc(pd.Timestamp(date)))
+
+    def code_loc(self, code: str) -> int:
+        """
+        銘柄コードの列位置
+        """
+        return int(self._codes.get_loc(code))
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        """
+        項目の (日付数, 銘柄数) の配列 (memory-mapped)
+        """
+        if field not in self.fields:
+            raise KeyError(field)
+        if len(self._dates) == 0:
+            return np.empty((0, len(self._codes)), dtype=PANEL_DTYPE)
+        if field not in self._arrays:
+            path = self.path / f"{field}.npy"
+            if self.mode == "r+":
+                self._arrays[field] = np.load(path, mmap_mode="r+")
+            else:
+                self._arrays[field] = np.load(path, mmap_mode="r")
+        return self._arrays[field][: len(self._dates), : len(self._codes)]
+
+    def to_frame(self, field: str) -> pd.DataFrame:
+        """
+        項目を (日付 × 銘柄) の DataFrame として取得
+        """
+        return pd.DataFrame(self[field], index=self._dates, columns=self._codes)
+
+    def append(self, df: pd.DataFrame) -> None:
+        """
+        既存の最終日より後の日足を追記する
+
+        既存のファイルは書き換えず、末尾に行を追加する。
+        新しい銘柄は空いている列に割り当てる。
+
+        Args:
+            df: get_prices_daily_quotes / get_price_range の結果
+        """
+        if self.mode != "r+":
+            raise ValueError("panel is opened read-only")
+        if len(df) == 0:
+            return
+        dates = pd.to_datetime(df["Date"])
+        new_dates = pd.DatetimeIndex(np.unique(dates.to_numpy()))
+        if len(self._dates) > 0 and new_dates[0] <= self._dates[-1]:
+            raise ValueError(
+                f"dates must be newer than {self._dates[-1].date()}: {new_dates[0].date()}"
+            )
+
+        codes = df["Code"].astype(str)
+        added = pd.Index(codes.unique()).difference(self._codes)
+        all_codes = self._codes.append(added)
+        if len(all_codes) > self.code_capacity:
+            self._grow_codes(max(len(all_codes), self.code_capacity * 2))
+
+        di = new_dates.get_indexer(dates)
+        ci = all_codes.get_indexer(codes)
+        n_rows = len(self._dates)
+        self._arrays = {}
+        for field in self.fields:
+            block = np.full((len(new_dates), self.code_capacity), np.nan, PANEL_DTYPE)
+            block[di, ci] = pd.to_numeric(df[field], errors="coerce").to_numpy(
+                dtype=PANEL_DTYPE
+            )
+            _resize_rows(self.path / f"{field}.npy", n_rows, block)
+
+        self._write_meta(all_codes)
+        _resize_rows(
+            self.path / _DATES_FILE,
+            n_rows,
+            new_dates.to_numpy().astype("datetime64[D]"),
+        )
+        self._load()
+
+    def _write_meta(self, codes: pd.Index) -> None:
+        meta = {
+            "fields": self.fields,
+            "codes": [str(c) for c in codes],
+            "code_capacity": self.code_capacity,
+        }
+        tmp = self.path / f"{_META_FILE}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.path / _META_FILE)
+
+    def _grow_codes(self, code_capacity: int) -> None:
+        """
+        銘柄数の上限を拡張する (各項目のファイルを作り直す)
+        """
+        n_rows = len(self._dates)
+        self._arrays = {}
+        for field in self.fields:
+            path = self.path / f"{field}.npy"
+            _resize_rows(path, n_rows)
+            old = np.load(path, mmap_mode="r")
+            tmp = self.path / f"{field}.npy.tmp"
+            new = np.lib.format.open_memmap(
+                tmp, mode="w+", dtype=PANEL_DTYPE, shape=(n_rows, code_capacity)
+            )
+            new[:, : self.code_capacity] = old
+            new[:, self.code_capacity :] = np.nan
+            new.flush()
+            del old, new
+            os.replace(tmp, path)
+        self.code_capacity = code_capacity
+        self._write_meta(self._codes)
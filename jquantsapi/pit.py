@@ -0,0 +1,100 @@
+from typing import Optional, Sequence
+
+import pandas as pd  # type: ignore
+
+# 引け後開示とみなす開示時刻 (この時刻以降の開示は翌日から利用可能とする)
+MARKET_CLOSE_TIME = "15:00:00"
+
+
+def normalize_code(code: pd.Series) -> pd.Series:
+    """
+    銘柄コードを5桁に揃える
+
+    4桁のコードは末尾に "0" を付与する (例: 7203 -> 72030)。
+
+    Args:
+        code: 銘柄コード
+
+    Returns:
+        pd.Series: 5桁の銘柄コード
+    """
+    code = code.astype(str).str.strip()
+    return code.where(code.str.len() != 4, code + "0")
+
+
+def statements_available_date(
+    statements: pd.DataFrame, market_close: str = MARKET_CLOSE_TIME
+) -> pd.Series:
+    """
+    財務情報が株価に織り込まれる日を求める
+
+    DisclosedTime が market_close 以降 (もしくは欠損) の開示は翌日扱いとする。
+
+    Args:
+        statements: get_fins_statements / get_statements_range の結果
+        market_close: 引け後開示とみなす時刻 (HH:MM:SS)
+
+    Returns:
+        pd.Series: 利用可能日
+    """
+    disclosed = pd.to_datetime(statements["DisclosedDate"])
+    time = statements["DisclosedTime"].fillna("").astype(str)
+    after_close = (time == "") | (time >= market_close)
+    return disclosed + pd.to_timedelta(after_close.astype(int), unit="D")
+
+
+def align_statements(
+    prices: pd.DataFrame,
+    statements: pd.DataFrame,
+    columns: Optional[Sequence[str]] = None,
+    market_close: str = MARKET_CLOSE_TIME,
+) -> pd.DataFrame:
+    """
+    株価の各 (Code, Date) に、その日の時点で最新の財務情報を結合する
+
+    Code と LocalCode は5桁に揃えて結合する。引け後の開示は翌日から利用可能とし、
+    同じ利用可能日に複数の開示 (訂正など) がある場合は最後の開示を採用する。
+    銘柄ごとのループは行わず、pd.merge_asof で一括して照合する。
+
+    Args:
+        prices: get_prices_daily_quotes / get_price_range の結果
+        statements: get_fins_statements / get_statements_range の結果
+        columns: 結合する財務情報の列 (省略時は全列)
+        market_close: 引け後開示とみなす時刻 (HH:MM:SS)
+
+    Returns:
+        pd.DataFrame: 株価と財務情報を結合したデータ (Code, Date列でソートされています)
+            財務情報の利用可能日は AvailableDate 列に格納されます
+    """
+    if columns is None:
+        columns = [c for c in statements.columns if c != "LocalCode"]
+    order = ["DisclosedDate", "DisclosedTime", "DisclosureNumber"]
+    extra = [c for c in order if c in statements.columns and c not in columns]
+
+    right = statements[list(columns) + extra].copy()
+    right["_JoinCode"] = normalize_code(statements["LocalCode"])
+    right["AvailableDate"] = statements_available_date(statements, market_close)
+    sort_keys = ["AvailableDate", "_JoinCode"] + [
+        c for c in order if c in right.columns
+    ]
+    right = right.sort_values(sort_keys, kind="mergesort")
+    # 同じ利用可能日の開示は最後のもの (訂正後) だけを残す
+    right = right.drop_duplicates(["_JoinCode", "AvailableDate"], keep="last")
+    right = right.drop(columns=extra)
+
+    left = prices.copy()
+    left["Date"] = pd.to_datetime(left["Date"])
+    left["_JoinCode"] = normalize_code(left["Code"])
+    left = left.sort_values("Date", kind="mergesort")
+
+    df = pd.merge_asof(
+        left,
+        right,
+        left_on="Date",
+        right_on="AvailableDate",
+        by="_JoinCode",
+        direction="backward",
+        suffixes=("", "_statements"),
+    )
+    df = df.drop(columns=["_JoinCode"])
+    return df.sort_values(["Code", "Date"], kind="mergesort").reset_index(drop=True)
@@ -0,0 +1,141 @@
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import IO, Optional, Union
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _lock_file(f: IO[bytes]) -> None:
+        f.seek(0)
+        while True:
+            try:
+                # LK_LOCK は約10秒で OSError になるため、取得できるまで繰り返す
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    def _unlock_file(f: IO[bytes]) -> None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock_file(f: IO[bytes]) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(f: IO[bytes]) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+DEFAULT_RATE_LIMIT_FILE = Path(tempfile.gettempdir()) / "jquantsapi-ratelimit"
+
+# 状態ファイルの形式: 残りトークン数, 最終更新時刻 (UNIX time)
+_STATE = struct.Struct("<dd")
+
+
+class HostRateLimiter:
+    """
+    同じホスト上の全プロセスで共有するトークンバケット
+
+    状態 (残りトークン数と最終更新時刻) をロックファイルに保存し、
+    ファイルロック (POSIX は fcntl.flock、Windows は msvcrt.locking) で排他して更新する。
+    同じファイルを指定した Client はプロセスをまたいで1つのバケットからトークンを取得するため、
+    ワーカーを増やしても合計のリクエストレートは rate 以下に保たれる。
+
+    例:
+        limiter = HostRateLimiter(rate=2.0, burst=5)
+        cli = jquantsapi.Client(rate_limiter=limiter)
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        path: Union[str, Path] = DEFAULT_RATE_LIMIT_FILE,
+    ) -> None:
+        """
+        Args:
+            rate: 1秒あたりのリクエスト数
+            burst: バケットの容量 (省略時は rate と同じ、最小 1)
+            path: 状態を保存するファイル (共有するプロセス間で同じパスを指定する)
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be > 0: {rate}")
+        self.rate = rate
+        self.burst = max(1.0, rate if burst is None else burst)
+        self.path = Path(path)
+        self._thread_lock = threading.Lock()
+        self._file: Optional[IO[bytes]] = None
+
+    def _open(self) -> IO[bytes]:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+            self._file = os.fdopen(fd, "r+b", buffering=0)
+        return self._file
+
+    def _take(self, tokens: float) -> float:
+        """
+        トークンを取得する
+
+        Returns:
+            float: 取得できた場合は 0、足りない場合は補充されるまでの秒数
+        """
+        with self._thread_lock:
+            f = self._open()
+            _lock_file(f)
+            try:
+                f.seek(0)
+                raw = f.read(_STATE.size)
+                if len(raw) == _STATE.size:
+                    available, updated = _STATE.unpack(raw)
+                else:
+                    # 初回はバケットが満杯の状態から始める
+                    available, updated = self.burst, 0.0
+                now = time.time()
+                elapsed = max(0.0, now - updated)
+                available = min(self.burst, available + elapsed * self.rate)
+                wait = 0.0
+                if available >= tokens:
+                    available -= tokens
+                else:
+                    wait = (tokens - available) / self.rate
+                f.seek(0)
+                f.write(_STATE.pack(available, now))
+                return wait
+            finally:
+                _unlock_file(f)
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """
+        トークンが補充されるまで待ってから取得する
+
+        Args:
+            tokens: 取得するトークン数 (burst 以下)
+
+        Raises:
+            ValueError: tokens がバケットの容量を超える場合 (補充されても取得できない)
+        """
+        if tokens > self.burst:
+            raise ValueError(f"tokens must be <= burst ({self.burst}): {tokens}")
+        while True:
+            wait = self._take(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def close(self) -> None:
+        """
+        状態ファイルを閉じる
+        """
+        with self._thread_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,272 @@
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util import Retry
+
+
+class CircuitOpenError(Exception):
+    """
+    サーキットブレーカーが開いているためリクエストを送らずに失敗した
+    """
+
+    pass
+
+
+def jittered_backoff(attempt: int, base: float, cap: float = 300.0) -> float:
+    """
+    指数バックオフに full jitter をかけた待ち時間
+
+    Args:
+        attempt: 何回目のリトライか (0 始まり)
+        base: 初回の待ち時間の上限 (秒)
+        cap: 待ち時間の上限 (秒)
+
+    Returns:
+        float: 待ち時間 (秒)
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    リトライで回復し得る一時的なエラーか
+
+    接続エラー、タイムアウト、urllib3 のリトライを使い切った 429/5xx と、
+    ステータスコードが 429 もしくは 5xx の HTTPError を一時的なエラーとする。
+    400/403 などのそれ以外のエラーはリトライしても結果が変わらない。
+
+    Args:
+        error: 発生した例外
+
+    Returns:
+        bool: 一時的なエラーか
+    """
+    if isinstance(error, requests.exceptions.HTTPError):
+        response = error.response
+        if response is None:
+            return False
+        return response.status_code == 429 or response.status_code >= 500
+    return isinstance(
+        error,
+        (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+            requests.exceptions.ChunkedEncodingError,
+            requests.exceptions.RetryError,
+        ),
+    )
+
+
+class RetryBudget:
+    """
+    リトライの総量をリクエスト数に対する割合で制限する
+
+    リクエストごとに ratio 分、リトライごとに 1 を消費するトークンバケットで、
+    urllib3、tenacity (get_id_token) と DataPersister のリトライで共有する。
+    API の障害時でもリトライの総数はリクエスト数の ratio 倍 + max_tokens に収まる。
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10.0) -> None:
+        """
+        Args:
+            ratio: リクエスト1回あたりに許容するリトライ回数
+            max_tokens: 蓄積できるリトライ回数の上限 (初期値)
+        """
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        """
+        残りのリトライ回数
+        """
+        return self._tokens
+
+    def deposit(self) -> None:
+        """
+        リクエストを記録する
+        """
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """
+        リトライを1回分消費する
+
+        Returns:
+            bool: リトライしてよいか
+        """
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class CircuitBreaker:
+    """
+    連続して失敗したエンドポイントへのリクエストを一定時間遮断する
+
+    closed: 通常状態。failure_threshold 回連続で失敗すると open に移る
+    open: reset_timeout 秒の間、before_call() は CircuitOpenError を送出する
+    half_open: reset_timeout 経過後、1件だけ試行を許可し、成功すれば closed、
+        失敗すれば再び open に戻る
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self, name: str = "", failure_threshold: int = 5, reset_timeout: float = 30.0
+    ) -> None:
+        """
+        Args:
+            name: 対象の名前 (エラーメッセージ用)
+            failure_threshold: open に移る連続失敗回数
+            reset_timeout: open を維持する秒数
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """
+        現在の状態
+        """
+        with self._lock:
+            if (
+                self._state == self.OPEN
+                and time.monotonic() - self._opened_at >= self.reset_timeout
+            ):
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """
+        リクエスト前に呼ぶ (遮断中の場合は CircuitOpenError を送出する)
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if remaining > 0:
+                raise CircuitOpenError(
+                    f"circuit for {self.name} is open (retry after {remaining:.1f}s)"
+                )
+            if self._probing:
+                raise CircuitOpenError(f"circuit for {self.name} is half-open")
+            self._state = self.HALF_OPEN
+            self._probing = True
+
+    def release(self) -> None:
+        """
+        結果を記録せずに終わった試行の half-open の枠を解放する
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        """
+        成功を記録する
+        """
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """
+        失敗を記録する
+        """
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if (
+                self._state == self.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class CircuitBreakerRegistry:
+    """
+    エンドポイントごとの CircuitBreaker を保持する
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        """
+        Args:
+            failure_threshold: open に移る連続失敗回数
+            reset_timeout: open を維持する秒数
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        """
+        エンドポイントの CircuitBreaker を取得 (存在しない場合は作成する)
+        """
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(
+                    name, self.failure_threshold, self.reset_timeout
+                )
+            return self._breakers[name]
+
+    def states(self) -> Dict[str, str]:
+        """
+        エンドポイントごとの状態
+        """
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {b.name: b.state for b in breakers}
+
+
+class BudgetedRetry(Retry):
+    """
+    RetryBudget を消費し、full jitter のバックオフで待つ urllib3 の Retry
+    """
+
+    def __init__(self, *args: Any, budget: Optional[RetryBudget] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.budget = budget
+
+    def new(self, **kw: Any) -> "BudgetedRetry":
+        retry = super().new(**kw)
+        retry.budget = self.budget
+        return retry
+
+    def get_backoff_time(self) -> float:
+        return random.uniform(0, super().get_backoff_time())
+
+    def increment(  # type: ignore[override]
+        self,
+        method: Optional[str] = None,
+        url: Optional[str] = None,
+        response: Any = None,
+        error: Optional[Exception] = None,
+        _pool: Any = None,
+        _stacktrace: Any = None,
+    ) -> "BudgetedRetry":
+        if self.budget is not None and not self.budget.withdraw():
+            reason = error or ResponseError("retry budget exhausted")
+            raise MaxRetryError(_pool, url, reason)
+        return super().increment(  # type: ignore[return-value]
+            method, url, response, error, _pool, _stacktrace
+        )
@@ -0,0 +1,186 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from jquantsapi.client import DatetimeLike
+
+UNIVERSE_ATTRIBUTE_COLUMNS = [
+    "CompanyName",
+    "CompanyNameEnglish",
+    "Sector17Code",
+    "Sector33Code",
+    "ScaleCategory",
+    "MarketCode",
+]
+
+# 区間が継続中であることを表す終了日
+_OPEN_END = np.iinfo(np.int64).max
+
+
+class ListedUniverse:
+    """
+    上場銘柄情報 (get_listed_info) のスナップショットから
+    銘柄ごとの属性の変化区間だけを保持する時点ユニバース
+
+    区間は [StartDate, EndDate) で表し、継続中の区間の EndDate は NaT とする。
+    日次スナップショットをそのまま積み上げる代わりに、業種・市場区分などの
+    属性が変わった時点でのみ区間を切り替える。
+
+    例:
+        universe = ListedUniverse.from_snapshots(
+            cli.get_listed_info(date_yyyymmdd=d) for d in dates
+        )
+        universe.as_of("2022-04-04")
+        universe.history("72030")
+    """
+
+    def __init__(self, attributes: Sequence[str] = UNIVERSE_ATTRIBUTE_COLUMNS) -> None:
+        """
+        Args:
+            attributes: 変化を記録する属性列
+        """
+        self.attributes = list(attributes)
+        self._closed: List[pd.DataFrame] = []
+        self._open = pd.DataFrame(columns=self.attributes + ["StartDate"])
+        self._open.index.name = "Code"
+        self._last_date: Optional[pd.Timestamp] = None
+        self._intervals: Optional[pd.DataFrame] = None
+        self._starts = np.empty(0, dtype=np.int64)
+        self._ends = np.empty(0, dtype=np.int64)
+        self._code_index: Optional[Dict[str, np.ndarray]] = None
+
+    @classmethod
+    def from_snapshots(
+        cls,
+        snapshots: Iterable[pd.DataFrame],
+        attributes: Sequence[str] = UNIVERSE_ATTRIBUTE_COLUMNS,
+    ) -> "ListedUniverse":
+        """
+        日付順のスナップショット群から作成
+
+        Args:
+            snapshots: get_listed_info の結果 (日付の昇順)
+            attributes: 変化を記録する属性列
+
+        Returns:
+            ListedUniverse: 作成したユニバース
+        """
+        universe = cls(attributes)
+        for snapshot in snapshots:
+            universe.add_snapshot(snapshot)
+        return universe
+
+    def add_snapshot(
+        self, df: pd.DataFrame, date: Optional[DatetimeLike] = None
+    ) -> None:
+        """
+        スナップショットを追加する
+
+        Args:
+            df: get_listed_info の結果
+            date: スナップショットの日付 (省略時は df の Date 列の最大値)
+        """
+        if date is None:
+            if len(df) == 0:
+                return
+            date = df["Date"].max()
+        ts = pd.Timestamp(date)
+        if self._last_date is not None and ts <= self._last_date:
+            raise ValueError(
+                f"snapshot date must be newer than {self._last_date.date()}: {ts.date()}"
+            )
+
+        snap = (
+            df[["Code"] + self.attributes]
+            .drop_duplicates("Code", keep="last")
+            .set_index("Code")
+            .fillna("")
+            .astype(str)
+        )
+        prev = self._open
+        common = prev.index.intersection(snap.index)
+        diff = (
+            prev.loc[common, self.attributes].to_numpy()
+            != snap.loc[common, self.attributes].to_numpy()
+        ).any(axis=1)
+        changed = common[diff]
+        closing = prev.index.difference(snap.index).union(changed)
+        opening = snap.index.difference(prev.index).union(changed)
+
+        if len(closing) > 0:
+            closed = prev.loc[closing].assign(EndDate=ts)
+            self._closed.append(closed.reset_index())
+        kept = prev.drop(closing)
+        if len(opening) > 0:
+            opened = snap.loc[opening].assign(StartDate=ts)
+            self._open = pd.concat([kept, opened]) if len(kept) > 0 else opened
+        else:
+            self._open = kept
+        self._open.index.name = "Code"
+        self._last_date = ts
+        self._intervals = None
+        self._code_index = None
+
+    @property
+    def intervals(self) -> pd.DataFrame:
+        """
+        全区間 (StartDate 列でソートされています)
+        """
+        if self._intervals is None:
+            cols = ["Code"] + self.attributes + ["StartDate", "EndDate"]
+            frames = [f[cols] for f in self._closed if len(f) > 0]
+            opened = self._open.reset_index()
+            if len(opened) > 0:
+                end = pd.Series(pd.NaT, index=opened.index, dtype="datetime64[ns]")
+                frames.append(opened.assign(EndDate=end)[cols])
+            if len(frames) == 0:
+                df = pd.DataFrame(columns=cols)
+            else:
+                df = pd.concat(frames, ignore_index=True)
+            df["StartDate"] = pd.to_datetime(df["StartDate"])
+            df["EndDate"] = pd.to_datetime(df["EndDate"])
+            df = df.sort_values(["StartDate", "Code"], kind="mergesort")
+            df = df.reset_index(drop=True)
+            self._closed = [df[df["EndDate"].notna()]]
+            self._intervals = df
+            self._starts = (
+                df["StartDate"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+            )
+            ends = df["EndDate"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+            self._ends = np.where(df["EndDate"].isna(), _OPEN_END, ends)
+        return self._intervals
+
+    def as_of(self, date: DatetimeLike) -> pd.DataFrame:
+        """
+        指定日時点の上場銘柄と属性を取得
+
+        Args:
+            date: 基準日
+
+        Returns:
+            pd.DataFrame: 上場銘柄 (Code列でソートされています)
+        """
+        intervals = self.intervals
+        t = pd.Timestamp(date).value
+        # 開始日でソート済みなので、開始日 <= t の範囲だけを二分探索で切り出す
+        n = np.searchsorted(self._starts, t, side="right")
+        mask = self._ends[:n] > t
+        df = intervals.iloc[:n][mask]
+        return df.sort_values("Code").reset_index(drop=True)
+
+    def history(self, code: str) -> pd.DataFrame:
+        """
+        銘柄の属性変化の履歴を取得
+
+        Args:
+            code: 銘柄コード
+
+        Returns:
+            pd.DataFrame: 区間 (StartDate列でソートされています)
+        """
+        intervals = self.intervals
+        if self._code_index is None:
+            self._code_index = intervals.groupby("Code", sort=False).indices
+        idx = self._code_index.get(code, np.empty(0, dtype=np.int64))
+        return intervals.iloc[idx].reset_index(drop=True)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+持久化数据压缩合并脚本
+将单日parquet文件按月合并为 {api}/year=YYYY/month=MM/{YYYYMM}.parquet，
+按Code和日期排序并写入row group统计信息，读取时可按日期和Code跳过文件和row group
+"""
+
+import argparse
+from datetime import date
+from pathlib import Path
+import yaml
+import sys
+
+# 添加项目根目录到路径
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scripts.utils.dataset_layout import compact_api
+from scripts.utils.logger import setup_logger
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='将单日数据文件按月合并')
+    parser.add_argument(
+        '--config',
+        type=str,
+        default='config/api_config.yaml',
+        help='API配置文件路径'
+    )
+    parser.add_argument(
+        '--data-dir',
+        type=str,
+        default='persistdata',
+        help='数据目录'
+    )
+    parser.add_argument(
+        '--apis',
+        nargs='+',
+        default=None,
+        help='要合并的API (默认: 配置中所有非静态API)'
+    )
+    parser.add_argument(
+        '--before',
+        type=str,
+        default=date.today().strftime('%Y%m'),
+        help='只合并早于该月的数据 (YYYYMM格式，默认当月，即当月数据保持单日文件)'
+    )
+    parser.add_argument(
+        '--keep-sources',
+        action='store_true',
+        help='合并后保留单日文件'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='试运行模式，只显示将要合并的月份'
+    )
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    logger = setup_logger()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+
+    apis = {name: api_config for name, api_config in config['apis'].items()
+            if not api_config.get('is_static', False)}
+    if args.apis:
+        apis = {name: apis[name] for name in args.apis if name in apis}
+
+    data_dir = Path(args.data_dir)
+    for api_name, api_config in apis.items():
+        api_dir = data_dir / api_config['output_dir']
+        if not api_dir.exists():
+            continue
+
+        results = compact_api(
+            api_dir,
+            api_name=api_name,
+            before_month=args.before,
+            remove_sources=not args.keep_sources,
+            dry_run=args.dry_run
+        )
+        for result in results:
+            if args.dry_run:
+                logger.info(f"[{api_name}] {result['month']}: 将合并 {result['daily_files']} 个文件 -> {result['file']}")
+            else:
+                logger.info(f"[{api_name}] {result['month']}: 合并 {result['daily_files']} 个文件，"
+                            f"共 {result['rows']} 条记录 -> {result['file']}")
+                if result.get('superseded'):
+                    logger.warning(f"[{api_name}] {result['month']}: 月文件没有日期列，"
+                                   f"{result['superseded']} 个已包含日期的单日文件未合并")
+        if not results:
+            logger.info(f"[{api_name}] 没有需要合并的文件")
+
+if __name__ == "__main__":
+    main()
@@ -6,23 +6,195 @@ J-Quants API 数据检查工具
 
 import argparse
 import logging
+import re
 import sys
 from pathlib import Path
 from datetime import datetime, date
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 import yaml
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 
 # 添加项目根目录到路径
 sys.path.append(str(Path(__file__).parent.parent))
 
 from scripts.utils.logger import setup_logger
+from scripts.utils.data_validator import DataValidator
+from scripts.utils.dataset_layout import (
+    compacted_dates, files_for_range, find_daily_files, load_manifest, locate_date
+)
+from scripts.utils.search_index import load_or_build_index, read_rows
+from scripts.utils.streaming_stats import DatasetStats, compute_file_stats, file_stats
+
+# 并行读取footer的线程数
+DEFAULT_SCAN_WORKERS = 16
+
+# 查询时并行读取的文件数
+DEFAULT_QUERY_WORKERS = 8
+
+# 不限开始/结束日期时使用的日期（不作为过滤条件）
+MIN_DATE = '00000000'
+MAX_DATE = '99999999'
+
+# 查询条件: 列名 运算符 值，例如 Code=7203、Close>=1000
+_CONDITION = re.compile(r'^\s*(\w+)\s*(>=|<=|!=|=|>|<)\s*(.*?)\s*$')
+
+# 4位代码同时匹配5位代码（末尾补0）的列
+CODE_COLUMNS = ('Code', 'LocalCode')
+
+def parse_condition(condition: str) -> Tuple[str, str, str]:
+    """解析查询条件 "列名 运算符 值" """
+    match = _CONDITION.match(condition)
+    if not match:
+        raise ValueError(f"无法解析查询条件: {condition} (示例: Code=7203, Close>=1000)")
+    return match.group(1), match.group(2), match.group(3)
+
+def _typed_value(value: str, arrow_type: pa.DataType) -> Any:
+    """将条件值转换为列的类型"""
+    if pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type):
+        return pd.Timestamp(value)
+    if pa.types.is_integer(arrow_type):
+        return int(value)
+    if pa.types.is_floating(arrow_type):
+        return float(value)
+    if pa.types.is_boolean(arrow_type):
+        return value.lower() in ('1', 'true', 'yes')
+    return value
+
+def scan_string_columns(df: pd.DataFrame, search_term: str,
+                        search_columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """在字符串列中逐列搜索（不区分大小写的部分匹配），不复制整个数据"""
+    columns = search_columns or list(df.columns)
+    mask = pd.Series(False, index=df.index)
+    for col in columns:
+        values = df[col]
+        if not (pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)
+                or isinstance(values.dtype, pd.CategoricalDtype)):
+            continue
+        try:
+            mask |= values.str.contains(search_term, case=False, regex=False, na=False).astype(bool)
+        except AttributeError:
+            # 不含字符串的object列（例如dict）
+            continue
+    return df[mask]
+
+def _is_string_type(arrow_type: pa.DataType) -> bool:
+    """Arrow类型是否为字符串（包括字典编码的字符串）"""
+    if pa.types.is_dictionary(arrow_type):
+        arrow_type = arrow_type.value_type
+    return pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type)
+
+def build_filter(schema: pa.Schema, conditions: List[Tuple[str, str, str]],
+                 date_column: Optional[str] = None, start_date: Optional[str] = None,
+                 end_date: Optional[str] = None) -> Optional[ds.Expression]:
+    """
+    按文件schema构建过滤表达式（用于row group统计信息裁剪）
+
+    Returns:
+        过滤表达式；条件列不存在于该文件时返回None表示整个文件都不匹配
+    """
+    expression = None
+    
+    def combine(item: ds.Expression):
+        nonlocal expression
+        expression = item if expression is None else expression & item
+    
+    if date_column and date_column in schema.names:
+        arrow_type = schema.field(date_column).type
+        is_string = not (pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type))
+        
+        def date_value(value: str) -> Any:
+            return f"{value[:4]}-{value[4:6]}-{value[6:8]}" if is_string else pd.Timestamp(value)
+        
+        # 不限的一端不加条件（MIN_DATE/MAX_DATE无法转换为Timestamp）
+        if start_date and start_date > MIN_DATE:
+            combine(ds.field(date_column) >= date_value(start_date))
+        if end_date and end_date < MAX_DATE:
+            combine(ds.field(date_column) <= date_value(end_date))
+    
+    for column, op, raw_value in conditions:
+        if column not in schema.names:
+            return None
+        arrow_type = schema.field(column).type
+        field = ds.field(column)
+        if op == '=' and column in CODE_COLUMNS and len(raw_value) == 4:
+            combine(field.isin([raw_value, raw_value + '0']))
+            continue
+        value = _typed_value(raw_value, arrow_type)
+        if op == '=':
+            combine(field == value)
+        elif op == '!=':
+            combine(field != value)
+        elif op == '>=':
+            combine(field >= value)
+        elif op == '<=':
+            combine(field <= value)
+        elif op == '>':
+            combine(field > value)
+        else:
+            combine(field < value)
+    
+    return expression if expression is not None else ds.scalar(True)
+
+def parse_date_spec(date_str: str) -> Tuple[str, str]:
+    """解析日期参数：YYYYMMDD、YYYYMMDD-YYYYMMDD 或 all，返回 (开始日期, 结束日期)"""
+    if date_str == 'all':
+        return MIN_DATE, MAX_DATE
+    if '-' in date_str:
+        start_date, end_date = date_str.split('-', 1)
+        return start_date, end_date
+    return date_str, date_str
+
+def read_parquet_footer(file_path: Path) -> Dict[str, Any]:
+    """只读取parquet footer：行数、schema、row group统计信息和压缩前后大小"""
+    metadata = pq.ParquetFile(file_path).metadata
+    schema = metadata.schema.to_arrow_schema()
+    
+    row_groups = []
+    compressed = 0
+    uncompressed = 0
+    for i in range(metadata.num_row_groups):
+        row_group = metadata.row_group(i)
+        stats = {}
+        for j in range(row_group.num_columns):
+            column = row_group.column(j)
+            compressed += column.total_compressed_size
+            uncompressed += column.total_uncompressed_size
+            if column.is_stats_set:
+                statistics = column.statistics
+                stats[column.path_in_schema] = {
+                    'min': statistics.min if statistics.has_min_max else None,
+                    'max': statistics.max if statistics.has_min_max else None,
+                    'null_count': statistics.null_count,
+                }
+        row_groups.append({'rows': row_group.num_rows, 'statistics': stats})
+    
+    file_size = file_path.stat().st_size
+    return {
+        "file_path": str(file_path),
+        "file_size_mb": round(file_size / (1024 * 1024), 2),
+        "file_size_bytes": file_size,
+        "rows": metadata.num_rows,
+        "columns": schema.names,
+        "dtypes": {field.name: str(field.type) for field in schema},
+        "row_groups": metadata.num_row_groups,
+        "row_group_stats": row_groups,
+        "compressed_bytes": compressed,
+        "uncompressed_bytes": uncompressed,
+        "uncompressed_size_mb": round(uncompressed / (1024 * 1024), 2),
+        "shape": (metadata.num_rows, len(schema.names))
+    }
 
 class DataInspector:
     def __init__(self, data_dir: str = "persistdata", config_path: str = "config/api_config.yaml"):
         self.data_dir = Path(data_dir)
         self.config = self._load_config(config_path)
         self.logger = setup_logger()
+        self.validator = DataValidator(self.logger, sample_rows=self.config.get('global', {}).get('validation_sample_rows'))
         
         if not self.data_dir.exists():
             raise FileNotFoundError(f"数据目录不存在: {self.data_dir}")
@@ -50,39 +222,42 @@ class DataInspector:
         if not api_dir.exists():
             return []
         
-        dates = []
-        for file_path in api_dir.glob("*.parquet"):
-            date_str = file_path.stem
-            if date_str.isdigit() and len(date_str) == 8:
-                dates.append(date_str)
+        # 单日文件（flat和hive布局）以及已按月合并的日期
+        dates = set(find_daily_files(api_dir)) | set(compacted_dates(api_dir))
         
         return sorted(dates, reverse=True)
     
-    def get_file_info(self, api_name: str, date_str: str) -> Dict[str, Any]:
-        """获取文件信息"""
-        file_path = self.data_dir / api_name / f"{date_str}.parquet"
+    def _locate(self, api_name: str, date_str: str) -> Tuple[Path, Optional[List[Tuple[str, str, Any]]]]:
+        """查找某日数据所在文件，合并后的月文件同时返回按日期过滤的条件"""
+        api_dir = self.data_dir / api_name
+        located = locate_date(api_dir, date_str)
+        if located is None:
+            raise FileNotFoundError(f"文件不存在: {api_dir / f'{date_str}.parquet'}")
         
-        if not file_path.exists():
-            return {"error": f"文件不存在: {file_path}"}
+        file_path, date_column = located
+        if date_column is None:
+            return file_path, None
         
+        if pa.types.is_timestamp(pq.read_schema(file_path).field(date_column).type):
+            value: Any = pd.Timestamp(date_str)
+        else:
+            value = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
+        return file_path, [(date_column, '=', value)]
+    
+    def get_file_info(self, api_name: str, date_str: str) -> Dict[str, Any]:
+        """获取文件信息（只读取parquet footer，不解码数据）"""
         try:
-            # 获取文件大小
-            file_size = file_path.stat().st_size
-            file_size_mb = file_size / (1024 * 1024)
-            
-            # 读取parquet文件元数据（不加载全部数据）
-            parquet_file = pd.read_parquet(file_path, engine='pyarrow')
-            
-            info = {
-                "file_path": str(file_path),
-                "file_size_mb": round(file_size_mb, 2),
-                "file_size_bytes": file_size,
-                "rows": len(parquet_file),
-                "columns": list(parquet_file.columns),
-                "dtypes": parquet_file.dtypes.to_dict(),
-                "memory_usage_mb": round(parquet_file.memory_usage(deep=True).sum() / (1024 * 1024), 2),
-                "shape": parquet_file.shape
-            }
+            file_path, filters = self._locate(api_name, date_str)
+        except FileNotFoundError as e:
+            return {"error": str(e)}
+        
+        try:
+            info = read_parquet_footer(file_path)
+            if filters:
+                # 合并后的月文件：只读取日期列统计该日行数
+                info["file_rows"] = info["rows"]
+                info["rows"] = pq.read_table(file_path, columns=[filters[0][0]], filters=filters).num_rows
+                info["shape"] = (info["rows"], len(info["columns"]))
             
             # 添加配置信息
             if api_name in self.config.get('apis', {}):
@@ -98,23 +273,69 @@ class DataInspector:
         except Exception as e:
             return {"error": f"读取文件失败: {str(e)}"}
     
+    def get_schema(self, api_name: str, date_str: str) -> pa.Schema:
+        """获取文件schema（只读取footer）"""
+        file_path, _ = self._locate(api_name, date_str)
+        return pq.read_schema(file_path)
+    
+    def list_files(self, api_name: str) -> List[Path]:
+        """列出API目录下的所有parquet文件（单日文件和合并后的月文件）"""
+        api_dir = self.data_dir / api_name
+        if not api_dir.exists():
+            return []
+        return sorted(api_dir.glob("*.parquet")) + sorted(api_dir.glob("year=*/month=*/*.parquet"))
+    
+    def scan_files(self, api_names: Optional[List[str]] = None,
+                   max_workers: int = DEFAULT_SCAN_WORKERS) -> Dict[str, List[Dict[str, Any]]]:
+        """并行读取所有文件的footer，返回 {api: [文件信息]}"""
+        api_names = api_names or self.list_available_apis()
+        files = [(api_name, path) for api_name in api_names for path in self.list_files(api_name)]
+        
+        results: Dict[str, List[Dict[str, Any]]] = {api_name: [] for api_name in api_names}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(read_parquet_footer, path): api_name for api_name, path in files}
+            for future in as_completed(futures):
+                try:
+                    info = future.result()
+                except Exception as e:
+                    info = {"error": f"读取文件失败: {str(e)}"}
+                results[futures[future]].append(info)
+        
+        for infos in results.values():
+            infos.sort(key=lambda info: info.get('file_path', ''))
+        return results
+    
+    def summarize_apis(self, api_names: Optional[List[str]] = None,
+                       max_workers: int = DEFAULT_SCAN_WORKERS) -> Dict[str, Dict[str, Any]]:
+        """按API汇总文件数、行数和大小（只读取footer）"""
+        summary = {}
+        for api_name, infos in self.scan_files(api_names, max_workers).items():
+            ok = [info for info in infos if 'error' not in info]
+            summary[api_name] = {
+                'files': len(infos),
+                'errors': len(infos) - len(ok),
+                'rows': sum(info['rows'] for info in ok),
+                'row_groups': sum(info['row_groups'] for info in ok),
+                'file_size_bytes': sum(info['file_size_bytes'] for info in ok),
+                'compressed_bytes': sum(info['compressed_bytes'] for info in ok),
+                'uncompressed_bytes': sum(info['uncompressed_bytes'] for info in ok),
+            }
+        return summary
+    
     def read_data(self, api_name: str, date_str: str, 
                   head_rows: Optional[int] = None, 
                   tail_rows: Optional[int] = None,
                   sample_rows: Optional[int] = None,
                   columns: Optional[List[str]] = None) -> pd.DataFrame:
         """读取数据"""
-        file_path = self.data_dir / api_name / f"{date_str}.parquet"
-        
-        if not file_path.exists():
-            raise FileNotFoundError(f"文件不存在: {file_path}")
+        file_path, filters = self._locate(api_name, date_str)
         
         try:
-            # 读取数据
+            # 读取数据（合并后的月文件按日期过滤row group）
             if columns:
-                df = pd.read_parquet(file_path, columns=columns)
+                df = pd.read_parquet(file_path, columns=columns, filters=filters)
             else:
-                df = pd.read_parquet(file_path)
+                df = pd.read_parquet(file_path, filters=filters)
             
             # 应用行数限制
             if head_rows is not None:
@@ -131,60 +352,184 @@ class DataInspector:
     
     def search_data(self, api_name: str, date_str: str, 
                    search_term: str, search_columns: Optional[List[str]] = None) -> pd.DataFrame:
-        """搜索数据"""
-        df = self.read_data(api_name, date_str)
-        
-        if search_columns:
-            # 在指定列中搜索
-            mask = df[search_columns].astype(str).apply(
-                lambda x: x.str.contains(search_term, case=False, na=False)
-            ).any(axis=1)
+        """
+        搜索数据
+
+        date_str 可以是单个日期 (YYYYMMDD) 或日期范围 (YYYYMMDD-YYYYMMDD)。
+        在所有字符串列（或指定的列）中不区分大小写地部分匹配：已建立索引的列使用索引
+        （公司名n-gram索引，代码在不同的代码中匹配），其余字符串列只读取这些列逐列扫描，结果取并集
+        """
+        if '-' in date_str:
+            start_date, end_date = date_str.split('-', 1)
+            files = files_for_range(self.data_dir / api_name, start_date, end_date)
         else:
-            # 在所有列中搜索
-            mask = df.astype(str).apply(
-                lambda x: x.str.contains(search_term, case=False, na=False)
-            ).any(axis=1)
+            start_date = end_date = date_str
+            file_path, filters = self._locate(api_name, date_str)
+            files = [(file_path, filters[0][0] if filters else None)]
+        
+        with ThreadPoolExecutor(max_workers=DEFAULT_QUERY_WORKERS) as executor:
+            frames = list(executor.map(
+                lambda item: self._search_file(item[0], item[1], start_date, end_date, search_term, search_columns),
+                files
+            ))
+        frames = [df for df in frames if not df.empty]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+    
+    def _search_file(self, file_path: Path, date_column: Optional[str], start_date: str, end_date: str,
+                     search_term: str, search_columns: Optional[List[str]]) -> pd.DataFrame:
+        """在单个文件中搜索（合并后的月文件按日期列过滤）"""
+        index = load_or_build_index(file_path)
+        schema = pq.read_schema(file_path)
+        columns = [col for col in (search_columns or schema.names) if col in schema.names]
+        
+        matches = []
+        indexed = [col for col in columns if col in index.columns]
+        if indexed:
+            matches.append(index.lookup(search_term, indexed))
+            matches.append(index.contains(search_term, indexed))
+        scanned = [col for col in columns if col not in index.columns and _is_string_type(schema.field(col).type)]
+        if scanned:
+            data = pq.read_table(file_path, columns=scanned).to_pandas()
+            matches.append(scan_string_columns(data, search_term).index.to_numpy(dtype=np.int64))
+        rows = np.unique(np.concatenate(matches)) if matches else np.array([], dtype=np.int64)
+        df = read_rows(file_path, rows)
+        
+        if date_column and not df.empty:
+            dates = df[date_column]
+            if not pd.api.types.is_datetime64_any_dtype(dates):
+                dates = pd.to_datetime(dates.astype(str).str.replace('-', '', regex=False).str[:8],
+                                       format='%Y%m%d', errors='coerce')
+            keys = dates.dt.strftime('%Y%m%d')
+            df = df[(keys >= start_date) & (keys <= end_date)]
+        return df
+    
+    def iter_query(self, api_name: str, start_date: str, end_date: str,
+                   columns: Optional[List[str]] = None, where: Optional[List[str]] = None,
+                   max_workers: int = DEFAULT_QUERY_WORKERS) -> Iterator[pd.DataFrame]:
+        """
+        跨日期查询，按文件日期顺序逐块返回结果
+
+        先按文件名和manifest跳过日期范围外的文件，再按条件和row group统计信息跳过row group，
+        只读取需要的列。多个文件并行读取，同时在内存中的结果最多为 max_workers 个文件
+        """
+        conditions = [parse_condition(condition) for condition in (where or [])]
+        files = files_for_range(self.data_dir / api_name, start_date, end_date)
         
-        return df[mask]
+        def read(file_path: Path, date_column: Optional[str]) -> pd.DataFrame:
+            schema = pq.read_schema(file_path)
+            expression = build_filter(schema, conditions, date_column, start_date, end_date)
+            if expression is None:
+                return pd.DataFrame()
+            read_columns = [col for col in columns if col in schema.names] if columns else None
+            dataset = ds.dataset(file_path, format='parquet')
+            return dataset.to_table(columns=read_columns, filter=expression).to_pandas()
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending: List[Any] = []
+            try:
+                for file_path, date_column in files:
+                    pending.append(executor.submit(read, file_path, date_column))
+                    if len(pending) >= max_workers:
+                        df = pending.pop(0).result()
+                        if not df.empty:
+                            yield df
+                while pending:
+                    df = pending.pop(0).result()
+                    if not df.empty:
+                        yield df
+            finally:
+                # 提前停止读取时取消尚未开始的文件
+                for future in pending:
+                    future.cancel()
+    
+    def query(self, api_name: str, start_date: str, end_date: str,
+              columns: Optional[List[str]] = None, where: Optional[List[str]] = None,
+              max_workers: int = DEFAULT_QUERY_WORKERS) -> pd.DataFrame:
+        """跨日期查询，返回合并后的结果"""
+        frames = list(self.iter_query(api_name, start_date, end_date, columns, where, max_workers))
+        if not frames:
+            return pd.DataFrame(columns=columns or [])
+        return pd.concat(frames, ignore_index=True)
     
-    def get_summary_stats(self, api_name: str, date_str: str) -> Dict[str, Any]:
-        """获取数据摘要统计"""
-        df = self.read_data(api_name, date_str)
+    def _files_for_spec(self, api_name: str, date_str: str) -> List[Tuple[Path, Optional[ds.Expression]]]:
+        """
+        日期范围内的文件
         
-        if df.empty:
+        Returns:
+            [(文件路径, 过滤条件)]。合并后的月文件只有部分日期在范围内时返回按日期过滤的条件，否则为None
+        """
+        api_dir = self.data_dir / api_name
+        start_date, end_date = parse_date_spec(date_str)
+        files = files_for_range(api_dir, start_date, end_date)
+        if not files:
+            raise FileNotFoundError(f"文件不存在: {api_dir / f'{date_str}.parquet'}")
+        
+        manifest = load_manifest(api_dir)['files']
+        result = []
+        for file_path, date_column in files:
+            row_filter = None
+            if date_column:
+                entry = manifest.get(file_path.relative_to(api_dir).as_posix(), {})
+                if not (start_date <= entry.get('min_date', '') and entry.get('max_date', '') <= end_date):
+                    row_filter = build_filter(pq.read_schema(file_path), [], date_column, start_date, end_date)
+            result.append((file_path, row_filter))
+        return result
+    
+    def get_summary_stats(self, api_name: str, date_str: str,
+                          max_workers: int = DEFAULT_SCAN_WORKERS) -> Dict[str, Any]:
+        """
+        获取数据摘要统计
+
+        date_str 可以是单个日期 (YYYYMMDD)、日期范围 (YYYYMMDD-YYYYMMDD) 或 all（整个数据集）。
+        每次只读取一个row group并合并统计量，多个文件并行计算；
+        整个文件的统计量按内容哈希缓存，只统计合并文件中部分日期时不使用缓存
+        """
+        files = self._files_for_spec(api_name, date_str)
+        
+        def compute(item: Tuple[Path, Optional[ds.Expression]]) -> DatasetStats:
+            file_path, row_filter = item
+            if row_filter is not None:
+                return compute_file_stats(file_path, row_filter)
+            return file_stats(file_path)
+        
+        total = DatasetStats()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for stats in executor.map(compute, files):
+                total.merge(stats)
+        
+        if total.rows == 0:
             return {"error": "数据为空"}
         
-        # 数值列统计
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        numeric_stats = {}
-        for col in numeric_cols:
-            numeric_stats[col] = {
-                'count': df[col].count(),
-                'mean': df[col].mean(),
-                'std': df[col].std(),
-                'min': df[col].min(),
-                'max': df[col].max(),
-                'null_count': df[col].isnull().sum()
-            }
+        summary = total.summary()
+        summary['files'] = len(files)
+        return summary
+    
+    def validate_data(self, api_name: str, date_str: str,
+                      max_workers: int = DEFAULT_SCAN_WORKERS) -> Dict[str, Any]:
+        """
+        验证已持久化的数据
         
-        # 分类列统计
-        categorical_cols = df.select_dtypes(include=['object', 'category']).columns
-        categorical_stats = {}
-        for col in categorical_cols:
-            value_counts = df[col].value_counts()
-            categorical_stats[col] = {
-                'unique_count': df[col].nunique(),
-                'null_count': df[col].isnull().sum(),
-                'top_values': value_counts.head(5).to_dict()
-            }
+        date_str 可以是单个日期、日期范围或 all。整个文件的验证结果保存为 {file}.validation.json，
+        文件内容和验证规则未变化时直接使用，不读取数据
+        """
+        files = self._files_for_spec(api_name, date_str)
+        
+        def validate(item: Tuple[Path, Optional[ds.Expression]]) -> Tuple[bool, List[str]]:
+            file_path, row_filter = item
+            if row_filter is not None:
+                data = pq.read_table(file_path, filter=row_filter).to_pandas()
+                return self.validator.validate_api_data(api_name, data)
+            return self.validator.validate_file(api_name, file_path)
+        
+        invalid = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for (file_path, _), (is_valid, errors) in zip(files, executor.map(validate, files)):
+                if not is_valid:
+                    invalid.append({'file': str(file_path), 'errors': errors})
         
-        return {
-            'total_rows': len(df),
-            'total_columns': len(df.columns),
-            'numeric_columns': numeric_stats,
-            'categorical_columns': categorical_stats,
-            'memory_usage_mb': round(df.memory_usage(deep=True).sum() / (1024 * 1024), 2)
-        }
+        return {'files': len(files), 'valid': len(files) - len(invalid), 'invalid': invalid}
 
 def format_file_info(info: Dict[str, Any]) -> str:
     """格式化文件信息输出"""
@@ -196,7 +541,10 @@ def format_file_info(info: Dict[str, Any]) -> str:
     output.append(f"📊 文件大小: {info['file_size_mb']} MB")
     output.append(f"📈 数据行数: {info['rows']:,}")
     output.append(f"🔢 数据列数: {info['shape'][1]}")
-    output.append(f"💾 内存占用: {info['memory_usage_mb']} MB")
+    output.append(f"💾 解压后大小: {info['uncompressed_size_mb']} MB")
+    output.append(f"🧱 Row group数: {info['row_groups']}")
+    if 'file_rows' in info:
+        output.append(f"🗂 所在月文件行数: {info['file_rows']:,}")
     
     if 'api_config' in info:
         config = info['api_config']
@@ -210,6 +558,18 @@ def format_file_info(info: Dict[str, Any]) -> str:
     
     return '\n'.join(output)
 
+def format_api_summary(summary: Dict[str, Dict[str, Any]]) -> str:
+    """格式化API汇总输出"""
+    output = []
+    for api_name, api_summary in summary.items():
+        output.append(f"📁 {api_name}: {api_summary['files']} 个文件, {api_summary['rows']:,} 行, "
+                      f"{api_summary['row_groups']} 个row group")
+        output.append(f"    文件大小: {api_summary['file_size_bytes'] / (1024 * 1024):.2f} MB, "
+                      f"解压后: {api_summary['uncompressed_bytes'] / (1024 * 1024):.2f} MB")
+        if api_summary['errors']:
+            output.append(f"    ❌ 读取失败: {api_summary['errors']} 个文件")
+    return '\n'.join(output)
+
 def format_summary_stats(stats: Dict[str, Any]) -> str:
     """格式化摘要统计输出"""
     if 'error' in stats:
@@ -219,7 +579,9 @@ def format_summary_stats(stats: Dict[str, Any]) -> str:
     output.append(f"📊 数据摘要统计")
     output.append(f"总行数: {stats['total_rows']:,}")
     output.append(f"总列数: {stats['total_columns']}")
-    output.append(f"内存占用: {stats['memory_usage_mb']} MB")
+    if stats.get('files', 1) > 1:
+        output.append(f"文件数: {stats['files']}")
+    output.append(f"解压后大小: {stats['uncompressed_size_mb']} MB")
     
     if stats['numeric_columns']:
         output.append(f"\n🔢 数值列统计 ({len(stats['numeric_columns'])} 列):")
@@ -234,9 +596,11 @@ def format_summary_stats(stats: Dict[str, Any]) -> str:
         output.append(f"\n📝 分类列统计 ({len(stats['categorical_columns'])} 列):")
         for col, col_stats in list(stats['categorical_columns'].items())[:5]:
             output.append(f"  {col}:")
-            output.append(f"    唯一值: {col_stats['unique_count']}")
+            approx = '约' if col_stats.get('approximate') else ''
+            output.append(f"    唯一值: {approx}{col_stats['unique_count']}")
             output.append(f"    空值: {col_stats['null_count']}")
-            output.append(f"    前5个值: {dict(list(col_stats['top_values'].items())[:5])}")
+            approx_top = '（近似计数）' if col_stats.get('top_values_approximate') else ''
+            output.append(f"    前5个值{approx_top}: {dict(list(col_stats['top_values'].items())[:5])}")
     
     return '\n'.join(output)
 
@@ -252,9 +616,16 @@ def main():
   # 列出指定API的可用日期
   python scripts/inspect_data.py --list-dates daily_quotes
   
-  # 查看文件信息
+  # 查看文件信息（只读取footer）
   python scripts/inspect_data.py --info daily_quotes 20240501
   
+  # 查看文件schema
+  python scripts/inspect_data.py --schema daily_quotes 20240501
+  
+  # 并行扫描所有API（或指定API）的文件数、行数和大小
+  python scripts/inspect_data.py --scan
+  python scripts/inspect_data.py --scan daily_quotes statements --workers 32
+  
   # 读取数据（前10行）
   python scripts/inspect_data.py --read daily_quotes 20240501 --head 10
   
@@ -267,8 +638,17 @@ def main():
   # 搜索数据
   python scripts/inspect_data.py --search daily_quotes 20240501 "7203" --columns Code
   
-  # 获取摘要统计
+  # 获取摘要统计（单日、日期范围或整个数据集）
   python scripts/inspect_data.py --stats daily_quotes 20240501
+  python scripts/inspect_data.py --stats daily_quotes 20240101-20241231
+  python scripts/inspect_data.py --stats daily_quotes all --workers 32
+  
+  # 验证已持久化的数据（文件未变化时使用已保存的验证结果）
+  python scripts/inspect_data.py --validate daily_quotes 20240101-20241231
+  
+  # 跨日期查询（只读取需要的列和row group）
+  python scripts/inspect_data.py --query daily_quotes --from 20240101 --to 20241231 --columns Date Code Close --where Code=7203
+  python scripts/inspect_data.py --query daily_quotes --from 20240101 --to 20240131 --where "Close>=10000" --output result.csv
   
   # 指定数据目录和配置文件
   python scripts/inspect_data.py --data-dir /path/to/data --config /path/to/config.yaml --list-apis
@@ -289,12 +669,20 @@ def main():
                       help='列出指定API的可用日期')
     group.add_argument('--info', nargs=2, metavar=('API_NAME', 'DATE'),
                       help='显示指定API和日期的文件信息')
+    group.add_argument('--schema', nargs=2, metavar=('API_NAME', 'DATE'),
+                      help='显示指定API和日期的文件schema')
+    group.add_argument('--scan', nargs='*', metavar='API_NAME',
+                      help='并行读取footer，汇总各API的文件数、行数和大小 (默认: 所有API)')
     group.add_argument('--read', nargs=2, metavar=('API_NAME', 'DATE'),
                       help='读取指定API和日期的数据')
     group.add_argument('--search', nargs=3, metavar=('API_NAME', 'DATE', 'SEARCH_TERM'),
                       help='搜索指定API和日期的数据')
     group.add_argument('--stats', nargs=2, metavar=('API_NAME', 'DATE'),
-                      help='获取指定API和日期的摘要统计')
+                      help='获取指定API和日期的摘要统计 (DATE可以是YYYYMMDD、YYYYMMDD-YYYYMMDD或all)')
+    group.add_argument('--validate', nargs=2, metavar=('API_NAME', 'DATE'),
+                      help='验证指定API和日期的数据 (DATE可以是YYYYMMDD、YYYYMMDD-YYYYMMDD或all)')
+    group.add_argument('--query', type=str, metavar='API_NAME',
+                      help='跨日期查询指定API的数据 (配合 --from/--to/--columns/--where)')
     
     # 读取选项
     parser.add_argument('--head', type=int, metavar='ROWS',
@@ -310,6 +698,18 @@ def main():
     parser.add_argument('--search-columns', nargs='+', metavar='COLUMN',
                        help='指定要搜索的列名')
     
+    # 查询选项
+    parser.add_argument('--from', dest='from_date', type=str, metavar='DATE',
+                       help='查询开始日期 (YYYYMMDD格式，默认: 不限)')
+    parser.add_argument('--to', dest='to_date', type=str, metavar='DATE',
+                       help='查询结束日期 (YYYYMMDD格式，默认: 不限)')
+    parser.add_argument('--where', nargs='+', metavar='CONDITION',
+                       help='查询条件，多个条件为AND (例如: Code=7203 "Close>=1000")，4位代码同时匹配5位代码')
+    
+    # 扫描选项
+    parser.add_argument('--workers', type=int,
+                       help=f'并行读取的线程数 (默认: --query为{DEFAULT_QUERY_WORKERS}，其他为{DEFAULT_SCAN_WORKERS})')
+    
     # 输出选项
     parser.add_argument('--output', type=str, metavar='FILE',
                        help='将结果输出到文件 (CSV格式)')
@@ -321,6 +721,7 @@ def main():
     try:
         # 创建检查器
         inspector = DataInspector(args.data_dir, args.config)
+        scan_workers = args.workers or DEFAULT_SCAN_WORKERS
         
         # 执行相应操作
         if args.list_apis:
@@ -345,6 +746,15 @@ def main():
             info = inspector.get_file_info(api_name, date_str)
             print(format_file_info(info))
         
+        elif args.schema:
+            api_name, date_str = args.schema
+            print(f"📋 {api_name} ({date_str}) schema:")
+            print(inspector.get_schema(api_name, date_str).to_string(show_schema_metadata=False))
+        
+        elif args.scan is not None:
+            summary = inspector.summarize_apis(args.scan or None, max_workers=scan_workers)
+            print(format_api_summary(summary))
+        
         elif args.read:
             api_name, date_str = args.read
             df = inspector.read_data(
@@ -386,9 +796,46 @@ def main():
         
         elif args.stats:
             api_name, date_str = args.stats
-            stats = inspector.get_summary_stats(api_name, date_str)
+            stats = inspector.get_summary_stats(api_name, date_str, max_workers=scan_workers)
             print(format_summary_stats(stats))
         
+        elif args.validate:
+            api_name, date_str = args.validate
+            result = inspector.validate_data(api_name, date_str, max_workers=scan_workers)
+            mark = '✅' if not result['invalid'] else '⚠️'
+            print(f"{mark} {api_name} ({date_str}): {result['valid']}/{result['files']} 个文件验证通过")
+            for item in result['invalid']:
+                print(f"❌ {item['file']}:")
+                for error in item['errors']:
+                    print(f"    {error}")
+        
+        elif args.query:
+            chunks = inspector.iter_query(
+                args.query, args.from_date or MIN_DATE, args.to_date or MAX_DATE,
+                columns=args.columns, where=args.where, max_workers=args.workers or DEFAULT_QUERY_WORKERS
+            )
+            total_rows = 0
+            preview = []
+            for df in chunks:
+                if args.head is not None:
+                    df = df.head(args.head - total_rows)
+                if args.output:
+                    # 逐块追加写入，不在内存中保留全部结果
+                    df.to_csv(args.output, index=False, encoding='utf-8',
+                              mode='w' if total_rows == 0 else 'a', header=total_rows == 0)
+                elif sum(len(p) for p in preview) < 20:
+                    preview.append(df)
+                total_rows += len(df)
+                if args.head is not None and total_rows >= args.head:
+                    break
+            
+            if args.output:
+                print(f"💾 查询结果已保存到: {args.output} ({total_rows:,} 行)")
+            else:
+                print(f"🔎 {args.query} 查询结果: {total_rows:,} 行")
+                if preview:
+                    print(pd.concat(preview, ignore_index=True).to_string(max_rows=20, max_cols=10))
+        
     except Exception as e:
         print(f"❌ 错误: {str(e)}")
         sys.exit(1)
@@ -21,6 +21,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from scripts.utils.data_persister import DataPersister
 from scripts.utils.logger import setup_logger
+from scripts.utils.request_planner import record_request_history
 
 def parse_args():
     parser = argparse.ArgumentParser(description='J-Quants API 数据持久化')
@@ -80,6 +81,12 @@ def main():
     except Exception as e:
         logger.error(f"数据持久化失败: {e}")
         raise
+    finally:
+        # 保存各端点的分页数和耗时，供请求规划使用
+        try:
+            record_request_history(Path(args.output_dir), persister.api_client.request_stats())
+        except Exception as e:
+            logger.warning(f"保存请求统计失败: {e}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
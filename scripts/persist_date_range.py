@@ -13,7 +13,9 @@ import sys
 import os
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+import yaml
 
 # 抑制pandas FutureWarning关于DataFrame连接的警告
 warnings.filterwarnings("ignore", category=FutureWarning, 
@@ -23,7 +25,11 @@ warnings.filterwarnings("ignore", category=FutureWarning,
 sys.path.append(str(Path(__file__).parent.parent))
 
 from scripts.utils.logger import setup_logger
+from scripts.utils.api_client import JQuantsAPIClient
+from scripts.utils.data_persister import DataPersister
 from scripts.persist_data import main as persist_single_date
+from scripts.utils.request_planner import RequestPlanner, format_plan, plan_allows, record_request_history
+from scripts.utils.job_journal import JOURNAL_FILE, JobJournal
 
 
 def persist_date_range_worker(args: Tuple[str, str, dict]) -> Tuple[str, str, bool, str]:
@@ -34,16 +40,19 @@ def persist_date_range_worker(args: Tuple[str, str, dict]) -> Tuple[str, str, bo
         # 设置日志
         logger = logging.getLogger(f"persist_{start_date}_{end_date}")
         
-        # 直接导入并使用DataPersister，避免修改sys.argv
-        from scripts.utils.data_persister import DataPersister
-        from scripts.utils.logger import setup_logger
-        
-        # 创建持久化器
-        persister = DataPersister(
-            config_path=config['config_path'],
-            output_dir=config['output_dir'],
-            logger=logger
-        )
+        # 所有chunk共享main中创建的持久化器（配置文件只读取一次，验证计划和结果缓存在chunk之间复用）
+        persister = config.get('persister')
+        if persister is None:
+            persister = DataPersister(
+                config_path=config['config_path'],
+                output_dir=config['output_dir'],
+                logger=logger,
+                rate_limit=config.get('rate_limit'),
+                rate_limit_file=config.get('rate_limit_file'),
+                api_client=config.get('api_client'),
+                layout=config.get('layout'),
+                journal=config.get('journal')
+            )
         
         # 执行批量持久化
         results = persister.persist_data_for_date_range(start_date, end_date, retry_failed=False)
@@ -54,14 +63,83 @@ def persist_date_range_worker(args: Tuple[str, str, dict]) -> Tuple[str, str, bo
             return start_date, end_date, False, error_msg
         else:
             success_msg = f"成功处理 {len(results['success'])} 个API，跳过 {len(results['skipped'])} 个"
-            if results['api_calls_saved'] > 0:
-                success_msg += f"，节省 {results['api_calls_saved']} 次API调用"
             return start_date, end_date, True, success_msg
         
     except Exception as e:
         return start_date, end_date, False, str(e)
 
 
+def run_chunks(date_chunks: List[Tuple[str, str]], config: dict, max_workers: int,
+               logger: logging.Logger) -> Tuple[int, List[Tuple[Tuple[str, str], str]]]:
+    """处理日期范围chunks，返回 (成功的chunk数, [((开始日期, 结束日期), 错误信息)])"""
+    success_count = 0
+    failed_chunks = []
+    
+    def handle(start_date, end_date, success, message):
+        nonlocal success_count
+        if success:
+            success_count += 1
+            logger.info(f"日期范围 {start_date} - {end_date} 处理成功: {message}")
+        else:
+            failed_chunks.append(((start_date, end_date), message))
+            logger.error(f"日期范围 {start_date} - {end_date} 处理失败: {message}")
+    
+    if max_workers == 1:
+        # 单线程执行
+        logger.info("使用单线程模式执行")
+        for start_date, end_date in date_chunks:
+            logger.info(f"处理日期范围: {start_date} - {end_date}")
+            handle(*persist_date_range_worker((start_date, end_date, config)))
+    else:
+        # 多线程执行
+        logger.info(f"使用多线程模式执行，最大线程数: {max_workers}")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(persist_date_range_worker, (start_date, end_date, config))
+                       for start_date, end_date in date_chunks]
+            for future in as_completed(futures):
+                handle(*future.result())
+    
+    return success_count, failed_chunks
+
+
+def persisted_apis(config_path: str) -> List[str]:
+    """持久化时会处理的API（已启用且 plan_required 不高于 global.user_plan）"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        api_config = yaml.safe_load(f)
+    user_plan = api_config.get('global', {}).get('user_plan')
+    return [api_name for api_name, config in api_config['apis'].items()
+            if config.get('enabled', True) and plan_allows(config.get('plan_required'), user_plan)]
+
+
+def retry_journal_units(journal: JobJournal, date_chunks: List[Tuple[str, str]], config: dict,
+                        max_workers: int, logger: logging.Logger, apis: Optional[List[str]] = None):
+    """
+    按作业日志的退避时间重试失败的单元，只重新处理包含这些单元的chunks，直到没有可重试的单元
+
+    只等待 apis 的单元（已停用或计划等级不足的API的失败单元不会被认领）；
+    一轮重试没有认领到任何单元时停止，避免无限循环
+    """
+    start_date, end_date = date_chunks[0][0], date_chunks[-1][1]
+    while True:
+        next_retry_at = journal.next_retry_at(start_date, end_date, apis)
+        if next_retry_at is None:
+            break
+        wait = max(0.0, next_retry_at - time.time())
+        if wait > 0:
+            logger.info(f"等待 {wait:.0f} 秒后重试失败的单元")
+            time.sleep(wait)
+        dates = journal.retry_dates(start_date, end_date, apis=apis)
+        retry_chunks = [(start, end) for start, end in date_chunks if any(start <= date <= end for date in dates)]
+        if not retry_chunks:
+            break
+        logger.info(f"重试 {len(dates)} 个日期的失败单元，共 {len(retry_chunks)} 个chunks")
+        attempts = journal.attempts(start_date, end_date, apis)
+        run_chunks(retry_chunks, config, max_workers, logger)
+        if journal.attempts(start_date, end_date, apis) == attempts:
+            logger.warning("没有认领到可重试的单元，停止重试")
+            break
+
+
 def get_default_date_range(days: int = 7) -> Tuple[str, str]:
     """获取默认日期范围：从昨天往前推指定天数"""
     today = datetime.now()
@@ -125,6 +203,25 @@ def main():
         default=3,
         help='最大并行工作线程数 (默认: 3)'
     )
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        default=None,
+        help='本机所有进程合计的每秒API请求数上限 (默认: 不限制)'
+    )
+    parser.add_argument(
+        '--rate-limit-file',
+        type=str,
+        default=None,
+        help='共享令牌桶的状态文件路径，多个进程指定同一文件即可共享限速 (默认: 临时目录下的 jquantsapi-ratelimit)'
+    )
+    parser.add_argument(
+        '--layout',
+        type=str,
+        choices=['flat', 'hive'],
+        default=None,
+        help='输出目录布局: flat ({api}/{date}.parquet) 或 hive ({api}/year=YYYY/month=MM/{date}.parquet) (默认: 配置文件中的global.layout)'
+    )
     parser.add_argument(
         '--chunk-size',
         type=int,
@@ -146,6 +243,22 @@ def main():
         action='store_true',
         help='试运行模式，只显示将要处理的日期范围，不实际执行'
     )
+    parser.add_argument(
+        '--plan',
+        action='store_true',
+        help='请求规划模式，按已有文件、交易日历和历史分页数估算每个API的请求数和预计耗时，不访问网络'
+    )
+    parser.add_argument(
+        '--journal',
+        type=str,
+        default=None,
+        help=f'作业日志(SQLite)路径，中断后重新运行时从中断处继续 (默认: 输出目录下的 {JOURNAL_FILE})'
+    )
+    parser.add_argument(
+        '--no-journal',
+        action='store_true',
+        help='不使用作业日志，按文件是否存在判断是否需要获取'
+    )
     
     args = parser.parse_args()
     
@@ -161,6 +274,8 @@ def main():
     logger = setup_logger()
     logger.info(f"开始优化版日期范围持久化: {args.start_date} 到 {args.end_date}")
     
+    api_client = None
+    journal = None
     try:
         # 生成日期范围chunks
         date_chunks = chunk_date_range(args.start_date, args.end_date, args.chunk_size)
@@ -195,49 +310,51 @@ def main():
                 logger.info(f"  {start_date} - {end_date}")
             return
         
+        # 请求规划模式
+        if args.plan:
+            with open(args.config, 'r', encoding='utf-8') as f:
+                api_config = yaml.safe_load(f)
+            journal_path = Path(args.journal) if args.journal else Path(args.output_dir) / JOURNAL_FILE
+            if not args.no_journal and journal_path.exists():
+                journal = JobJournal(journal_path)
+            plan = RequestPlanner(api_config, args.output_dir, journal).plan(date_chunks, rate_limit=args.rate_limit)
+            for line in format_plan(plan):
+                logger.info(line)
+            return
+        
+        # 所有chunk和工作线程共享一个已认证的Client（连接池保持keep-alive，令牌只刷新一次）
+        api_client = JQuantsAPIClient(rate_limit=args.rate_limit, rate_limit_file=args.rate_limit_file)
+        
+        # 作业日志：租约已过期的执行中单元（异常退出时留下的）恢复为待执行，已完成的单元不再处理；
+        # 租约未过期的单元可能仍在其他进程中执行，不恢复
+        if not args.no_journal:
+            journal = JobJournal(Path(args.journal) if args.journal else Path(args.output_dir) / JOURNAL_FILE)
+            recovered = journal.recover()
+            if recovered:
+                logger.info(f"作业日志: 恢复 {recovered} 个租约已过期的中断单元")
+        
         # 准备配置
         config = {
             'config_path': args.config,
-            'output_dir': args.output_dir
+            'output_dir': args.output_dir,
+            'rate_limit': args.rate_limit,
+            'rate_limit_file': args.rate_limit_file,
+            'api_client': api_client,
+            'layout': args.layout,
+            'journal': journal
         }
+        # 所有chunk和工作线程共享一个持久化器，配置文件只解析一次
+        config['persister'] = DataPersister(
+            config_path=args.config,
+            output_dir=args.output_dir,
+            logger=logger,
+            api_client=api_client,
+            layout=args.layout,
+            journal=journal
+        )
         
         # 执行持久化
-        success_count = 0
-        failed_chunks = []
-        total_api_calls_saved = 0
-        
-        if args.max_workers == 1:
-            # 单线程执行
-            logger.info("使用单线程模式执行")
-            for start_date, end_date in date_chunks:
-                logger.info(f"处理日期范围: {start_date} - {end_date}")
-                start, end, success, message = persist_date_range_worker((start_date, end_date, config))
-                if success:
-                    success_count += 1
-                    logger.info(f"日期范围 {start_date} - {end_date} 处理成功: {message}")
-                else:
-                    failed_chunks.append(((start_date, end_date), message))
-                    logger.error(f"日期范围 {start_date} - {end_date} 处理失败: {message}")
-        else:
-            # 多线程执行
-            logger.info(f"使用多线程模式执行，最大线程数: {args.max_workers}")
-            
-            with ThreadPoolExecutor(max_workers=args.max_workers) as executor:
-                # 提交所有任务
-                future_to_chunk = {
-                    executor.submit(persist_date_range_worker, (start_date, end_date, config)): (start_date, end_date)
-                    for start_date, end_date in date_chunks
-                }
-                
-                # 处理完成的任务
-                for future in as_completed(future_to_chunk):
-                    start_date, end_date, success, message = future.result()
-                    if success:
-                        success_count += 1
-                        logger.info(f"日期范围 {start_date} - {end_date} 处理成功: {message}")
-                    else:
-                        failed_chunks.append(((start_date, end_date), message))
-                        logger.error(f"日期范围 {start_date} - {end_date} 处理失败: {message}")
+        success_count, failed_chunks = run_chunks(date_chunks, config, args.max_workers, logger)
         
         # 输出结果统计
         total_chunks = len(date_chunks)
@@ -246,14 +363,20 @@ def main():
         logger.info(f"  成功: {success_count}")
         logger.info(f"  失败: {len(failed_chunks)}")
         logger.info(f"  成功率: {success_count/total_chunks*100:.1f}%")
+        logger.info(f"  HTTP请求: {sum(stats['pages'] for stats in api_client.request_stats().values())} 次")
+        if journal is not None:
+            logger.info(f"  作业日志: {journal.summary()}")
         
         if failed_chunks:
             logger.info("失败的日期范围:")
             for (start_date, end_date), error in failed_chunks:
                 logger.info(f"  {start_date} - {end_date}: {error}")
             
-            # 如果启用重试，重新处理失败的chunks
-            if args.retry_failed and failed_chunks:
+            # 如果启用重试，按作业日志的退避时间重试失败的单元，或者重新处理失败的chunks
+            if args.retry_failed and journal is not None:
+                retry_journal_units(journal, date_chunks, config, args.max_workers, logger,
+                                    persisted_apis(args.config))
+            elif args.retry_failed and failed_chunks:
                 logger.info("开始重试失败的日期范围...")
                 retry_chunks = [(start_date, end_date) for (start_date, end_date), _ in failed_chunks]
                 
@@ -277,6 +400,16 @@ def main():
     except Exception as e:
         logger.error(f"日期范围持久化失败: {e}")
         sys.exit(1)
+    finally:
+        if api_client is not None:
+            # 保存各端点的分页数和耗时，供请求规划使用
+            try:
+                record_request_history(Path(args.output_dir), api_client.request_stats())
+            except Exception as e:
+                logger.warning(f"保存请求统计失败: {e}")
+            api_client.close()
+        if journal is not None:
+            journal.close()
 
 
 if __name__ == '__main__':
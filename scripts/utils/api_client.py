@@ -7,10 +7,35 @@ from datetime import datetime
 from typing import Optional, Union
 import pandas as pd
 from jquantsapi import Client
+from jquantsapi.ratelimit import HostRateLimiter
 
 class JQuantsAPIClient:
-    def __init__(self):
-        self.client = Client()
+    def __init__(self, rate_limit: Optional[float] = None, rate_limit_file: Optional[str] = None,
+                 client: Optional[Client] = None):
+        """
+        Args:
+            rate_limit: 本机所有进程合计的每秒请求数上限 (None 表示不限制)
+            rate_limit_file: 共享令牌桶的状态文件 (None 表示使用默认路径)
+            client: 已认证的Client (多个持久化器共享同一连接池和令牌时传入)
+        """
+        if client is not None:
+            self.client = client
+            return
+        rate_limiter = None
+        if rate_limit:
+            if rate_limit_file:
+                rate_limiter = HostRateLimiter(rate_limit, path=rate_limit_file)
+            else:
+                rate_limiter = HostRateLimiter(rate_limit)
+        self.client = Client(rate_limiter=rate_limiter)
+    
+    def close(self):
+        """释放Client的连接池和线程池"""
+        self.client.close()
+    
+    def request_stats(self):
+        """按端点统计的已发送请求数（见Client.request_stats）"""
+        return self.client.request_stats()
     
     def call_range_method(self, method_name: str, start_date: str, end_date: str) -> pd.DataFrame:
         """调用范围查询方法"""
@@ -104,6 +129,10 @@ class JQuantsAPIClient:
         print(f"[{method_name}] 静态数据查询完成，返回数据行数: {len(result)}")
         return result
     
+    def call_trading_calendar(self, start_date: str, end_date: str) -> pd.DataFrame:
+        """获取交易日历 (Date, HolidayDivision)"""
+        return self.client.get_markets_trading_calendar(from_yyyymmdd=start_date, to_yyyymmdd=end_date)
+    
     def _parse_date(self, date_str: str) -> Union[datetime, str]:
         """解析日期字符串"""
         try:
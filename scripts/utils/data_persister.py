@@ -5,22 +5,74 @@
 import os
 import pandas as pd
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
 import logging
 import yaml
 import time
+import uuid
+
+from jquantsapi.resilience import is_transient_error, jittered_backoff
 
 from .api_client import JQuantsAPIClient
-from .data_validator import DataValidator
+from .data_validator import DataValidationError, DataValidator
+from .parquet_writer import write_parquet
+from . import dataset_layout
+from .search_index import write_index
+from .request_planner import plan_allows, record_trading_calendar
+from .job_journal import JobJournal
+from .scheduler import SKIPPED, SUCCESS, SkipTask, TaskGraph
+
+# 日期范围持久化时同时进行的获取任务数（未配置global.max_workers时）
+DEFAULT_FETCH_WORKERS = 3
+
+# 验证和写入任务的线程数
+PROCESS_WORKERS = 2
+
+# 交易日历中视为交易日的休日区分（1: 营业日，2: 东证半日立会日）
+TRADING_DAY_DIVISIONS = ['1', '2']
+
+# 返回空数据的跳过原因：数据可能尚未发布，作业日志中记录为没有数据，之后重新检查而不是永久跳过
+EMPTY_REASONS = ('empty_data', 'no_data')
+
+def contiguous_runs(dates: List[str]) -> List[Tuple[str, str]]:
+    """将日期(YYYYMMDD)分组为连续的日期段 [(开始日期, 结束日期)]"""
+    runs: List[Tuple[str, str]] = []
+    previous = None
+    for date in sorted(dates):
+        current = datetime.strptime(date, '%Y%m%d')
+        if previous is not None and current - previous == timedelta(days=1):
+            runs[-1] = (runs[-1][0], date)
+        else:
+            runs.append((date, date))
+        previous = current
+    return runs
 
 class DataPersister:
-    def __init__(self, config_path: str, output_dir: str, logger=None):
+    def __init__(self, config_path: str, output_dir: str, logger=None,
+                 rate_limit: Optional[float] = None, rate_limit_file: Optional[str] = None,
+                 api_client: Optional[JQuantsAPIClient] = None, layout: Optional[str] = None,
+                 max_workers: Optional[int] = None, journal: Optional[JobJournal] = None):
         self.logger = logger or logging.getLogger(__name__)
         self.config = self._load_config(config_path)
+        # 日期范围持久化时同时进行的获取任务数（实际的HTTP请求数仍受Client的并发上限和速率限制约束）
+        self.max_workers = max_workers or self.config.get('global', {}).get('max_workers') or DEFAULT_FETCH_WORKERS
         self.output_dir = Path(output_dir)
-        self.api_client = JQuantsAPIClient()
-        self.validator = DataValidator(logger)
+        # 目录布局：flat ({api}/{date}.parquet) 或 hive ({api}/year=YYYY/month=MM/{date}.parquet)
+        self.layout = layout or self.config.get('global', {}).get('layout', 'flat')
+        if self.layout not in dataset_layout.LAYOUTS:
+            raise ValueError(f"不支持的布局: {self.layout}")
+        # 传入api_client时复用其已认证的Client，避免每个实例重新认证和建立连接
+        if api_client is None:
+            api_client = JQuantsAPIClient(rate_limit=rate_limit, rate_limit_file=rate_limit_file)
+        self.api_client = api_client
+        # 行数超过validation_sample_rows时逐行取值的检查只在样本上执行（未设置时检查全部行）
+        self.validator = DataValidator(logger, sample_rows=self.config.get('global', {}).get('validation_sample_rows'))
+        # 作业日志：日期范围持久化时按日志认领 (API, 日期)，已完成的单元不再检查文件
+        self.journal = journal
+        self.journal_owner = uuid.uuid4().hex
+        # 因计划等级不足而跳过的API（只记录一次日志）
+        self._plan_excluded: Set[str] = set()
         
         # 创建输出目录
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -88,74 +140,53 @@ class DataPersister:
         return results
     
     def persist_data_for_date_range(self, start_date: str, end_date: str, retry_failed: bool = False) -> Dict[str, Any]:
-        """为日期范围持久化所有API数据，使用range调用减少API次数"""
+        """
+        为日期范围持久化所有API数据，使用range调用减少API次数
+        
+        所有 (API, 日期) 按任务图并发执行，总耗时由Client的并发上限和速率限制决定，而不是各请求耗时之和
+        """
         self.logger.info(f"开始批量持久化 {start_date} 到 {end_date} 的数据")
         
         results = {
             'success': [],
             'failed': [],
             'skipped': [],
-            'total_apis': 0,
-            'api_calls_saved': 0  # 节省的API调用次数
+            'total_apis': 0
         }
         
         # 获取启用的API
         enabled_apis = self._get_enabled_apis()
         results['total_apis'] = len(enabled_apis)
         
-        # 分离range API和非range API
-        range_apis = {}
-        single_apis = {}
+        if self.journal is not None:
+            self._enqueue_journal(enabled_apis, start_date, end_date)
         
-        for api_name, api_config in enabled_apis.items():
-            if api_config.get('is_range', False):
-                range_apis[api_name] = api_config
+        # range API、单日API和静态数据分解为 (API, 日期) 的获取、验证、写入任务，按依赖并发执行
+        graph, units = self._build_date_range_graph(enabled_apis, start_date, end_date)
+        self.logger.info(f"共 {len(units)} 个持久化单元，{len(graph)} 个任务，最多同时获取 {self.max_workers} 个")
+        tasks = graph.run({'fetch': self.max_workers, 'process': PROCESS_WORKERS})
+        
+        for api_name, date, chain in units:
+            # 链中第一个未成功的任务决定单元的结果
+            task = next((tasks[task_id] for task_id in chain if tasks[task_id].status != SUCCESS), None)
+            if task is None:
+                if date is None:
+                    results['success'].append(api_name)
+                else:
+                    results['success'].append(f"{api_name}_{date}")
+            elif task.status == SKIPPED:
+                item = {'api': api_name, 'reason': task.error}
+                if date is not None:
+                    item['date'] = date
+                results['skipped'].append(item)
+                self._journal_finish(api_name, date, start_date, end_date, skipped=task.error)
             else:
-                single_apis[api_name] = api_config
-        
-        self.logger.info(f"发现 {len(range_apis)} 个支持range的API，{len(single_apis)} 个单日API")
-        
-        # 处理range API（批量获取）
-        if range_apis:
-            self.logger.info("处理支持range的API...")
-            range_results = self._persist_range_apis(range_apis, start_date, end_date)
-            results['success'].extend(range_results['success'])
-            results['failed'].extend(range_results['failed'])
-            results['skipped'].extend(range_results['skipped'])
-            results['api_calls_saved'] += range_results['api_calls_saved']
-        
-        # 处理单日API（逐个处理）
-        if single_apis:
-            self.logger.info("处理单日API...")
-            # 生成日期列表
-            dates = self._generate_date_list(start_date, end_date)
-            
-            for date in dates:
-                for api_name, api_config in single_apis.items():
-                    try:
-                        result = self._persist_single_api(api_name, api_config, date)
-                        if result['success']:
-                            if result.get('skipped', False):
-                                results['skipped'].append({
-                                    'api': api_name,
-                                    'date': date,
-                                    'reason': result.get('reason', 'unknown')
-                                })
-                            else:
-                                results['success'].append(f"{api_name}_{date}")
-                        else:
-                            results['failed'].append({
-                                'api': api_name,
-                                'date': date,
-                                'error': result['error']
-                            })
-                    except Exception as e:
-                        self.logger.error(f"[{api_name}] API 日期 {date} 处理失败: {str(e)}")
-                        results['failed'].append({
-                            'api': api_name,
-                            'date': date,
-                            'error': str(e)
-                        })
+                self.logger.error(f"[{api_name}] {task.task_id} 处理失败: {task.error}")
+                item = {'api': api_name, 'error': task.error}
+                if date is not None:
+                    item['date'] = date
+                results['failed'].append(item)
+                self._journal_finish(api_name, date, start_date, end_date, error=task.error)
         
         # 重试失败的API
         if retry_failed and results['failed']:
@@ -197,9 +228,6 @@ class DataPersister:
                         f"跳过 {len(results['skipped'])}/{results['total_apis']}, "
                         f"失败 {len(results['failed'])}/{results['total_apis']}")
         
-        if results['api_calls_saved'] > 0:
-            self.logger.info(f"通过range调用节省了 {results['api_calls_saved']} 次API调用")
-        
         # 显示跳过的API详情
         if results['skipped']:
             self.logger.info("跳过的API详情:")
@@ -209,132 +237,312 @@ class DataPersister:
         
         return results
     
-    def _persist_range_apis(self, range_apis: Dict[str, Any], start_date: str, end_date: str) -> Dict[str, Any]:
-        """批量处理支持range的API"""
-        results = {
-            'success': [],
-            'failed': [],
-            'skipped': [],
-            'api_calls_saved': 0
-        }
-        
-        # 生成日期列表
+    def _build_date_range_graph(self, enabled_apis: Dict[str, Any], start_date: str,
+                                end_date: str) -> Tuple[TaskGraph, List[Tuple[str, Optional[str], List[str]]]]:
+        """
+        构建日期范围持久化的任务图
+        
+        先加入静态数据和交易日历（被其他任务依赖），再加入range API和每个 (单日API, 日期)。
+        每个单元分为 fetch -> validate -> write 三个任务，获取在fetch线程池中并发执行，
+        验证和写入在process线程池中执行，不阻塞获取
+        
+        Returns:
+            (任务图, [(API名称, 日期, 任务ID链)])，range API的日期为None
+        """
+        graph = TaskGraph()
+        units: List[Tuple[str, Optional[str], List[str]]] = []
         dates = self._generate_date_list(start_date, end_date)
-        total_dates = len(dates)
         
-        for api_name, api_config in range_apis.items():
-            try:
-                result = self._persist_single_range_api(api_name, api_config, start_date, end_date)
-                if result['success']:
-                    if result.get('skipped', False):
-                        results['skipped'].append({
-                            'api': api_name,
-                            'reason': result.get('reason', 'unknown')
-                        })
-                    else:
-                        results['success'].append(api_name)
-                        # 计算节省的API调用次数
-                        results['api_calls_saved'] += total_dates - 1  # 1次range调用替代了total_dates次单日调用
-                else:
-                    results['failed'].append({
-                        'api': api_name,
-                        'error': result['error']
-                    })
-            except Exception as e:
-                self.logger.error(f"[{api_name}] Range API 处理失败: {str(e)}")
-                results['failed'].append({
-                    'api': api_name,
-                    'error': str(e)
-                })
+        range_apis = {name: config for name, config in enabled_apis.items() if config.get('is_range', False)}
+        static_apis = {name: config for name, config in enabled_apis.items()
+                       if not config.get('is_range', False) and config.get('is_static', False)}
+        single_apis = {name: config for name, config in enabled_apis.items()
+                       if name not in range_apis and name not in static_apis}
+        self.logger.info(f"发现 {len(range_apis)} 个支持range的API，{len(single_apis)} 个单日API，"
+                         f"{len(static_apis)} 个静态API")
         
-        return results
+        # 静态数据：整个日期范围只获取和验证一次，每个不同的输出文件写入一次
+        # （文件名不含日期时所有日期都写入同一个文件，不能有多个写入任务同时写）
+        for api_name, api_config in static_apis.items():
+            fetch_id = graph.add(f"fetch:{api_name}", lambda name=api_name, config=api_config:
+                                 self._fetch_static_stage(name, config, dates), pool='fetch')
+            validate_id = graph.add(f"validate:{api_name}", lambda data, name=api_name:
+                                    self._validate_stage(name, data, '静态API '), [fetch_id], pool='process')
+            api_dir = self.output_dir / api_config['output_dir']
+            first_dates: Dict[Path, str] = {}
+            for date in dates:
+                path = dataset_layout.daily_file_path(api_dir, date, api_config['file_pattern'], self.layout)
+                first_dates.setdefault(path, date)
+            for date in first_dates.values():
+                write_id = graph.add(f"write:{api_name}:{date}", lambda data, name=api_name, config=api_config, d=date:
+                                     self._write_single_stage(name, config, d, data), [validate_id], pool='process')
+                units.append((api_name, date, [fetch_id, validate_id, write_id]))
+        
+        # 交易日历：只在有仅交易日发布的API时获取
+        calendar_id = None
+        if any(config.get('trading_days_only', False) for config in single_apis.values()):
+            calendar_id = graph.add('fetch:trading_calendar',
+                                    lambda: self._fetch_trading_days(start_date, end_date), pool='fetch')
+        
+        for api_name, api_config in range_apis.items():
+            fetch_id = graph.add(f"fetch:{api_name}", lambda name=api_name, config=api_config:
+                                 self._fetch_range_stage(name, config, start_date, end_date), pool='fetch')
+            validate_id = graph.add(f"validate:{api_name}", lambda fetched, name=api_name:
+                                    (self._validate_stage(name, fetched[0], 'Range API '), fetched[1]),
+                                    [fetch_id], pool='process')
+            write_id = graph.add(f"write:{api_name}", lambda fetched, name=api_name, config=api_config:
+                                 self._write_range_stage(name, config, *fetched), [validate_id], pool='process')
+            units.append((api_name, None, [fetch_id, validate_id, write_id]))
+        
+        # 按日期在前的顺序加入，先完成较早的日期
+        for date in dates:
+            for api_name, api_config in single_apis.items():
+                deps = [calendar_id] if calendar_id and api_config.get('trading_days_only', False) else []
+                fetch_id = graph.add(f"fetch:{api_name}:{date}",
+                                     lambda *calendar, name=api_name, config=api_config, d=date:
+                                     self._fetch_single_stage(name, config, d, *calendar), deps, pool='fetch')
+                validate_id = graph.add(f"validate:{api_name}:{date}", lambda data, name=api_name:
+                                        self._validate_stage(name, data, 'API '), [fetch_id], pool='process')
+                write_id = graph.add(f"write:{api_name}:{date}", lambda data, name=api_name, config=api_config, d=date:
+                                     self._write_single_stage(name, config, d, data), [validate_id], pool='process')
+                units.append((api_name, date, [fetch_id, validate_id, write_id]))
+        
+        return graph, units
     
-    def _persist_single_range_api(self, api_name: str, api_config: Dict[str, Any], start_date: str, end_date: str) -> Dict[str, Any]:
-        """持久化单个range API数据"""
-        self.logger.info(f"[{api_name}] 处理Range API ({start_date} - {end_date})")
+    def _enqueue_journal(self, enabled_apis: Dict[str, Any], start_date: str, end_date: str):
+        """
+        在作业日志中登记日期范围内的单元（静态数据除外）
         
-        # 检查所有日期的文件是否都已存在
+        只在有新单元时列出一次API目录，已有文件（包括合并后的月文件）的日期登记为已完成
+        """
         dates = self._generate_date_list(start_date, end_date)
-        existing_files = []
-        missing_dates = []
-        
-        for date in dates:
-            output_file = self._get_output_file_path(api_name, api_config, date)
-            if output_file.exists():
-                existing_files.append(date)
+        for api_name, api_config in enabled_apis.items():
+            if not api_config.get('is_range', False) and api_config.get('is_static', False):
+                continue
+            new_dates = self.journal.unknown_dates(api_name, dates)
+            if not new_dates:
+                continue
+            api_dir = self.output_dir / api_config['output_dir']
+            existing = set(dataset_layout.find_daily_files(api_dir)) | set(dataset_layout.compacted_dates(api_dir))
+            self.journal.enqueue(api_name, new_dates, done=existing)
+    
+    def _journal_finish(self, api_name: str, date: Optional[str], start_date: str, end_date: str,
+                        skipped: Optional[str] = None, error: Optional[str] = None):
+        """记录跳过、没有数据或失败的单元（只更新本实例认领的单元，range API为整个日期范围）"""
+        if self.journal is None:
+            return
+        dates = [date] if date is not None else self._generate_date_list(start_date, end_date)
+        try:
+            if error is not None:
+                self.journal.fail(api_name, dates, error, self.journal_owner)
+            elif skipped in EMPTY_REASONS:
+                self.journal.defer(api_name, dates, skipped, self.journal_owner)
             else:
-                missing_dates.append(date)
-        
-        if not missing_dates:
-            self.logger.info(f"[{api_name}] Range API 所有日期文件都已存在，跳过")
-            return {'success': True, 'skipped': True, 'reason': 'all_files_exist'}
+                self.journal.skip(api_name, dates, skipped, self.journal_owner)
+        except Exception as e:
+            self.logger.warning(f"[{api_name}] 更新作业日志失败: {e}")
+    
+    def _journal_complete(self, api_name: str, target_date: str, output_file: Path, rows: int):
+        """记录单元已完成（行数、文件大小和内容哈希）"""
+        if self.journal is None:
+            return
+        self.journal.complete(api_name, target_date, rows, output_file.stat().st_size,
+                              dataset_layout.content_hash(output_file))
+    
+    def _fetch_trading_days(self, start_date: str, end_date: str) -> Optional[Set[str]]:
+        """获取日期范围内的交易日（获取失败时返回None，不按交易日跳过）"""
+        try:
+            calendar = self.api_client.call_trading_calendar(start_date, end_date)
+            days = dict(zip(pd.to_datetime(calendar['Date']).dt.strftime('%Y%m%d'),
+                            calendar['HolidayDivision'].astype(str).isin(TRADING_DAY_DIVISIONS)))
+        except Exception as e:
+            self.logger.warning(f"获取交易日历失败，不按交易日跳过: {str(e)}")
+            return None
+        # 缓存交易日历，供请求规划离线估算
+        try:
+            record_trading_calendar(self.output_dir, {date: bool(flag) for date, flag in days.items()})
+        except Exception as e:
+            self.logger.warning(f"保存交易日历失败: {e}")
+        return {date for date, flag in days.items() if flag}
+    
+    def _fetch_static_stage(self, api_name: str, api_config: Dict[str, Any], dates: List[str]) -> pd.DataFrame:
+        """获取静态数据（所有日期的文件都已存在时跳过）"""
+        if all(self._get_output_file_path(api_name, api_config, date).exists() for date in dates):
+            raise SkipTask('file_exists')
+        data = self._call_with_retry(api_name, api_config, self.api_client.call_static_method, api_config['method'])
+        if data is None or data.empty:
+            self.logger.warning(f"[{api_name}] 静态API 返回空数据")
+            raise SkipTask('empty_data')
+        return data
+    
+    def _fetch_single_stage(self, api_name: str, api_config: Dict[str, Any], target_date: str,
+                            trading_days: Optional[Set[str]] = None) -> pd.DataFrame:
+        """获取单日数据（文件已存在或作业日志中已完成、非交易日或返回空数据时跳过）"""
+        if self.journal is not None:
+            if not self.journal.claim(api_name, [target_date], self.journal_owner):
+                raise SkipTask('journal_not_claimable')
+        else:
+            output_file = self._get_output_file_path(api_name, api_config, target_date)
+            compacted = dataset_layout.compacted_dates(self.output_dir / api_config['output_dir'])
+            if output_file.exists() or target_date in compacted:
+                self.logger.info(f"[{api_name}] 文件已存在，跳过: {output_file}")
+                raise SkipTask('file_exists')
+        if trading_days is not None and target_date not in trading_days:
+            raise SkipTask('non_trading_day')
         
-        self.logger.info(f"[{api_name}] Range API: {len(existing_files)} 个文件已存在，{len(missing_dates)} 个文件需要下载")
+        data = self._fetch_api_data(api_name, api_config, target_date)
+        if data is None or data.empty:
+            self.logger.warning(f"[{api_name}] API 返回空数据")
+            raise SkipTask('empty_data')
+        return data
+    
+    def _fetch_range_stage(self, api_name: str, api_config: Dict[str, Any], start_date: str,
+                           end_date: str) -> Tuple[pd.DataFrame, List[str]]:
+        """获取range数据，返回 (数据, 缺少文件的日期)"""
+        self.logger.info(f"[{api_name}] 处理Range API ({start_date} - {end_date})")
         
-        # 获取range数据
-        data = self._fetch_range_api_data(api_name, api_config, start_date, end_date)
+        dates = self._generate_date_list(start_date, end_date)
+        if self.journal is not None:
+            # 认领作业日志中未完成的日期，已完成的日期不再检查文件
+            missing_dates = self.journal.claim(api_name, dates, self.journal_owner)
+            if not missing_dates:
+                self.logger.info(f"[{api_name}] Range API 没有可认领的日期，跳过")
+                raise SkipTask('journal_not_claimable')
+        else:
+            # 检查所有日期的文件是否都已存在
+            compacted = dataset_layout.compacted_dates(self.output_dir / api_config['output_dir'])
+            missing_dates = [date for date in dates
+                             if not (self._get_output_file_path(api_name, api_config, date).exists() or date in compacted)]
+            if not missing_dates:
+                self.logger.info(f"[{api_name}] Range API 所有日期文件都已存在，跳过")
+                raise SkipTask('all_files_exist')
+        
+        self.logger.info(f"[{api_name}] Range API: {len(dates) - len(missing_dates)} 个日期已有数据，{len(missing_dates)} 个日期需要下载")
+        
+        # 只获取缺少的连续日期段，不重新获取整个范围
+        frames = [self._fetch_range_api_data(api_name, api_config, run_start, run_end)
+                  for run_start, run_end in contiguous_runs(missing_dates)]
+        frames = [frame for frame in frames if frame is not None and not frame.empty]
+        data = pd.concat(frames, ignore_index=True) if len(frames) > 1 else (frames[0] if frames else None)
         
         if data is None or data.empty:
             self.logger.warning(f"[{api_name}] Range API 返回空数据")
-            return {'success': True, 'skipped': True, 'reason': 'empty_data'}
-        
-        # 验证数据
+            raise SkipTask('empty_data')
+        return data, missing_dates
+    
+    def _validate_stage(self, api_name: str, data: pd.DataFrame, label: str = '') -> pd.DataFrame:
+        """验证数据，失败时抛出DataValidationError"""
         is_valid, errors = self.validator.validate_api_data(api_name, data)
         if not is_valid:
-            self.logger.error(f"[{api_name}] Range API 数据验证失败: {errors}")
-            return {'success': False, 'error': f"数据验证失败: {errors}"}
-        
-        # 按日期分割数据并保存
+            self.logger.error(f"[{api_name}] {label}数据验证失败: {errors}")
+            raise DataValidationError(f"数据验证失败: {errors}")
+        return data
+    
+    def _write_single_stage(self, api_name: str, api_config: Dict[str, Any], target_date: str,
+                            data: pd.DataFrame) -> int:
+        """写入单日文件，返回记录数"""
+        output_file = self._get_output_file_path(api_name, api_config, target_date)
+        if output_file.exists():
+            raise SkipTask('file_exists')
+        try:
+            self._save_data(data, output_file, api_config, api_name)
+            self._journal_complete(api_name, target_date, output_file, len(data))
+        except Exception as e:
+            self.logger.error(f"[{api_name}] API 数据保存失败: {str(e)}")
+            raise
+        self.logger.info(f"[{api_name}] API 数据保存成功: {len(data)} 条记录")
+        return len(data)
+    
+    def _write_range_stage(self, api_name: str, api_config: Dict[str, Any], data: pd.DataFrame,
+                           missing_dates: List[str]) -> int:
+        """按日期分割range数据并保存，返回保存的文件数"""
         saved_count = 0
         try:
+            partitions = self._partition_data_by_date(data, missing_dates)
+            no_data = []
             for date in missing_dates:
-                date_data = self._filter_data_by_date(data, date)
+                date_data = partitions.get(date)
+                if date_data is None:
+                    self.logger.warning(f"未找到日期 {date} 的数据")
+                    no_data.append(date)
+                    continue
                 if not date_data.empty:
                     output_file = self._get_output_file_path(api_name, api_config, date)
-                    self._save_data(date_data, output_file, api_config)
+                    self._save_data(date_data, output_file, api_config, api_name)
+                    self._journal_complete(api_name, date, output_file, len(date_data))
                     saved_count += 1
                     self.logger.debug(f"[{api_name}] 保存 {date} 数据: {len(date_data)} 条记录")
-            
-            self.logger.info(f"[{api_name}] Range API 数据保存成功: {saved_count} 个文件")
-            return {'success': True, 'records': saved_count}
+                else:
+                    no_data.append(date)
+            # 没有数据的日期（休日或尚未发布）之后重新检查
+            if self.journal is not None and no_data:
+                self.journal.defer(api_name, no_data, 'no_data', self.journal_owner)
         except Exception as e:
             self.logger.error(f"[{api_name}] Range API 数据保存失败: {str(e)}")
+            raise
+        
+        self.logger.info(f"[{api_name}] Range API 数据保存成功: {saved_count} 个文件")
+        return saved_count
+    
+    def _persist_single_range_api(self, api_name: str, api_config: Dict[str, Any], start_date: str, end_date: str) -> Dict[str, Any]:
+        """持久化单个range API数据"""
+        try:
+            data, missing_dates = self._fetch_range_stage(api_name, api_config, start_date, end_date)
+            self._validate_stage(api_name, data, 'Range API ')
+        except SkipTask as e:
+            return {'success': True, 'skipped': True, 'reason': e.reason}
+        except DataValidationError as e:
+            return {'success': False, 'error': str(e)}
+        
+        # 按日期分割数据并保存
+        try:
+            return {'success': True, 'records': self._write_range_stage(api_name, api_config, data, missing_dates)}
+        except Exception as e:
             return {'success': False, 'error': str(e)}
     
     def _fetch_range_api_data(self, api_name: str, api_config: Dict[str, Any], start_date: str, end_date: str) -> pd.DataFrame:
         """获取range API数据"""
         method_name = api_config['method']
-        return self.api_client.call_range_method(method_name, start_date, end_date)
+        return self._call_with_retry(api_name, api_config, self.api_client.call_range_method,
+                                     method_name, start_date, end_date)
     
-    def _filter_data_by_date(self, data: pd.DataFrame, target_date: str) -> pd.DataFrame:
-        """根据日期过滤数据"""
+    # 按顺序尝试的日期列，同一日期以第一个能匹配到数据的列为准
+    DATE_COLUMNS = dataset_layout.DATE_COLUMNS
+    
+    def _partition_data_by_date(self, data: pd.DataFrame, target_dates: List[str]) -> Dict[str, pd.DataFrame]:
+        """按日期一次性分组数据，返回 {YYYYMMDD: 该日数据}（未匹配到的日期不包含在内）"""
+        partitions: Dict[str, pd.DataFrame] = {}
         if data.empty:
-            return data
-        
-        # 尝试不同的日期列名
-        date_columns = ['Date', 'date', 'DisclosedDate', 'AnnouncementDate', 'PayableDate']
-        
-        for col in date_columns:
-            if col in data.columns:
-                # 将日期格式化为YYYY-MM-DD进行比较
-                try:
-                    # 如果目标日期是YYYYMMDD格式，转换为YYYY-MM-DD
-                    if len(target_date) == 8:
-                        formatted_target_date = f"{target_date[:4]}-{target_date[4:6]}-{target_date[6:8]}"
-                    else:
-                        formatted_target_date = target_date
-                    
-                    # 过滤数据
-                    filtered_data = data[data[col] == formatted_target_date]
-                    if not filtered_data.empty:
-                        return filtered_data
-                except Exception as e:
-                    self.logger.debug(f"日期过滤失败 {col}: {e}")
-                    continue
-        
-        # 如果没有找到匹配的日期，返回空DataFrame
-        self.logger.warning(f"未找到日期 {target_date} 的数据")
-        return pd.DataFrame()
+            return partitions
+        
+        remaining = set(target_dates)
+        for col in self.DATE_COLUMNS:
+            if not remaining:
+                break
+            if col not in data.columns:
+                continue
+            try:
+                keys = self._normalize_date_key(data[col])
+            except Exception as e:
+                self.logger.debug(f"日期列转换失败 {col}: {e}")
+                continue
+            # 每列只分组一次，NaT自动排除
+            for key, positions in data.groupby(keys, sort=False).indices.items():
+                date = key.strftime('%Y%m%d')
+                if date in remaining:
+                    partitions[date] = data.iloc[positions]
+                    remaining.discard(date)
+        
+        return partitions
+    
+    def _normalize_date_key(self, values: pd.Series) -> pd.Series:
+        """将日期列统一转换为当天0点的datetime（兼容datetime和'YYYY-MM-DD'/'YYYYMMDD'字符串）"""
+        if not pd.api.types.is_datetime64_any_dtype(values):
+            values = pd.to_datetime(
+                values.astype(str).str.replace('-', '', regex=False).str[:8],
+                format='%Y%m%d', errors='coerce'
+            )
+        return values.dt.normalize()
     
     def _generate_date_list(self, start_date: str, end_date: str) -> List[str]:
         """生成日期列表"""
@@ -353,43 +561,39 @@ class DataPersister:
             raise ValueError(f"日期格式错误: {e}")
     
     def _get_enabled_apis(self) -> Dict[str, Any]:
-        """获取启用的API配置"""
+        """获取启用的API配置（plan_required 高于 global.user_plan 的API不调用，避免403和重试）"""
+        user_plan = self.config.get('global', {}).get('user_plan')
         enabled_apis = {}
         for api_name, api_config in self.config['apis'].items():
-            if api_config.get('enabled', True):
-                enabled_apis[api_name] = api_config
+            if not api_config.get('enabled', True):
+                continue
+            if not plan_allows(api_config.get('plan_required'), user_plan):
+                if api_name not in self._plan_excluded:
+                    self._plan_excluded.add(api_name)
+                    self.logger.info(f"[{api_name}] 需要 {api_config['plan_required']} 计划"
+                                     f"（当前 {user_plan}），跳过")
+                continue
+            enabled_apis[api_name] = api_config
         return enabled_apis
     
     def _persist_single_api(self, api_name: str, api_config: Dict[str, Any], target_date: str) -> Dict[str, Any]:
         """持久化单个API数据"""
         self.logger.info(f"[{api_name}] 开始处理API")
         
-        # 检查文件是否已存在
-        output_file = self._get_output_file_path(api_name, api_config, target_date)
-        if output_file.exists():
-            self.logger.info(f"[{api_name}] 文件已存在，跳过: {output_file}")
-            return {'success': True, 'skipped': True}
-        
-        # 获取数据
-        data = self._fetch_api_data(api_name, api_config, target_date)
-        
-        if data is None or data.empty:
-            self.logger.warning(f"[{api_name}] API 返回空数据")
-            return {'success': True, 'skipped': True, 'reason': 'empty_data'}
-        
-        # 验证数据
-        is_valid, errors = self.validator.validate_api_data(api_name, data)
-        if not is_valid:
-            self.logger.error(f"[{api_name}] API 数据验证失败: {errors}")
-            return {'success': False, 'error': f"数据验证失败: {errors}"}
+        try:
+            data = self._fetch_single_stage(api_name, api_config, target_date)
+            self._validate_stage(api_name, data, 'API ')
+        except SkipTask as e:
+            return {'success': True, 'skipped': True, 'reason': e.reason}
+        except DataValidationError as e:
+            return {'success': False, 'error': str(e)}
         
         # 保存数据
         try:
-            self._save_data(data, output_file, api_config)
-            self.logger.info(f"[{api_name}] API 数据保存成功: {len(data)} 条记录")
-            return {'success': True, 'records': len(data)}
+            return {'success': True, 'records': self._write_single_stage(api_name, api_config, target_date, data)}
+        except SkipTask as e:
+            return {'success': True, 'skipped': True, 'reason': e.reason}
         except Exception as e:
-            self.logger.error(f"[{api_name}] API 数据保存失败: {str(e)}")
             return {'success': False, 'error': str(e)}
     
     def _fetch_api_data(self, api_name: str, api_config: Dict[str, Any], target_date: str) -> pd.DataFrame:
@@ -397,76 +601,76 @@ class DataPersister:
         method_name = api_config['method']
 
         if api_config.get('is_static', False):
-            return self.api_client.call_static_method(method_name)
+            return self._call_with_retry(api_name, api_config, self.api_client.call_static_method,
+                                         method_name)
         elif api_config.get('is_range', False):
             # 只传递 start_dt, end_dt
-            return self.api_client.call_range_method(method_name, target_date, target_date)
+            return self._call_with_retry(api_name, api_config, self.api_client.call_range_method,
+                                         method_name, target_date, target_date)
         else:
             # 使用封装的方法，它会处理特殊API的参数
-            return self.api_client.call_single_method(method_name, target_date)
+            return self._call_with_retry(api_name, api_config, self.api_client.call_single_method,
+                                         method_name, target_date)
+
+    def _call_with_retry(self, api_name: str, api_config: Dict[str, Any], func, *args) -> pd.DataFrame:
+        """按 retry_count/retry_delay 重试API调用
+
+        重试次数与客户端共享重试预算（RetryBudget），等待时间为带抖动的指数退避。
+        只重试连接错误、超时、429和5xx等暂时性错误；400/403等永久性错误和
+        熔断器打开（CircuitOpenError）时立即失败，不消耗重试预算。
+        """
+        retry_count = api_config.get('retry_count', 0)
+        retry_delay = api_config.get('retry_delay', 0)
+        budget = self.api_client.client.retry_budget
+
+        attempt = 0
+        while True:
+            try:
+                return func(*args)
+            except Exception as e:
+                if not is_transient_error(e) or attempt >= retry_count or not budget.withdraw():
+                    raise
+                wait = jittered_backoff(attempt, retry_delay)
+                self.logger.warning(f"[{api_name}] API 调用失败，{wait:.1f} 秒后重试 "
+                                    f"({attempt + 1}/{retry_count}): {str(e)}")
+                time.sleep(wait)
+                attempt += 1
     
     def _get_output_file_path(self, api_name: str, api_config: Dict[str, Any], target_date: str) -> Path:
         """获取输出文件路径"""
         output_dir = self.output_dir / api_config['output_dir']
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        file_pattern = api_config['file_pattern']
-        filename = file_pattern.format(date=target_date)
-        
-        return output_dir / filename
+        return dataset_layout.daily_file_path(output_dir, target_date, api_config['file_pattern'], self.layout)
     
-    def _save_data(self, data: pd.DataFrame, output_file: Path, api_config: Dict[str, Any]):
+    def _save_data(self, data: pd.DataFrame, output_file: Path, api_config: Dict[str, Any],
+                   api_name: Optional[str] = None):
         """保存数据到文件"""
         # 确保目录存在
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
-        # 数据预处理：处理数据类型兼容性问题
-        processed_data = self._preprocess_data_for_save(data)
-        
         # 根据文件扩展名选择保存格式
-        if output_file.suffix.lower() == '.parquet':
-            processed_data.to_parquet(output_file, index=False)
-        elif output_file.suffix.lower() == '.csv':
-            processed_data.to_csv(output_file, index=False, encoding='utf-8')
-        else:
+        if output_file.suffix.lower() == '.csv':
+            data.to_csv(output_file, index=False, encoding='utf-8')
+            return
+        if output_file.suffix.lower() != '.parquet':
             # 默认保存为parquet
             output_file = output_file.with_suffix('.parquet')
-            processed_data.to_parquet(output_file, index=False)
-    
-    def _preprocess_data_for_save(self, data: pd.DataFrame) -> pd.DataFrame:
-        """预处理数据以确保保存兼容性"""
-        if data.empty:
-            return data
+        # 按数据集schema直接转换为Arrow写入，不复制数据、保留缺失值
+        write_parquet(data, output_file, api_name=api_name, column_types=api_config.get('column_types'))
         
-        # 复制数据避免修改原始数据
-        processed_data = data.copy()
-        
-        # 处理浮点数列中的 NaN 值
-        float_columns = processed_data.select_dtypes(include=['float64', 'float32']).columns
-        for col in float_columns:
-            processed_data[col] = processed_data[col].fillna(0.0)
-        
-        # 处理对象类型列中的 NaN 值
-        object_columns = processed_data.select_dtypes(include=['object']).columns
-        for col in object_columns:
-            processed_data[col] = processed_data[col].fillna('')
-        
-        # 处理整数列中的 NaN 值
-        int_columns = processed_data.select_dtypes(include=['int64', 'int32']).columns
-        for col in int_columns:
-            processed_data[col] = processed_data[col].fillna(0)
-        
-        # 处理布尔列中的 NaN 值
-        bool_columns = processed_data.select_dtypes(include=['bool']).columns
-        for col in bool_columns:
-            processed_data[col] = processed_data[col].fillna(False)
-        
-        # 确保所有字符串列都是字符串类型
-        for col in processed_data.columns:
-            if processed_data[col].dtype == 'object':
-                processed_data[col] = processed_data[col].astype(str)
+        # 建立搜索索引（失败时不影响数据保存，检查时会重新建立）
+        try:
+            write_index(data, output_file)
+        except Exception as e:
+            self.logger.warning(f"建立搜索索引失败 {output_file}: {e}")
         
-        return processed_data
+        # 保存的数据都已通过验证，记录验证结果供下游直接使用
+        if api_name:
+            try:
+                self.validator.record_file_result(api_name, output_file, True, [], self.validator.sample_rows)
+            except Exception as e:
+                self.logger.warning(f"保存验证结果失败 {output_file}: {e}")
     
     def persist_static_data(self) -> Dict[str, Any]:
         """持久化静态数据"""
@@ -479,8 +683,8 @@ class DataPersister:
         }
         
         # 获取静态API
-        static_apis = {name: config for name, config in self.config['apis'].items() 
-                      if config.get('is_static', False) and config.get('enabled', True)}
+        static_apis = {name: config for name, config in self._get_enabled_apis().items()
+                       if config.get('is_static', False)}
         
         results['total_static_apis'] = len(static_apis)
         
@@ -510,7 +714,8 @@ class DataPersister:
         self.logger.info(f"[{api_name}] 处理静态API")
         
         # 获取数据
-        data = self.api_client.call_static_method(api_config['method'])
+        data = self._call_with_retry(api_name, api_config, self.api_client.call_static_method,
+                                     api_config['method'])
         
         if data is None or data.empty:
             self.logger.warning(f"[{api_name}] 静态API 返回空数据")
@@ -525,7 +730,7 @@ class DataPersister:
         # 保存数据
         try:
             output_file = self._get_static_output_file_path(api_name, api_config)
-            self._save_data(data, output_file, api_config)
+            self._save_data(data, output_file, api_config, api_name)
             self.logger.info(f"[{api_name}] 静态API 数据保存成功: {len(data)} 条记录")
             return {'success': True, 'records': len(data)}
         except Exception as e:
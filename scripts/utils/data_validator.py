@@ -5,15 +5,134 @@
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import hashlib
+import json
 import re
 import logging
+import threading
+
+from .dataset_layout import file_signature, sidecar_path, signature_matches
+
+# 验证逻辑变化时递增，使已缓存的验证结果失效（规则本身的变化由rules_version反映）
+VALIDATOR_VERSION = 1
+
+# 内存中缓存的验证结果数
+RESULT_CACHE_SIZE = 256
+
+# 行数达到该值时各检查并行执行（pandas/numpy的比较运算会释放GIL）
+PARALLEL_MIN_ROWS = 200000
+DEFAULT_VALIDATION_WORKERS = 4
+
+# 日期格式检查排除的列名关键字（如 consolidated, updated, dated 等）
+DATE_EXCLUDE_KEYWORDS = ['consolidated', 'updated', 'modified', 'created', 'published', 'dated']
+
+OHLC_PATTERNS = [
+    ['Open', 'High', 'Low', 'Close'],
+    ['MorningOpen', 'MorningHigh', 'MorningLow', 'MorningClose'],
+    ['WholeDayOpen', 'WholeDayHigh', 'WholeDayLow', 'WholeDayClose']
+]
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+Check = Callable[[pd.DataFrame], List[str]]
+
+
+class DataValidationError(Exception):
+    """数据未通过验证"""
+
+
+def _float_values(data: pd.DataFrame, col: str) -> np.ndarray:
+    """数值列转为float数组（缺失值为NaN，比较结果为False）"""
+    return data[col].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def frame_fingerprint(data: pd.DataFrame) -> Optional[str]:
+    """数据内容的哈希（列名、类型和逐行哈希），无法哈希时返回None"""
+    try:
+        row_hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    except TypeError:
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in data.dtypes.items()]).encode('utf-8'))
+    digest.update(row_hashes.tobytes())
+    return digest.hexdigest()
+
+
+def validation_path(file_path: Path) -> Path:
+    return sidecar_path(file_path, 'validation')
+
+
+def _is_date_column(col: str) -> bool:
+    col_lower = col.lower()
+    return col == 'Date' or ('date' in col_lower and not any(keyword in col_lower for keyword in DATE_EXCLUDE_KEYWORDS))
+
+
+class ValidationPlan:
+    """
+    编译后的验证计划
+    
+    规则和列名在编译时确定要执行的检查，执行时每个检查只计算一次布尔掩码并直接计数。
+    checks 为 (检查, 是否逐行检查) 的列表，逐行检查在抽样模式下只在样本上执行，
+    其余检查（类型、重复、日期范围）始终检查全部数据
+    """
+    
+    def __init__(self, errors: List[str], checks: List[Tuple[Check, bool]]):
+        # 编译时已确定的错误（缺少必需列）
+        self.errors = errors
+        self.checks = checks
+    
+    def run(self, data: pd.DataFrame, sample_rows: Optional[int] = None,
+            max_workers: int = DEFAULT_VALIDATION_WORKERS) -> List[str]:
+        """按检查顺序返回错误列表"""
+        sample = data
+        suffix = ''
+        if sample_rows and len(data) > sample_rows:
+            sample = data.sample(n=sample_rows, random_state=0)
+            suffix = f"（抽样 {sample_rows}/{len(data)} 行）"
+        
+        tasks = [(check, sample, suffix) if per_row else (check, data, '') for check, per_row in self.checks]
+        
+        def run_check(task):
+            check, frame, note = task
+            return [error + note for error in check(frame)]
+        
+        if len(tasks) > 1 and len(data) >= PARALLEL_MIN_ROWS:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(run_check, tasks))
+        else:
+            results = [run_check(task) for task in tasks]
+        
+        errors = list(self.errors)
+        for result in results:
+            errors.extend(result)
+        return errors
+
 
 class DataValidator:
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, sample_rows: Optional[int] = None,
+                 max_workers: int = DEFAULT_VALIDATION_WORKERS, cache_size: int = RESULT_CACHE_SIZE):
         self.logger = logger or logging.getLogger(__name__)
         self.validation_rules = self._load_validation_rules()
+        # 抽样模式：行数超过sample_rows时逐行取值的检查只在样本上执行（None或0表示检查全部行）
+        self.sample_rows = sample_rows
+        self.max_workers = max_workers
+        # {(API名称, 列名): 编译后的验证计划}
+        self._plans: Dict[Tuple[str, Tuple[str, ...]], ValidationPlan] = {}
+        # {(API名称, 数据哈希, 抽样行数): (是否有效, 错误列表)}，重试或重叠的日期范围取到相同数据时不再验证
+        self.cache_size = cache_size
+        self._results: 'OrderedDict[Tuple[str, str, Optional[int]], Tuple[bool, List[str]]]' = OrderedDict()
+        self._results_lock = threading.Lock()
+    
+    @property
+    def rules_version(self) -> str:
+        """验证规则的版本（规则内容的哈希）"""
+        raw = json.dumps({'validator': VALIDATOR_VERSION, 'rules': self.validation_rules}, sort_keys=True, default=str)
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=8).hexdigest()
     
     def _load_validation_rules(self) -> Dict[str, Dict[str, Any]]:
         """加载数据验证规则"""
@@ -155,53 +274,152 @@ class DataValidator:
             },
         }
     
-    def validate_api_data(self, api_name: str, data: pd.DataFrame) -> Tuple[bool, List[str]]:
-        """验证API数据"""
+    def validate_api_data(self, api_name: str, data: pd.DataFrame,
+                          sample_rows: Optional[int] = None) -> Tuple[bool, List[str]]:
+        """
+        验证API数据
+        
+        Args:
+            api_name: API名称
+            data: 要验证的数据
+            sample_rows: 行数超过该值时逐行取值的检查只在随机样本上执行（默认使用实例设置）
+        """
         if data is None or data.empty:
             return False, ["数据为空"]
         
-        errors = []
-        
         # 获取验证规则
         rules = self.validation_rules.get(api_name, {})
         if not rules:
             self.logger.warning(f"未找到API {api_name} 的验证规则")
             return True, []
         
+        if sample_rows is None:
+            sample_rows = self.sample_rows
+        
+        key = None
+        if self.cache_size > 0:
+            fingerprint = frame_fingerprint(data)
+            if fingerprint is not None:
+                key = (api_name, fingerprint, sample_rows or None)
+                with self._results_lock:
+                    cached = self._results.get(key)
+                    if cached is not None:
+                        self._results.move_to_end(key)
+                if cached is not None:
+                    self.logger.debug(f"API {api_name} 数据未变化，使用缓存的验证结果")
+                    if not cached[0]:
+                        self.logger.error(f"API {api_name} 数据验证失败: {cached[1]}")
+                    return cached[0], list(cached[1])
+        
+        plan = self.compile_plan(api_name, list(data.columns))
+        errors = plan.run(data, sample_rows, self.max_workers)
+        
+        is_valid = len(errors) == 0
+        if not is_valid:
+            self.logger.error(f"API {api_name} 数据验证失败: {errors}")
+        
+        if key is not None:
+            with self._results_lock:
+                self._results[key] = (is_valid, list(errors))
+                while len(self._results) > self.cache_size:
+                    self._results.popitem(last=False)
+        
+        return is_valid, errors
+    
+    def record_file_result(self, api_name: str, file_path: Path, is_valid: bool, errors: List[str],
+                           sample_rows: Optional[int] = None):
+        """
+        将数据文件的验证结果保存为附属文件 {file}.validation.json
+        
+        结果与文件签名（大小、修改时间、内容哈希）和规则版本绑定，文件被改写或规则变化后自动失效
+        """
+        with open(validation_path(file_path), 'w', encoding='utf-8') as f:
+            json.dump({
+                **file_signature(file_path),
+                'rules_version': self.rules_version,
+                'api': api_name,
+                'valid': is_valid,
+                'errors': errors,
+                'sample_rows': sample_rows or None,
+                'validated_at': datetime.now().isoformat(timespec='seconds'),
+            }, f, ensure_ascii=False)
+    
+    def load_file_result(self, file_path: Path) -> Optional[Tuple[bool, List[str]]]:
+        """读取数据文件已保存的验证结果（不存在、文件已变化或规则已变化时返回None）"""
+        try:
+            with open(validation_path(file_path), 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if raw.get('rules_version') != self.rules_version or not signature_matches(file_path, raw):
+            return None
+        # 抽样验证的结果只在同样的抽样设置下使用
+        if raw.get('sample_rows') and raw.get('sample_rows') != (self.sample_rows or None):
+            return None
+        return raw['valid'], raw['errors']
+    
+    def validate_file(self, api_name: str, file_path: Path) -> Tuple[bool, List[str]]:
+        """验证数据文件，已有有效的验证结果时不读取数据"""
+        result = self.load_file_result(file_path)
+        if result is not None:
+            return result
+        
+        data = pd.read_parquet(file_path)
+        is_valid, errors = self.validate_api_data(api_name, data)
+        self.record_file_result(api_name, file_path, is_valid, errors, self.sample_rows)
+        return is_valid, errors
+    
+    def compile_plan(self, api_name: str, columns: List[str]) -> ValidationPlan:
+        """按API和列名编译验证计划（结果缓存）"""
+        key = (api_name, tuple(columns))
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._compile_plan(api_name, columns)
+            self._plans[key] = plan
+        return plan
+    
+    def _compile_plan(self, api_name: str, columns: List[str]) -> ValidationPlan:
+        """将验证规则编译为检查列表，检查顺序与错误信息的顺序一致"""
+        rules = self.validation_rules.get(api_name, {})
+        present = set(columns)
+        
         # 1. 必需列检查
-        required_cols = rules.get('required_columns', [])
-        missing_cols = [col for col in required_cols if col not in data.columns]
+        errors = []
+        missing_cols = [col for col in rules.get('required_columns', []) if col not in present]
         if missing_cols:
             errors.append(f"缺少必需列: {missing_cols}")
         
         # 2. 数据类型检查
-        errors.extend(self._validate_data_types(data, rules))
+        checks: List[Tuple[Check, bool]] = [(lambda data: self._validate_data_types(data, rules), False)]
         
         # 3. 数值范围检查
-        errors.extend(self._validate_numeric_ranges(data, rules))
+        if any(col in present for col in rules.get('positive_columns', [])) or \
+                (rules.get('price_range') and any(col in present for col in PRICE_COLUMNS)):
+            checks.append((lambda data: self._validate_numeric_ranges(data, rules), True))
         
         # 4. 日期格式检查
-        errors.extend(self._validate_date_format(data, rules))
+        date_format = rules.get('date_format')
+        if date_format:
+            for col in [col for col in columns if _is_date_column(col)]:
+                checks.append((lambda data, col=col: self._validate_date_column(data, col, date_format), True))
         
         # 5. OHLC关系检查
         if rules.get('ohlc_validation', False):
-            errors.extend(self._validate_ohlc_relationships(data))
+            for pattern in OHLC_PATTERNS:
+                if all(col in present for col in pattern):
+                    checks.append((lambda data, pattern=pattern: self._validate_ohlc_pattern(data, pattern), True))
         
-        # 6. 代码格式检查
-        if 'code_format' in rules:
-            errors.extend(self._validate_code_format(data, rules['code_format']))
+        # 6. 代码格式检查（只验证Code字段，不验证其他code字段）
+        if 'code_format' in rules and 'Code' in present:
+            checks.append((lambda data: self._validate_code_format(data, rules['code_format']), True))
         
-        # 7. 数据完整性检查
-        errors.extend(self._validate_data_completeness(data, api_name))
+        # 7. 数据完整性检查  8. 数据一致性检查
+        if 'Date' in present and 'Code' in present:
+            checks.append((lambda data: self._validate_data_completeness(data, api_name), False))
+        if 'Date' in present:
+            checks.append((lambda data: self._validate_data_consistency(data, api_name), False))
         
-        # 8. 数据一致性检查
-        errors.extend(self._validate_data_consistency(data, api_name))
-        
-        is_valid = len(errors) == 0
-        if not is_valid:
-            self.logger.error(f"API {api_name} 数据验证失败: {errors}")
-        
-        return is_valid, errors
+        return ValidationPlan(errors, checks)
     
     def _validate_data_types(self, data: pd.DataFrame, rules: Dict[str, Any]) -> List[str]:
         """验证数据类型"""
@@ -224,26 +442,23 @@ class DataValidator:
         return errors
     
     def _validate_numeric_ranges(self, data: pd.DataFrame, rules: Dict[str, Any]) -> List[str]:
-        """验证数值范围"""
+        """验证数值范围（非数值列由类型检查报告，这里跳过）"""
         errors = []
         
         # 正数列检查
         positive_cols = rules.get('positive_columns', [])
         for col in positive_cols:
-            if col in data.columns:
-                if (data[col] < 0).any():
+            if col in data.columns and pd.api.types.is_numeric_dtype(data[col]):
+                if (_float_values(data, col) < 0).any():
                     errors.append(f"列 {col} 包含负值")
         
         # 价格范围检查
         price_range = rules.get('price_range')
         if price_range:
-            price_cols = ['Open', 'High', 'Low', 'Close']
-            for col in price_cols:
-                if col in data.columns:
-                    invalid_prices = data[
-                        (data[col] < price_range[0]) | (data[col] > price_range[1])
-                    ]
-                    if not invalid_prices.empty:
+            for col in PRICE_COLUMNS:
+                if col in data.columns and pd.api.types.is_numeric_dtype(data[col]):
+                    values = _float_values(data, col)
+                    if ((values < price_range[0]) | (values > price_range[1])).any():
                         errors.append(f"列 {col} 包含超出范围的值: {price_range}")
         
         return errors
@@ -255,80 +470,70 @@ class DataValidator:
         if not date_format:
             return errors
         
-        # 排除包含 "date" 但不是日期字段的列名（如 consolidated, updated, dated 等）
-        exclude_keywords = ['consolidated', 'updated', 'modified', 'created', 'published', 'dated']
-        date_cols = []
         for col in data.columns:
-            col_lower = col.lower()
-            if col == 'Date' or ('date' in col_lower and not any(keyword in col_lower for keyword in exclude_keywords)):
-                date_cols.append(col)
-        
-        for col in date_cols:
-            if col in data.columns:
-                # 特殊处理 PayableDate，允许 "-" 和空字符串
-                if col == 'PayableDate':
-                    # 过滤掉 "-" 和空字符串，只验证其他值
-                    valid_data = data[col].dropna()
-                    valid_data = valid_data[valid_data != '-']
-                    valid_data = valid_data[valid_data != '']
-                    
-                    if not valid_data.empty:
-                        try:
-                            pd.to_datetime(valid_data, format=date_format)
-                        except ValueError:
-                            errors.append(f"列 {col} 日期格式不正确，应为 {date_format}")
-                else:
-                    try:
-                        pd.to_datetime(data[col], format=date_format)
-                    except ValueError:
-                        errors.append(f"列 {col} 日期格式不正确，应为 {date_format}")
+            if _is_date_column(col):
+                errors.extend(self._validate_date_column(data, col, date_format))
         
         return errors
     
+    def _validate_date_column(self, data: pd.DataFrame, col: str, date_format: str) -> List[str]:
+        """验证一个日期列（只解析不同的值，日期列的不同值通常远少于行数）"""
+        values = data[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return []
+        
+        # 特殊处理 PayableDate，允许 "-" 和空字符串
+        if col == 'PayableDate':
+            values = values.dropna()
+            values = values[(values != '-') & (values != '')]
+            if values.empty:
+                return []
+        
+        try:
+            pd.to_datetime(pd.Series(values.unique()), format=date_format)
+        except ValueError:
+            return [f"列 {col} 日期格式不正确，应为 {date_format}"]
+        return []
+    
     def _validate_ohlc_relationships(self, data: pd.DataFrame) -> List[str]:
         """验证OHLC关系"""
         errors = []
+        for pattern in OHLC_PATTERNS:
+            if all(col in data.columns for col in pattern):
+                errors.extend(self._validate_ohlc_pattern(data, pattern))
+        return errors
+    
+    def _validate_ohlc_pattern(self, data: pd.DataFrame, pattern: List[str]) -> List[str]:
+        """验证一组OHLC列（只计数，不生成不合格记录的子表）"""
+        errors = []
+        open_col, high_col, low_col, close_col = pattern
+        open_, high, low, close = (_float_values(data, col) for col in pattern)
         
-        # 检查是否有OHLC列
-        ohlc_patterns = [
-            ['Open', 'High', 'Low', 'Close'],
-            ['MorningOpen', 'MorningHigh', 'MorningLow', 'MorningClose'],
-            ['WholeDayOpen', 'WholeDayHigh', 'WholeDayLow', 'WholeDayClose']
-        ]
+        # 检查 High >= Low
+        count = int(np.count_nonzero(high < low))
+        if count:
+            errors.append(f"发现 {count} 条记录 {high_col} < {low_col}")
         
-        for pattern in ohlc_patterns:
-            if all(col in data.columns for col in pattern):
-                open_col, high_col, low_col, close_col = pattern
-                
-                # 检查 High >= Low
-                invalid_hl = data[data[high_col] < data[low_col]]
-                if not invalid_hl.empty:
-                    errors.append(f"发现 {len(invalid_hl)} 条记录 {high_col} < {low_col}")
-                
-                # 检查 High >= Open, Close
-                invalid_high = data[
-                    (data[high_col] < data[open_col]) | (data[high_col] < data[close_col])
-                ]
-                if not invalid_high.empty:
-                    errors.append(f"发现 {len(invalid_high)} 条记录 {high_col} 不是最高价")
-                
-                # 检查 Low <= Open, Close
-                invalid_low = data[
-                    (data[low_col] > data[open_col]) | (data[low_col] > data[close_col])
-                ]
-                if not invalid_low.empty:
-                    errors.append(f"发现 {len(invalid_low)} 条记录 {low_col} 不是最低价")
+        # 检查 High >= Open, Close
+        count = int(np.count_nonzero((high < open_) | (high < close)))
+        if count:
+            errors.append(f"发现 {count} 条记录 {high_col} 不是最高价")
+        
+        # 检查 Low <= Open, Close
+        count = int(np.count_nonzero((low > open_) | (low > close)))
+        if count:
+            errors.append(f"发现 {count} 条记录 {low_col} 不是最低价")
         
         return errors
     
     def _validate_code_format(self, data: pd.DataFrame, pattern: str) -> List[str]:
-        """验证代码格式"""
+        """验证代码格式（只匹配不同的代码）"""
         errors = []
         
         # 只验证Code字段，不验证其他code字段
         if 'Code' in data.columns:
-            invalid_codes = data[~data['Code'].astype(str).str.match(pattern)]
-            if not invalid_codes.empty:
+            codes = pd.Series(data['Code'].unique()).astype(str)
+            if not codes.str.match(pattern).all():
                 errors.append(f"列 Code 包含格式不正确的代码")
         
         return errors
@@ -353,11 +558,11 @@ class DataValidator:
         
         # 检查日期范围合理性
         if 'Date' in data.columns:
-            dates = pd.to_datetime(data['Date'])
+            dates = pd.to_datetime(pd.Series(data['Date'].unique()))
             date_range = dates.max() - dates.min()
             if date_range.days > 365:  # 单次查询不应超过一年
                 errors.append("数据日期范围过大，可能包含历史数据")
         
         # 去掉数据量验证
         
-        return errors 
\ No newline at end of file
+        return errors
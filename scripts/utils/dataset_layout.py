@@ -0,0 +1,302 @@
+"""
+持久化数据的目录布局与压缩合并
+flat: {api}/{date}.parquet
+hive: {api}/year=YYYY/month=MM/{date}.parquet
+压缩合并后按月保存为 {api}/year=YYYY/month=MM/{YYYYMM}.parquet（按Code、日期排序），
+并在 {api}/_manifest.json 中记录每个合并文件覆盖的日期和统计信息
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from .parquet_writer import ROW_GROUP_SIZE, write_parquet
+
+LAYOUTS = ('flat', 'hive')
+
+MANIFEST_FILE = '_manifest.json'
+MANIFEST_VERSION = 1
+
+# 按顺序尝试的日期列
+DATE_COLUMNS = ['Date', 'date', 'DisclosedDate', 'AnnouncementDate', 'PayableDate']
+
+# 合并文件的排序列（存在的列才参与排序）
+SORT_COLUMNS = ['Code', 'LocalCode']
+
+_DAILY_FILE = re.compile(r'^(\d{8})\.parquet$')
+
+# content_hash的缓存: {路径: (文件大小, 修改时间, 哈希)}
+_hash_cache: Dict[str, Tuple[int, int, str]] = {}
+_hash_lock = threading.Lock()
+
+
+def partition_dir(api_dir: Path, date: str) -> Path:
+    """日期(YYYYMMDD或YYYYMM)所在的hive分区目录"""
+    return api_dir / f"year={date[:4]}" / f"month={date[4:6]}"
+
+
+def daily_file_path(api_dir: Path, date: str, file_pattern: str = '{date}.parquet', layout: str = 'flat') -> Path:
+    """按布局返回单日文件路径"""
+    if layout not in LAYOUTS:
+        raise ValueError(f"不支持的布局: {layout}")
+    filename = file_pattern.format(date=date)
+    if layout == 'hive':
+        return partition_dir(api_dir, date) / filename
+    return api_dir / filename
+
+
+def monthly_file_path(api_dir: Path, month: str) -> Path:
+    """合并后的月文件路径"""
+    return partition_dir(api_dir, month) / f"{month}.parquet"
+
+
+def find_daily_files(api_dir: Path) -> Dict[str, Path]:
+    """查找所有单日文件（flat和hive布局），返回 {YYYYMMDD: 路径}"""
+    files: Dict[str, Path] = {}
+    if not api_dir.exists():
+        return files
+    for pattern in ('*.parquet', 'year=*/month=*/*.parquet'):
+        for path in api_dir.glob(pattern):
+            match = _DAILY_FILE.match(path.name)
+            if match:
+                files[match.group(1)] = path
+    return files
+
+
+def content_hash(path: Path) -> str:
+    """文件内容的哈希（按文件大小和修改时间缓存，文件未变化时不重复计算）"""
+    stat = path.stat()
+    key = str(path.resolve())
+    with _hash_lock:
+        cached = _hash_cache.get(key)
+    if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    value = digest.hexdigest()
+    with _hash_lock:
+        _hash_cache[key] = (stat.st_size, stat.st_mtime_ns, value)
+    return value
+
+
+def file_signature(path: Path) -> Dict[str, Any]:
+    """附属文件中记录的数据文件签名（文件大小、修改时间和内容哈希）"""
+    stat = path.stat()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'content_hash': content_hash(path)}
+
+
+def signature_matches(path: Path, signature: Optional[Dict[str, Any]]) -> bool:
+    """
+    数据文件是否与附属文件记录的签名一致
+
+    文件大小和修改时间都相同时不读取文件；只有修改时间不同（例如复制后）时才计算内容哈希比较
+    """
+    if not signature or not signature.get('content_hash'):
+        return False
+    stat = path.stat()
+    if signature.get('size') != stat.st_size:
+        return False
+    if signature.get('mtime_ns') == stat.st_mtime_ns:
+        return True
+    return signature['content_hash'] == content_hash(path)
+
+
+def sidecar_path(path: Path, kind: str) -> Path:
+    """数据文件的附属文件路径，例如 20240501.parquet.index.json"""
+    return path.with_name(f"{path.name}.{kind}.json")
+
+
+def remove_sidecars(path: Path):
+    """删除数据文件的所有附属文件"""
+    for sidecar in path.parent.glob(f"{path.name}.*.json"):
+        sidecar.unlink()
+
+
+def load_manifest(api_dir: Path) -> Dict[str, Any]:
+    """读取API目录的manifest（不存在时返回空manifest）"""
+    path = api_dir / MANIFEST_FILE
+    if not path.exists():
+        return {'version': MANIFEST_VERSION, 'files': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(api_dir: Path, manifest: Dict[str, Any]):
+    """原子地写入manifest"""
+    path = api_dir / MANIFEST_FILE
+    tmp_path = path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def compacted_dates(api_dir: Path) -> Dict[str, Tuple[Path, Optional[str]]]:
+    """已合并的日期，返回 {YYYYMMDD: (月文件路径, 日期列)}"""
+    dates: Dict[str, Tuple[Path, Optional[str]]] = {}
+    for rel_path, entry in load_manifest(api_dir).get('files', {}).items():
+        for date in entry.get('dates', []):
+            dates[date] = (api_dir / rel_path, entry.get('date_column'))
+    return dates
+
+
+def locate_date(api_dir: Path, date: str) -> Optional[Tuple[Path, Optional[str]]]:
+    """
+    查找某日的数据所在文件
+
+    Returns:
+        (文件路径, 日期列)。单日文件的日期列为None；合并文件需要按日期列过滤；未找到时返回None
+    """
+    for layout in LAYOUTS:
+        path = daily_file_path(api_dir, date, layout=layout)
+        if path.exists():
+            return path, None
+    return compacted_dates(api_dir).get(date)
+
+
+def files_for_range(api_dir: Path, start_date: str, end_date: str) -> List[Tuple[Path, Optional[str]]]:
+    """
+    按文件名和manifest筛选覆盖日期范围的文件（按日期排序）
+
+    Returns:
+        [(文件路径, 日期列)]，单日文件的日期列为None，合并文件需要按日期列过滤
+    """
+    files: List[Tuple[str, Path, Optional[str]]] = []
+    for date, path in find_daily_files(api_dir).items():
+        if start_date <= date <= end_date:
+            files.append((date, path, None))
+    for rel_path, entry in load_manifest(api_dir).get('files', {}).items():
+        dates = [date for date in entry.get('dates', []) if start_date <= date <= end_date]
+        if dates:
+            files.append((min(dates), api_dir / rel_path, entry.get('date_column')))
+    files.sort(key=lambda item: item[0])
+    return [(path, date_column) for _, path, date_column in files]
+
+
+def detect_date_column(columns: List[str]) -> Optional[str]:
+    """返回第一个存在的日期列"""
+    for col in DATE_COLUMNS:
+        if col in columns:
+            return col
+    return None
+
+
+def _date_keys(values: pd.Series) -> pd.Series:
+    """日期列转换为YYYYMMDD字符串"""
+    return pd.to_datetime(values, errors='coerce').dt.strftime('%Y%m%d')
+
+
+def compact_api(api_dir: Path, api_name: Optional[str] = None, before_month: Optional[str] = None,
+                remove_sources: bool = True, row_group_size: int = ROW_GROUP_SIZE,
+                dry_run: bool = False) -> List[Dict[str, Any]]:
+    """
+    将单日文件按月合并
+
+    已有的月文件会与新的单日文件合并后重写。月文件已包含的日期又有单日文件时（例如重新获取），
+    用单日文件替换月文件中该日期的数据；月文件没有日期列时无法替换，保留月文件的数据，
+    该单日文件不合并，视为已被月文件取代（remove_sources时同样删除，结果中记为superseded）。
+    先写入月文件和manifest，再删除单日文件，中途失败时单日文件仍然保留，重新执行即可
+
+    Args:
+        api_dir: API数据目录
+        api_name: 数据集名称（用于parquet schema）
+        before_month: 只合并早于该月(YYYYMM)的数据，默认合并全部
+        remove_sources: 合并后删除单日文件
+        row_group_size: 月文件的row group行数
+        dry_run: 只返回将要合并的月份，不写入
+
+    Returns:
+        每个合并月份的信息列表
+    """
+    months: Dict[str, Dict[str, Path]] = {}
+    for date, path in find_daily_files(api_dir).items():
+        if before_month is None or date[:6] < before_month:
+            months.setdefault(date[:6], {})[date] = path
+
+    manifest = load_manifest(api_dir)
+    results = []
+    for month in sorted(months):
+        daily_files = months[month]
+        output_file = monthly_file_path(api_dir, month)
+        rel_path = output_file.relative_to(api_dir).as_posix()
+        entry = manifest['files'].get(rel_path, {})
+        dates: Set[str] = set(entry.get('dates', [])) | set(daily_files)
+        result: Dict[str, Any] = {'month': month, 'file': str(output_file), 'daily_files': len(daily_files)}
+        if dry_run:
+            results.append(result)
+            continue
+
+        frames = []
+        superseded: Dict[str, Path] = {}
+        if output_file.exists():
+            existing = pd.read_parquet(output_file)
+            replaced = set(daily_files) & set(entry.get('dates', []))
+            if replaced:
+                existing_date_column = entry.get('date_column')
+                if existing_date_column in existing.columns:
+                    existing = existing[~_date_keys(existing[existing_date_column]).isin(replaced)]
+                else:
+                    superseded = {date: path for date, path in daily_files.items() if date in replaced}
+                    daily_files = {date: path for date, path in daily_files.items() if date not in replaced}
+                    result['daily_files'] = len(daily_files)
+                    result['superseded'] = len(superseded)
+            if not daily_files:
+                # 只有被取代的单日文件，月文件不变，不重写
+                if remove_sources:
+                    _remove_daily_files(superseded.values(), output_file)
+                result['rows'] = entry.get('rows', 0)
+                results.append(result)
+                continue
+            frames.append(existing)
+        frames.extend(pd.read_parquet(daily_files[date]) for date in sorted(daily_files))
+        frames = [frame for frame in frames if not frame.empty]
+        data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+        date_column = detect_date_column(list(data.columns))
+        sort_by = [col for col in SORT_COLUMNS if col in data.columns][:1]
+        if date_column:
+            sort_by.append(date_column)
+        if sort_by:
+            data = data.sort_values(sort_by, kind='stable', ignore_index=True)
+
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = output_file.with_suffix('.parquet.tmp')
+        write_parquet(data, tmp_file, api_name=api_name, row_group_size=row_group_size)
+        os.replace(tmp_file, output_file)
+
+        metadata = pq.ParquetFile(output_file).metadata
+        manifest['files'][rel_path] = {
+            'dates': sorted(dates),
+            'date_column': date_column,
+            'sort_by': sort_by,
+            'rows': metadata.num_rows,
+            'row_groups': metadata.num_row_groups,
+            'min_date': min(dates),
+            'max_date': max(dates),
+        }
+        save_manifest(api_dir, manifest)
+
+        # 月文件已重写，旧的附属文件（索引、统计等）失效
+        remove_sidecars(output_file)
+        if remove_sources:
+            _remove_daily_files([*daily_files.values(), *superseded.values()], output_file)
+        result['rows'] = metadata.num_rows
+        results.append(result)
+    return results
+
+
+def _remove_daily_files(paths: Iterable[Path], output_file: Path):
+    """删除已合并（或已被月文件取代）的单日文件及其附属文件"""
+    for path in paths:
+        if path != output_file:
+            path.unlink()
+            remove_sidecars(path)
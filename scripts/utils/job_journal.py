@@ -0,0 +1,298 @@
+"""
+持久化任务的作业日志（SQLite）
+每个 (API, 日期) 是一个单元，记录状态、行数、文件大小、校验和与尝试次数。
+工作线程（或进程）原子地认领单元后执行，中断后重新运行时只处理未完成的单元，
+已完成的单元不再检查文件；失败的单元按退避时间重试，没有数据的单元间隔一段时间后重新检查，
+超过最大尝试次数后不再认领
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from jquantsapi.resilience import jittered_backoff
+
+JOURNAL_FILE = '_journal.sqlite'
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+# 返回空数据（数据可能尚未发布），间隔一段时间后重新检查
+EMPTY = 'empty'
+
+# 已完成（不再认领）的状态
+FINISHED = (DONE, SKIPPED)
+
+DEFAULT_MAX_ATTEMPTS = 5
+
+# 认领后的租约时间（秒），进程异常退出后超过该时间的单元可以被重新认领
+DEFAULT_LEASE_SECONDS = 1800
+
+# 失败重试的退避: min(cap, base * 2^(attempt-1)) 内的随机时间
+DEFAULT_BACKOFF_BASE = 30.0
+DEFAULT_BACKOFF_CAP = 3600.0
+
+# 没有数据的单元重新检查的间隔（秒）
+DEFAULT_RECHECK_SECONDS = 6 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    api TEXT NOT NULL,
+    date TEXT NOT NULL,
+    status TEXT NOT NULL,
+    rows INTEGER,
+    bytes INTEGER,
+    checksum TEXT,
+    attempt INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    owner TEXT,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    lease_until REAL NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (api, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS units_status ON units (status, next_attempt_at);
+"""
+
+
+class JobJournal:
+    def __init__(self, path: Path, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS, backoff_base: float = DEFAULT_BACKOFF_BASE,
+                 backoff_cap: float = DEFAULT_BACKOFF_CAP, recheck_seconds: float = DEFAULT_RECHECK_SECONDS):
+        """
+        Args:
+            path: SQLite文件路径
+            max_attempts: 每个单元的最大尝试次数
+            lease_seconds: 认领的租约时间（秒）
+            backoff_base: 失败后第一次重试的退避上限（秒）
+            backoff_cap: 退避的上限（秒）
+            recheck_seconds: 没有数据的单元重新检查的间隔（秒）
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.recheck_seconds = recheck_seconds
+        # 同一进程的线程共享一个连接；认领使用 BEGIN IMMEDIATE，多个进程之间也是原子的
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _transaction(self, func, *args):
+        """在写事务中执行 func(conn, now, *args)"""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = func(self._conn, time.time(), *args)
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+            return result
+
+    def _rows(self, api: str, dates: List[str], columns: str = 'date, status'):
+        """API在日期范围内已登记的单元"""
+        return self._conn.execute(
+            f"SELECT {columns} FROM units WHERE api = ? AND date BETWEEN ? AND ?",
+            (api, min(dates), max(dates))).fetchall()
+
+    def unknown_dates(self, api: str, dates: Iterable[str]) -> List[str]:
+        """尚未登记的日期"""
+        dates = sorted(dates)
+        if not dates:
+            return []
+        with self._lock:
+            known = {row[0] for row in self._rows(api, dates, 'date')}
+        return [date for date in dates if date not in known]
+
+    def enqueue(self, api: str, dates: Iterable[str], done: Optional[Set[str]] = None) -> int:
+        """
+        登记单元（已登记的单元不变）
+
+        Args:
+            api: API名称
+            dates: 日期
+            done: 已有数据的日期，登记为已完成
+
+        Returns:
+            新登记的单元数
+        """
+        done = done or set()
+
+        def insert(conn, now, items):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO units (api, date, status, updated_at) VALUES (?, ?, ?, ?)",
+                [(api, date, DONE if date in done else PENDING, now) for date in items])
+            return conn.total_changes - before
+
+        return self._transaction(insert, sorted(set(dates)))
+
+    def claim(self, api: str, dates: Iterable[str], owner: str) -> List[str]:
+        """
+        原子地认领可执行的单元: 待执行的、退避（或重新检查）时间已过且未超过最大尝试次数的失败（或没有数据的）单元、
+        租约已过期的执行中单元
+
+        Returns:
+            认领到的日期
+        """
+        wanted = set(dates)
+        if not wanted:
+            return []
+
+        def take(conn, now):
+            rows = conn.execute(
+                "SELECT date, status, attempt, next_attempt_at, lease_until FROM units "
+                "WHERE api = ? AND date BETWEEN ? AND ?", (api, min(wanted), max(wanted))).fetchall()
+            claimed = sorted(
+                date for date, status, attempt, next_attempt_at, lease_until in rows
+                if date in wanted and (
+                    status == PENDING
+                    or (status in (FAILED, EMPTY) and attempt < self.max_attempts and next_attempt_at <= now)
+                    or (status == RUNNING and lease_until < now)))
+            conn.executemany(
+                "UPDATE units SET status = ?, owner = ?, attempt = attempt + 1, lease_until = ?, updated_at = ? "
+                "WHERE api = ? AND date = ?",
+                [(RUNNING, owner, now + self.lease_seconds, now, api, date) for date in claimed])
+            return claimed
+
+        return self._transaction(take)
+
+    def complete(self, api: str, date: str, rows: int, size: int, checksum: str):
+        """记录单元已完成"""
+        def update(conn, now):
+            conn.execute(
+                "UPDATE units SET status = ?, rows = ?, bytes = ?, checksum = ?, error = NULL, owner = NULL, "
+                "lease_until = 0, updated_at = ? WHERE api = ? AND date = ?",
+                (DONE, rows, size, checksum, now, api, date))
+
+        self._transaction(update)
+
+    def skip(self, api: str, dates: Iterable[str], reason: str, owner: str):
+        """记录认领的单元无需执行（非交易日、文件已存在等），之后不再认领"""
+        def update(conn, now, items):
+            conn.executemany(
+                "UPDATE units SET status = ?, error = ?, owner = NULL, lease_until = 0, updated_at = ? "
+                "WHERE api = ? AND date = ? AND status = ? AND owner = ?",
+                [(SKIPPED, reason, now, api, date, RUNNING, owner) for date in items])
+
+        self._transaction(update, list(dates))
+
+    def fail(self, api: str, dates: Iterable[str], error: str, owner: str):
+        """记录认领的单元失败，按尝试次数设置下次重试时间"""
+        def update(conn, now, items):
+            for date in items:
+                row = conn.execute(
+                    "SELECT attempt FROM units WHERE api = ? AND date = ? AND status = ? AND owner = ?",
+                    (api, date, RUNNING, owner)).fetchone()
+                if row is None:
+                    continue
+                delay = jittered_backoff(max(row[0] - 1, 0), self.backoff_base, self.backoff_cap)
+                conn.execute(
+                    "UPDATE units SET status = ?, error = ?, owner = NULL, lease_until = 0, next_attempt_at = ?, "
+                    "updated_at = ? WHERE api = ? AND date = ?",
+                    (FAILED, error, now + delay, now, api, date))
+
+        self._transaction(update, list(dates))
+
+    def defer(self, api: str, dates: Iterable[str], reason: str, owner: str):
+        """记录认领的单元没有数据，recheck_seconds 后可以重新认领（计入尝试次数）"""
+        def update(conn, now, items):
+            conn.executemany(
+                "UPDATE units SET status = ?, error = ?, owner = NULL, lease_until = 0, next_attempt_at = ?, "
+                "updated_at = ? WHERE api = ? AND date = ? AND status = ? AND owner = ?",
+                [(EMPTY, reason, now + self.recheck_seconds, now, api, date, RUNNING, owner) for date in items])
+
+        self._transaction(update, list(dates))
+
+    def recover(self) -> int:
+        """
+        将租约已过期的执行中单元（异常退出的运行留下的）恢复为待执行，返回恢复的单元数
+
+        租约未过期的单元可能仍在其他进程中执行，保持不变
+        """
+        def update(conn, now):
+            return conn.execute(
+                "UPDATE units SET status = ?, owner = NULL, lease_until = 0, updated_at = ? "
+                "WHERE status = ? AND lease_until < ?",
+                (PENDING, now, RUNNING, now)).rowcount
+
+        return self._transaction(update)
+
+    @staticmethod
+    def _retry_filter(start_date: str, end_date: str, apis: Optional[Iterable[str]]):
+        """日期范围和API的查询条件"""
+        where = "date BETWEEN ? AND ?"
+        params: tuple = (start_date, end_date)
+        if apis is not None:
+            apis = list(apis)
+            where += f" AND api IN ({', '.join('?' * len(apis))})" if apis else " AND 0"
+            params += tuple(apis)
+        return where, params
+
+    def next_retry_at(self, start_date: str = '00000000', end_date: str = '99999999',
+                      apis: Optional[Iterable[str]] = None) -> Optional[float]:
+        """日期范围内（指定的API）最早可以重试的失败单元的时间（没有可重试的单元时返回None）"""
+        where, params = self._retry_filter(start_date, end_date, apis)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT MIN(next_attempt_at) FROM units WHERE status = ? AND attempt < ? AND {where}",
+                (FAILED, self.max_attempts, *params)).fetchone()
+        return row[0]
+
+    def retry_dates(self, start_date: str = '00000000', end_date: str = '99999999',
+                    now: Optional[float] = None, apis: Optional[Iterable[str]] = None) -> Set[str]:
+        """日期范围内（指定的API）退避时间已过、可以重试的失败单元的日期"""
+        now = time.time() if now is None else now
+        where, params = self._retry_filter(start_date, end_date, apis)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT date FROM units WHERE status = ? AND attempt < ? AND next_attempt_at <= ? "
+                f"AND {where}",
+                (FAILED, self.max_attempts, now, *params)).fetchall()
+        return {row[0] for row in rows}
+
+    def attempts(self, start_date: str = '00000000', end_date: str = '99999999',
+                 apis: Optional[Iterable[str]] = None) -> int:
+        """日期范围内（指定的API）单元的尝试次数之和（没有变化说明没有认领到单元）"""
+        where, params = self._retry_filter(start_date, end_date, apis)
+        with self._lock:
+            row = self._conn.execute(f"SELECT COALESCE(SUM(attempt), 0) FROM units WHERE {where}", params).fetchone()
+        return row[0]
+
+    def finished_dates(self, api: str) -> Set[str]:
+        """已完成或已跳过的日期"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date FROM units WHERE api = ? AND status IN (?, ?)", (api, *FINISHED)).fetchall()
+        return {row[0] for row in rows}
+
+    def units(self, api: Optional[str] = None) -> List[Dict[str, object]]:
+        """单元的记录"""
+        query = "SELECT api, date, status, rows, bytes, checksum, attempt, error FROM units"
+        params: tuple = ()
+        if api is not None:
+            query += " WHERE api = ?"
+            params = (api,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY api, date", params).fetchall()
+        keys = ('api', 'date', 'status', 'rows', 'bytes', 'checksum', 'attempt', 'error')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def summary(self) -> Dict[str, int]:
+        """各状态的单元数"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM units GROUP BY status").fetchall()
+        return dict(rows)
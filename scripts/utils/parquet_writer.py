@@ -0,0 +1,178 @@
+"""
+Parquet写入模块
+按数据集的列类型构建Arrow schema，直接从DataFrame的列转换后写入，不复制DataFrame，保留缺失值
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# 每个row group的行数（按日文件通常只有一个row group，合并后的大文件按此切分）
+ROW_GROUP_SIZE = 128 * 1024
+
+# 压缩算法
+COMPRESSION = 'zstd'
+
+# 所有数据集通用的列类型（代码类列即使全部为数字或全部缺失也保存为字符串）
+COMMON_COLUMN_TYPES: Dict[str, pa.DataType] = {
+    'Code': pa.string(),
+    'LocalCode': pa.string(),
+    'MarketCode': pa.string(),
+    'Sector17Code': pa.string(),
+    'Sector33Code': pa.string(),
+    'ScaleCategory': pa.string(),
+    'TypeOfDocument': pa.string(),
+}
+
+# 各数据集特有的列类型（优先于通用类型和按dtype推断的类型）
+# 成交量等股数列保存为可空整数（API返回的JSON中含缺失值时pandas会转为float64），
+# 含有非整数值时该列保存为float64
+DATASET_COLUMN_TYPES: Dict[str, Dict[str, pa.DataType]] = {
+    'daily_quotes': {
+        'Open': pa.float64(),
+        'High': pa.float64(),
+        'Low': pa.float64(),
+        'Close': pa.float64(),
+        'Volume': pa.int64(),
+        'MorningVolume': pa.int64(),
+        'AfternoonVolume': pa.int64(),
+        'TurnoverValue': pa.float64(),
+        'AdjustmentFactor': pa.float64(),
+    },
+    'prices_am': {
+        'MorningVolume': pa.int64(),
+    },
+    'weekly_margin_interest': {
+        'ShortMarginTradeVolume': pa.int64(),
+        'LongMarginTradeVolume': pa.int64(),
+        'ShortNegotiableMarginTradeVolume': pa.int64(),
+        'LongNegotiableMarginTradeVolume': pa.int64(),
+        'ShortStandardizedMarginTradeVolume': pa.int64(),
+        'LongStandardizedMarginTradeVolume': pa.int64(),
+    },
+    'breakdown': {
+        'LongSellVolume': pa.int64(),
+        'ShortSellWithoutMarginVolume': pa.int64(),
+        'MarginSellNewVolume': pa.int64(),
+        'MarginSellCloseVolume': pa.int64(),
+        'LongBuyVolume': pa.int64(),
+        'MarginBuyNewVolume': pa.int64(),
+        'MarginBuyCloseVolume': pa.int64(),
+    },
+    'topix': {
+        'Open': pa.float64(),
+        'High': pa.float64(),
+        'Low': pa.float64(),
+        'Close': pa.float64(),
+    },
+    'indices': {
+        'Open': pa.float64(),
+        'High': pa.float64(),
+        'Low': pa.float64(),
+        'Close': pa.float64(),
+    },
+}
+
+
+def _infer_arrow_type(values: pd.Series) -> pa.DataType:
+    """根据pandas的dtype推断Arrow类型"""
+    dtype = values.dtype
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        tz = getattr(dtype, 'tz', None)
+        return pa.timestamp('ms', tz=str(tz) if tz is not None else None)
+    if pd.api.types.is_bool_dtype(dtype):
+        return pa.bool_()
+    if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_float_dtype(dtype):
+        # 可空整数(Int64等)和numpy数值类型都映射为同宽度的Arrow类型
+        return pa.from_numpy_dtype(getattr(dtype, 'numpy_dtype', dtype))
+    return pa.string()
+
+
+def build_schema(data: pd.DataFrame, api_name: Optional[str] = None,
+                 column_types: Optional[Dict[str, str]] = None) -> pa.Schema:
+    """
+    构建数据集的Arrow schema
+
+    Args:
+        data: 要保存的数据
+        api_name: 数据集名称（用于查找DATASET_COLUMN_TYPES）
+        column_types: 配置文件中指定的列类型，例如 {'Volume': 'int64'}（优先级最高）
+    """
+    explicit: Dict[str, pa.DataType] = {**COMMON_COLUMN_TYPES, **DATASET_COLUMN_TYPES.get(api_name or '', {})}
+    for name, alias in (column_types or {}).items():
+        explicit[name] = pa.type_for_alias(alias)
+
+    fields = []
+    for name in data.columns:
+        arrow_type = explicit.get(name)
+        if arrow_type is None:
+            arrow_type = _infer_arrow_type(data[name])
+        fields.append(pa.field(str(name), arrow_type, nullable=True))
+    return pa.schema(fields)
+
+
+def _to_arrow_array(values: pd.Series, arrow_type: pa.DataType) -> pa.Array:
+    """将一列转换为Arrow数组（缺失值保存为null，整数列含有非整数值时转换为float64）"""
+    try:
+        return pa.array(values, type=arrow_type, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        if pa.types.is_integer(arrow_type):
+            logger.warning(f"列 {values.name} 含有非整数值，保存为float64")
+            return pa.array(values, type=pa.float64(), from_pandas=True)
+        if not pa.types.is_string(arrow_type):
+            raise
+        # 含有dict/list/数字等非字符串对象的列，只对该列的非缺失值转为字符串
+        converted = [None if _is_missing(v) else str(v) for v in values]
+        return pa.array(converted, type=arrow_type)
+
+
+def _is_missing(value: Any) -> bool:
+    if isinstance(value, (list, tuple, dict)):
+        return False
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
+
+
+def to_arrow_table(data: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+    """按schema逐列转换为Arrow Table（不复制DataFrame，整数列回退为float64时schema随之改变）"""
+    arrays: List[pa.Array] = []
+    for field in schema:
+        try:
+            arrays.append(_to_arrow_array(data[field.name], field.type))
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(f"列 {field.name} 无法转换为 {field.type}: {e}") from e
+    fields = [field.with_type(array.type) for field, array in zip(schema, arrays)]
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields, metadata=schema.metadata))
+
+
+def write_parquet(data: pd.DataFrame, output_file: Path, api_name: Optional[str] = None,
+                  column_types: Optional[Dict[str, str]] = None,
+                  row_group_size: int = ROW_GROUP_SIZE) -> pa.Schema:
+    """
+    按schema将数据写入压缩的parquet文件
+
+    字符串列在parquet中使用字典编码，读取时仍为普通字符串列
+
+    Returns:
+        pa.Schema: 写入时使用的schema
+    """
+    schema = build_schema(data, api_name, column_types)
+    table = to_arrow_table(data, schema)
+    schema = table.schema
+    pq.write_table(
+        table,
+        output_file,
+        compression=COMPRESSION,
+        row_group_size=row_group_size,
+        use_dictionary=True,
+        write_statistics=True,
+    )
+    return schema
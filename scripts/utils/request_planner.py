@@ -0,0 +1,304 @@
+"""
+持久化任务的请求规划（不访问网络）
+按配置、磁盘上已有的文件（单日文件和manifest）、缓存的交易日历和历史分页数，
+估算日期范围持久化每个API将发出的HTTP请求数和按速率限制的预计耗时。
+历史分页数和耗时来自Client的请求统计，每次运行后合并保存在 {output_dir}/_request_history.json
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from jquantsapi import Client
+
+from . import dataset_layout
+
+HISTORY_FILE = '_request_history.json'
+CALENDAR_FILE = '_trading_calendar.json'
+
+# 计划等级（从低到高）
+PLAN_TIERS = ['free', 'light', 'standard', 'premium']
+
+# 配置中的方法名对应的API端点（静态数据由本地常量生成，不发出请求）
+METHOD_ENDPOINTS = {
+    'get_price_range': '/prices/daily_quotes',
+    'get_listed_info': '/listed/info',
+    'get_statements_range': '/fins/statements',
+    'get_fins_announcement': '/fins/announcement',
+    'get_markets_trades_spec': '/markets/trades_spec',
+    'get_indices_topix': '/indices/topix',
+    'get_index_option_range': '/option/index_option',
+    'get_weekly_margin_range': '/markets/weekly_margin_interest',
+    'get_short_selling_range': '/markets/short_selling',
+    'get_indices': '/indices',
+    'get_markets_short_selling_positions': '/markets/short_selling_positions',
+    'get_breakdown_range': '/markets/breakdown',
+    'get_prices_prices_am': '/prices/prices_am',
+    'get_dividend_range': '/fins/dividend',
+    'get_fs_details_range': '/fins/fs_details',
+    'get_derivatives_futures_range': '/derivatives/futures',
+    'get_derivatives_options_range': '/derivatives/options',
+}
+
+CALENDAR_ENDPOINT = '/markets/trading_calendar'
+
+# 没有历史记录时的每次调用页数和每个请求的耗时（秒）
+DEFAULT_PAGES_PER_CALL = 1.0
+DEFAULT_SECONDS_PER_REQUEST = 1.0
+
+_file_lock = threading.Lock()
+
+
+def _load_json(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_json(path: Path, data: Dict[str, Any]):
+    """原子地写入"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def load_request_history(output_dir: Path) -> Dict[str, Dict[str, float]]:
+    """读取历史请求统计: {端点: {'calls', 'pages', 'seconds'}}"""
+    return _load_json(Path(output_dir) / HISTORY_FILE)
+
+
+def record_request_history(output_dir: Path, stats: Dict[str, Dict[str, float]]):
+    """将一次运行的请求统计（Client.request_stats）累加到历史记录"""
+    if not stats:
+        return
+    path = Path(output_dir) / HISTORY_FILE
+    with _file_lock:
+        history = _load_json(path)
+        for endpoint, counts in stats.items():
+            entry = history.setdefault(endpoint, {'calls': 0, 'pages': 0, 'seconds': 0.0})
+            for key in ('calls', 'pages', 'seconds'):
+                entry[key] = entry.get(key, 0) + counts.get(key, 0)
+        _save_json(path, history)
+
+
+def load_trading_calendar(output_dir: Path) -> Dict[str, bool]:
+    """读取缓存的交易日历: {YYYYMMDD: 是否为交易日}"""
+    return _load_json(Path(output_dir) / CALENDAR_FILE)
+
+
+def record_trading_calendar(output_dir: Path, days: Dict[str, bool]):
+    """合并保存获取到的交易日历"""
+    if not days:
+        return
+    path = Path(output_dir) / CALENDAR_FILE
+    with _file_lock:
+        calendar = _load_json(path)
+        calendar.update(days)
+        _save_json(path, calendar)
+
+
+def plan_allows(plan_required: Optional[str], user_plan: Optional[str]) -> bool:
+    """用户计划等级是否满足API的要求（未配置时视为满足）"""
+    if not plan_required or not user_plan:
+        return True
+    if plan_required not in PLAN_TIERS or user_plan not in PLAN_TIERS:
+        return True
+    return PLAN_TIERS.index(plan_required) <= PLAN_TIERS.index(user_plan)
+
+
+def _dates_between(start_date: str, end_date: str) -> List[str]:
+    start = datetime.strptime(start_date, '%Y%m%d')
+    end = datetime.strptime(end_date, '%Y%m%d')
+    return [(start + timedelta(days=i)).strftime('%Y%m%d') for i in range((end - start).days + 1)]
+
+
+def format_duration(seconds: float) -> str:
+    """将秒数格式化为 x天x小时x分 / x秒"""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}秒"
+    days, rest = divmod(seconds, 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes = rest // 60
+    parts = []
+    if days:
+        parts.append(f"{days}天")
+    if hours:
+        parts.append(f"{hours}小时")
+    if minutes or not parts:
+        parts.append(f"{minutes}分")
+    return ''.join(parts)
+
+
+class RequestPlanner:
+    def __init__(self, config: Dict[str, Any], output_dir: str, journal: Optional[Any] = None):
+        """
+        Args:
+            config: api_config.yaml的内容
+            output_dir: 持久化数据的输出目录
+            journal: 作业日志（JobJournal），其中已完成或已跳过的日期视为已有
+        """
+        self.config = config
+        self.output_dir = Path(output_dir)
+        self.journal = journal
+        self.user_plan = config.get('global', {}).get('user_plan')
+        self.history = load_request_history(self.output_dir)
+        self.calendar = load_trading_calendar(self.output_dir)
+
+    def _endpoint_rates(self, endpoint: Optional[str]) -> Tuple[float, float, bool]:
+        """端点的 (每次调用的页数, 每个请求的耗时, 是否有历史记录)"""
+        entry = self.history.get(endpoint) if endpoint else None
+        if not entry or not entry.get('calls') or not entry.get('pages'):
+            return DEFAULT_PAGES_PER_CALL, DEFAULT_SECONDS_PER_REQUEST, False
+        return entry['pages'] / entry['calls'], entry.get('seconds', 0.0) / entry['pages'], True
+
+    def _is_trading_day(self, date: str) -> Tuple[bool, bool]:
+        """(是否为交易日, 是否来自缓存的交易日历)；未缓存的日期按工作日估算"""
+        if date in self.calendar:
+            return bool(self.calendar[date]), True
+        return datetime.strptime(date, '%Y%m%d').weekday() < 5, False
+
+    def _on_disk(self, api_name: str, api_config: Dict[str, Any]) -> set:
+        """已持久化的日期（单日文件、manifest中已合并的日期和作业日志中已完成的日期）"""
+        api_dir = self.output_dir / api_config['output_dir']
+        dates = set(dataset_layout.find_daily_files(api_dir)) | set(dataset_layout.compacted_dates(api_dir))
+        if self.journal is not None:
+            dates |= self.journal.finished_dates(api_name)
+        return dates
+
+    def plan(self, chunks: List[Tuple[str, str]], rate_limit: Optional[float] = None,
+             concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """
+        估算按chunk执行日期范围持久化将发出的请求数，与DataPersister的执行方式一致:
+        - range API: 只获取缺少文件的日期，Client按日逐个请求
+        - 单日API: 每个缺少文件的日期请求一次，trading_days_only的API跳过非交易日
+        - 交易日历: 有trading_days_only的单日API时每个chunk请求一次
+        - 静态数据: 由本地常量生成，不发出请求
+
+        Args:
+            chunks: [(开始日期, 结束日期)]
+            rate_limit: 每秒请求数上限（None表示不限制）
+            concurrency: 同时进行的请求数（默认为Client的并发上限）
+
+        Returns:
+            {'apis': {API名称: 估算}, 'calendar': 交易日历的估算, 'total_requests', 'wall_seconds', ...}
+        """
+        concurrency = concurrency or Client.MAX_WORKERS
+        chunk_dates = [_dates_between(start, end) for start, end in chunks]
+        apis: Dict[str, Dict[str, Any]] = {}
+        uses_calendar = False
+
+        for api_name, api_config in self.config.get('apis', {}).items():
+            if not api_config.get('enabled', True):
+                continue
+            is_range = api_config.get('is_range', False)
+            is_static = not is_range and api_config.get('is_static', False)
+            endpoint = METHOD_ENDPOINTS.get(api_config['method'])
+            pages_per_call, seconds_per_request, has_history = self._endpoint_rates(endpoint)
+            on_disk = self._on_disk(api_name, api_config)
+            entry: Dict[str, Any] = {
+                'kind': 'range' if is_range else ('static' if is_static else 'single'),
+                'endpoint': endpoint,
+                'plan_required': api_config.get('plan_required'),
+                'allowed': plan_allows(api_config.get('plan_required'), self.user_plan),
+                'dates': sum(len(dates) for dates in chunk_dates),
+                'on_disk': sum(1 for dates in chunk_dates for date in dates if date in on_disk),
+                'calls': 0,
+                'non_trading_days': 0,
+                'pages_per_call': pages_per_call,
+                'history': has_history,
+            }
+
+            if is_static:
+                # 静态数据的文件名不含日期，文件存在时所有日期都跳过
+                static_file = self.output_dir / api_config['output_dir'] / api_config['file_pattern']
+                entry['on_disk'] = entry['dates'] if static_file.exists() else 0
+                if endpoint and not static_file.exists():
+                    entry['calls'] = 1
+            elif is_range:
+                entry['calls'] = entry['dates'] - entry['on_disk']
+            else:
+                trading_days_only = api_config.get('trading_days_only', False)
+                uses_calendar = uses_calendar or (trading_days_only and entry['allowed'])
+                for dates in chunk_dates:
+                    for date in dates:
+                        if date in on_disk:
+                            continue
+                        if trading_days_only and not self._is_trading_day(date)[0]:
+                            entry['non_trading_days'] += 1
+                            continue
+                        entry['calls'] += 1
+
+            entry['requests'] = int(round(entry['calls'] * pages_per_call))
+            entry['seconds'] = entry['requests'] * seconds_per_request
+            apis[api_name] = entry
+
+        calendar_days = [date for dates in chunk_dates for date in dates]
+        cached_days = sum(1 for date in calendar_days if self._is_trading_day(date)[1])
+        pages_per_call, seconds_per_request, _ = self._endpoint_rates(CALENDAR_ENDPOINT)
+        calendar_requests = int(round(len(chunks) * pages_per_call)) if uses_calendar else 0
+        calendar = {
+            'requests': calendar_requests,
+            'seconds': calendar_requests * seconds_per_request,
+            'cached_days': cached_days,
+            'estimated_days': len(calendar_days) - cached_days,
+        }
+
+        allowed = [entry for entry in apis.values() if entry['allowed']]
+        total_requests = sum(entry['requests'] for entry in allowed) + calendar['requests']
+        total_seconds = sum(entry['seconds'] for entry in allowed) + calendar['seconds']
+        # 受并发上限约束的耗时和受速率限制约束的耗时中较长的一方
+        wall_seconds = total_seconds / concurrency
+        if rate_limit:
+            wall_seconds = max(wall_seconds, total_requests / rate_limit)
+
+        return {
+            'chunks': len(chunks),
+            'dates': len(calendar_days),
+            'user_plan': self.user_plan,
+            'rate_limit': rate_limit,
+            'concurrency': concurrency,
+            'apis': apis,
+            'calendar': calendar,
+            'total_requests': total_requests,
+            'wall_seconds': wall_seconds,
+        }
+
+
+def format_plan(plan: Dict[str, Any]) -> List[str]:
+    """将请求规划格式化为输出行"""
+    lines = [
+        f"请求规划: {plan['chunks']} 个chunks，{plan['dates']} 天，计划等级 {plan['user_plan'] or '未配置'}",
+        f"{'API':<26}{'类型':<8}{'已有':>8}{'调用':>8}{'页/调用':>9}{'请求':>9}  说明",
+    ]
+    for api_name, entry in plan['apis'].items():
+        notes = []
+        if not entry['allowed']:
+            notes.append(f"需要 {entry['plan_required']} 计划，持久化时跳过")
+        if entry['kind'] == 'static' and not entry['endpoint']:
+            notes.append('本地常量')
+        if entry['non_trading_days']:
+            notes.append(f"跳过非交易日 {entry['non_trading_days']} 天")
+        if entry['endpoint'] and not entry['history']:
+            notes.append('无历史分页数')
+        lines.append(f"{api_name:<26}{entry['kind']:<8}{entry['on_disk']:>6}/{entry['dates']:<4}"
+                     f"{entry['calls']:>6}{entry['pages_per_call']:>9.2f}{entry['requests']:>9}  {'，'.join(notes)}")
+
+    calendar = plan['calendar']
+    if calendar['requests']:
+        lines.append(f"交易日历: {calendar['requests']} 次请求")
+    if calendar['estimated_days']:
+        lines.append(f"交易日历未缓存的 {calendar['estimated_days']} 天按工作日估算")
+    rate = f"{plan['rate_limit']}/秒" if plan['rate_limit'] else '不限制'
+    lines.append(f"合计: {plan['total_requests']} 次请求，速率限制 {rate}，并发 {plan['concurrency']}，"
+                 f"预计耗时 {format_duration(plan['wall_seconds'])}")
+    return lines
@@ -0,0 +1,151 @@
+"""
+任务图调度
+任务之间声明依赖，依赖完成后立即在所属的线程池中执行。
+任务按加入顺序优先提交（先加入静态数据、交易日历等被依赖的任务），
+依赖失败或跳过时下游任务跳过，不再执行
+"""
+
+import heapq
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+PENDING = 'pending'
+SUCCESS = 'success'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+class SkipTask(Exception):
+    """任务无需执行（文件已存在、数据为空等），下游任务也随之跳过"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Task:
+    def __init__(self, task_id: str, func: Callable[..., Any], deps: Sequence[str] = (), pool: str = 'default'):
+        """
+        Args:
+            task_id: 任务ID
+            func: 任务函数，按deps的顺序接收依赖任务的返回值
+            deps: 依赖的任务ID
+            pool: 执行任务的线程池
+        """
+        self.task_id = task_id
+        self.func = func
+        self.deps = list(deps)
+        self.pool = pool
+        self.status = PENDING
+        self.result: Any = None
+        # 失败时为异常信息，跳过时为原因
+        self.error: Optional[str] = None
+
+
+class TaskGraph:
+    def __init__(self):
+        self.tasks: Dict[str, Task] = {}
+
+    def add(self, task_id: str, func: Callable[..., Any], deps: Sequence[str] = (),
+            pool: str = 'default') -> str:
+        """加入任务（依赖必须已加入，因此任务图不会有环）"""
+        if task_id in self.tasks:
+            raise ValueError(f"任务已存在: {task_id}")
+        missing = [dep for dep in deps if dep not in self.tasks]
+        if missing:
+            raise ValueError(f"任务 {task_id} 的依赖不存在: {missing}")
+        self.tasks[task_id] = Task(task_id, func, deps, pool)
+        return task_id
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def run(self, pool_sizes: Dict[str, int]) -> Dict[str, Task]:
+        """
+        执行所有任务，返回 {任务ID: 任务}
+
+        Args:
+            pool_sizes: {线程池名称: 线程数}，未列出的线程池使用1个线程
+
+        下游任务都已开始执行后释放任务的返回值，只有没有下游的任务保留返回值
+        """
+        pools = {name: ThreadPoolExecutor(max_workers=max(pool_sizes.get(name, 1), 1), thread_name_prefix=name)
+                 for name in {task.pool for task in self.tasks.values()}}
+        run = _GraphRun(self.tasks)
+        try:
+            while run.ready or run.running:
+                run.submit_ready(pools)
+                if run.running:
+                    run.collect()
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True)
+
+        return self.tasks
+
+
+class _GraphRun:
+    """TaskGraph.run 一次执行中的状态：就绪队列、执行中的任务和依赖计数"""
+
+    def __init__(self, tasks: Dict[str, Task]):
+        self.tasks = tasks
+        self.dependents: Dict[str, List[str]] = {task_id: [] for task_id in tasks}
+        self.remaining: Dict[str, int] = {}
+        for task in tasks.values():
+            self.remaining[task.task_id] = len(task.deps)
+            for dep in task.deps:
+                self.dependents[dep].append(task.task_id)
+
+        # 就绪队列按任务加入的顺序排列
+        self.order = {task_id: i for i, task_id in enumerate(tasks)}
+        self.ready = [(self.order[task_id], task_id) for task_id, count in self.remaining.items() if count == 0]
+        heapq.heapify(self.ready)
+        self.running: Dict[Future, Task] = {}
+        # 还未取用结果的下游任务数，全部取用后释放结果（例如已写入的数据）
+        self.consumers = {task_id: len(children) for task_id, children in self.dependents.items()}
+
+    def release(self, task: Task):
+        """任务已取用依赖的结果，所有下游都已取用的结果被释放"""
+        for dep in task.deps:
+            self.consumers[dep] -= 1
+            if self.consumers[dep] == 0:
+                self.tasks[dep].result = None
+
+    def finish(self, task: Task):
+        """任务结束后，依赖都已结束的下游任务进入就绪队列"""
+        for child_id in self.dependents[task.task_id]:
+            child = self.tasks[child_id]
+            if task.status != SUCCESS and child.status == PENDING:
+                child.status = SKIPPED
+                child.error = task.error if task.status == SKIPPED else f"依赖任务失败: {task.task_id}"
+            self.remaining[child_id] -= 1
+            if self.remaining[child_id] == 0:
+                heapq.heappush(self.ready, (self.order[child_id], child_id))
+
+    def submit_ready(self, pools: Dict[str, ThreadPoolExecutor]):
+        """提交就绪队列中的任务（已跳过的任务直接结束）"""
+        while self.ready:
+            task = self.tasks[heapq.heappop(self.ready)[1]]
+            if task.status == SKIPPED:
+                self.release(task)
+                self.finish(task)
+                continue
+            args = [self.tasks[dep].result for dep in task.deps]
+            self.release(task)
+            self.running[pools[task.pool].submit(task.func, *args)] = task
+
+    def collect(self):
+        """等待至少一个任务结束并记录结果"""
+        done, _ = wait(self.running, return_when=FIRST_COMPLETED)
+        for future in done:
+            task = self.running.pop(future)
+            try:
+                task.result = future.result()
+                task.status = SUCCESS
+            except SkipTask as e:
+                task.status = SKIPPED
+                task.error = e.reason
+            except Exception as e:
+                task.status = FAILED
+                task.error = str(e)
+            self.finish(task)
@@ -0,0 +1,205 @@
+"""
+搜索索引模块
+代码列（Code、LocalCode）按不同的代码保存行号，支持精确匹配和在不同的代码中部分匹配，
+公司名列使用n-gram索引支持部分匹配。
+索引以附属文件 {file}.index.json 保存在数据文件旁，按文件签名（大小、修改时间、内容哈希）判断是否过期
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from .dataset_layout import file_signature, sidecar_path, signature_matches
+
+INDEX_VERSION = 1
+
+# 精确匹配的列（4位代码同时匹配末尾补0的5位代码）
+EXACT_COLUMNS = ['Code', 'LocalCode']
+
+# 部分匹配的列
+TEXT_COLUMNS = ['CompanyName', 'CompanyNameEnglish']
+
+# n-gram长度（2可以覆盖较短的日文公司名）
+NGRAM = 2
+
+
+def _ngrams(text: str) -> Set[str]:
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def _positions(values: pd.Series) -> Dict[str, List[int]]:
+    """{值: 行号列表}，缺失值不索引"""
+    return {str(value): rows.tolist() for value, rows in values.groupby(values, sort=False).indices.items()}
+
+
+def _unique_rows(matches: List[List[int]]) -> np.ndarray:
+    """合并行号列表，去重并排序"""
+    if not matches:
+        return np.array([], dtype=np.int64)
+    return np.unique(np.concatenate([np.asarray(rows, dtype=np.int64) for rows in matches]))
+
+
+class SearchIndex:
+    def __init__(self, rows: int = 0, exact: Optional[Dict[str, Dict[str, List[int]]]] = None,
+                 text: Optional[Dict[str, Dict[str, Any]]] = None, signature: Optional[Dict[str, Any]] = None):
+        self.rows = rows
+        self.exact = exact or {}
+        self.text = text or {}
+        self.signature = signature
+
+    @property
+    def columns(self) -> List[str]:
+        """已建立索引的列"""
+        return list(self.exact) + list(self.text)
+
+    @classmethod
+    def build(cls, data: pd.DataFrame, signature: Optional[Dict[str, Any]] = None) -> 'SearchIndex':
+        """从数据构建索引"""
+        exact = {col: _positions(data[col].astype('string')) for col in EXACT_COLUMNS if col in data.columns}
+
+        text = {}
+        for col in TEXT_COLUMNS:
+            if col not in data.columns:
+                continue
+            # 只对不同的值建立n-gram，行号按值保存
+            by_value = _positions(data[col].astype('string'))
+            values = list(by_value)
+            ngrams: Dict[str, List[int]] = {}
+            for value_id, value in enumerate(values):
+                for gram in _ngrams(value.lower()):
+                    ngrams.setdefault(gram, []).append(value_id)
+            text[col] = {'values': values, 'rows': [by_value[value] for value in values], 'ngrams': ngrams}
+
+        return cls(len(data), exact, text, signature)
+
+    def lookup(self, term: str, columns: Optional[Iterable[str]] = None) -> np.ndarray:
+        """
+        查找匹配的行号
+
+        Args:
+            term: 搜索词（代码列精确匹配，公司名列不区分大小写的部分匹配）
+            columns: 搜索的列（默认为所有已索引的列）
+        """
+        term = term.strip()
+        matches: List[List[int]] = []
+        for col in (columns or self.columns):
+            if col in self.exact:
+                keys = [term, term + '0'] if len(term) == 4 else [term]
+                matches.extend(self.exact[col].get(key, []) for key in keys)
+            elif col in self.text:
+                matches.extend(self._lookup_text(self.text[col], term.lower()))
+        return _unique_rows(matches)
+
+    def contains(self, term: str, columns: Optional[Iterable[str]] = None) -> np.ndarray:
+        """
+        在代码列的不同值中部分匹配（不区分大小写），不读取数据文件
+
+        Args:
+            term: 搜索词，例如部分代码 "720"
+            columns: 搜索的列（默认为所有代码列）
+        """
+        term = term.strip().lower()
+        matches: List[List[int]] = []
+        for col in (columns or self.exact):
+            if col in self.exact:
+                matches.extend(rows for value, rows in self.exact[col].items() if term in value.lower())
+        return _unique_rows(matches)
+
+    @staticmethod
+    def _lookup_text(entry: Dict[str, Any], term: str) -> List[List[int]]:
+        values = entry['values']
+        if len(term) >= NGRAM:
+            candidates: Optional[Set[int]] = None
+            for gram in _ngrams(term):
+                ids = set(entry['ngrams'].get(gram, []))
+                candidates = ids if candidates is None else candidates & ids
+                if not candidates:
+                    return []
+            value_ids: Iterable[int] = sorted(candidates or [])
+        else:
+            value_ids = range(len(values))
+        # n-gram候选需要再确认是否包含整个搜索词
+        return [entry['rows'][i] for i in value_ids if term in values[i].lower()]
+
+    def save(self, path: Path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                **(self.signature or {}),
+                'rows': self.rows,
+                'exact': self.exact,
+                'text': self.text,
+            }, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['SearchIndex']:
+        """读取索引文件（不存在或版本不同时返回None）"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if raw.get('version') != INDEX_VERSION:
+            return None
+        signature = {key: raw.get(key) for key in ('size', 'mtime_ns', 'content_hash')}
+        return cls(raw['rows'], raw['exact'], raw['text'], signature)
+
+
+def has_index_columns(columns: Iterable[str]) -> bool:
+    return any(col in EXACT_COLUMNS or col in TEXT_COLUMNS for col in columns)
+
+
+def index_path(file_path: Path) -> Path:
+    return sidecar_path(file_path, 'index')
+
+
+def write_index(data: pd.DataFrame, file_path: Path) -> Optional[SearchIndex]:
+    """为刚写入的数据文件建立索引（没有可索引的列时不建立）"""
+    if not has_index_columns(data.columns):
+        return None
+    index = SearchIndex.build(data, file_signature(file_path))
+    index.save(index_path(file_path))
+    return index
+
+
+def load_or_build_index(file_path: Path) -> SearchIndex:
+    """
+    读取数据文件的索引，不存在或文件已变化时只读取索引列重新建立
+
+    文件大小和修改时间与索引记录的一致时不读取数据文件
+    """
+    index = SearchIndex.load(index_path(file_path))
+    if index is not None and signature_matches(file_path, index.signature):
+        return index
+
+    names = pq.read_schema(file_path).names
+    columns = [col for col in EXACT_COLUMNS + TEXT_COLUMNS if col in names]
+    if columns:
+        data = pq.read_table(file_path, columns=columns).to_pandas()
+    else:
+        data = pd.DataFrame(index=pd.RangeIndex(pq.ParquetFile(file_path).metadata.num_rows))
+    index = SearchIndex.build(data, file_signature(file_path))
+    index.save(index_path(file_path))
+    return index
+
+
+def read_rows(file_path: Path, rows: np.ndarray, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """只读取包含指定行的row group，返回这些行"""
+    parquet_file = pq.ParquetFile(file_path)
+    metadata = parquet_file.metadata
+    offsets = np.cumsum([0] + [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)])
+    groups = sorted(set(np.searchsorted(offsets, rows, side='right') - 1))
+    if not groups:
+        return parquet_file.schema_arrow.empty_table().to_pandas()
+
+    table = parquet_file.read_row_groups(groups, columns=columns)
+    # 行号转换为读取结果中的位置
+    starts = {group: start for group, start in zip(groups, np.cumsum([0] + [
+        metadata.row_group(group).num_rows for group in groups[:-1]]))}
+    local = [starts[group] + row - offsets[group] for row, group in
+             zip(rows, np.searchsorted(offsets, rows, side='right') - 1)]
+    return table.take(local).to_pandas()
@@ -0,0 +1,277 @@
+"""
+流式摘要统计模块
+每次只读取一个row group，按列累积可合并的统计量：
+- 数值列: Welford/Chan 均值和方差、最小值、最大值、空值数
+- 分类列: 空值数、KMV近似唯一值数、space-saving近似高频值
+多个row group、多个文件的统计量可以直接合并；整个文件的结果按内容哈希缓存为 {file}.stats.json
+"""
+
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .dataset_layout import file_signature, sidecar_path, signature_matches
+
+STATS_VERSION = 2
+
+# KMV保留的最小哈希数（少于该数时唯一值数是精确的）
+KMV_SIZE = 1024
+
+# space-saving保留的候选值数
+TOP_K_CAPACITY = 64
+
+_HASH_SPACE = float(2 ** 64)
+
+
+class NumericStats:
+    """数值列的可合并统计量"""
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0,
+                 min: Optional[float] = None, max: Optional[float] = None, null_count: int = 0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = min
+        self.max = max
+        self.null_count = null_count
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        valid = values[~np.isnan(values)]
+        self.null_count += len(values) - len(valid)
+        if len(valid):
+            mean = float(valid.mean())
+            self.merge(NumericStats(len(valid), mean, float(((valid - mean) ** 2).sum()),
+                                    float(valid.min()), float(valid.max())))
+
+    def merge(self, other: 'NumericStats'):
+        self.null_count += other.null_count
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self) -> float:
+        """样本标准差（与pandas的std一致）"""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else float('nan')
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2,
+                'min': self.min, 'max': self.max, 'null_count': self.null_count}
+
+
+class CategoricalStats:
+    """分类列的可合并统计量"""
+
+    def __init__(self, count: int = 0, null_count: int = 0, hashes: Optional[List[int]] = None,
+                 counters: Optional[Dict[str, int]] = None, errors: Optional[Dict[str, int]] = None,
+                 floor: int = 0):
+        self.count = count
+        self.null_count = null_count
+        # KMV: 不同值的64位哈希中最小的KMV_SIZE个
+        self.hashes = np.asarray(hashes or [], dtype=np.uint64)
+        # space-saving: 候选值及其计数的上限，errors为计数中可能多计的部分（计数 - 误差 <= 实际计数 <= 计数）
+        self.counters = pd.Series(counters or {}, dtype=np.int64)
+        self.errors = pd.Series(errors or {}, dtype=np.int64)
+        # 不在候选值中的值的计数上限（没有淘汰过候选值时为0，计数是精确的）
+        self.floor = floor
+
+    def update(self, values: pa.ChunkedArray):
+        self.null_count += values.null_count
+        counts = pc.value_counts(pc.drop_null(values))
+        if len(counts) == 0:
+            return
+        distinct = counts.field('values').to_pandas().astype(str)
+        self.merge(CategoricalStats(
+            count=len(values) - values.null_count,
+            hashes=pd.util.hash_array(distinct.to_numpy(dtype=object)).tolist(),
+            counters=dict(zip(distinct, counts.field('counts').to_numpy())),
+        ))
+
+    def merge(self, other: 'CategoricalStats'):
+        self.count += other.count
+        self.null_count += other.null_count
+        self.hashes = np.unique(np.concatenate([self.hashes, other.hashes]))[:KMV_SIZE]
+        # 可合并的space-saving: 一方没有的候选值按该方的计数上限（floor）计入，计数和误差都不会偏小
+        keys = self.counters.index.union(other.counters.index)
+        counters = self.counters.reindex(keys, fill_value=self.floor) + \
+            other.counters.reindex(keys, fill_value=other.floor)
+        errors = self.errors.reindex(keys, fill_value=self.floor) + other.errors.reindex(keys, fill_value=other.floor)
+        floor = self.floor + other.floor
+        if len(counters) > TOP_K_CAPACITY:
+            kept = counters.nlargest(TOP_K_CAPACITY).index
+            # 被淘汰的值之后再出现时，以淘汰时的最大计数作为其已有计数的上限
+            floor = int(counters.drop(kept).max())
+            counters, errors = counters[kept], errors[kept]
+        self.counters = counters.astype(np.int64)
+        self.errors = errors.astype(np.int64)
+        self.floor = floor
+
+    @property
+    def unique_count(self) -> int:
+        if len(self.hashes) < KMV_SIZE:
+            return len(self.hashes)
+        return int(round((KMV_SIZE - 1) * _HASH_SPACE / float(self.hashes[-1])))
+
+    @property
+    def approximate(self) -> bool:
+        """唯一值数是否为估计值"""
+        return len(self.hashes) >= KMV_SIZE
+
+    @property
+    def top_values_approximate(self) -> bool:
+        """高频值及其计数是否为估计值（淘汰过候选值时计数为上限）"""
+        return self.floor > 0
+
+    def top_values(self, k: int = 5) -> Dict[str, int]:
+        return {str(value): int(count) for value, count in self.counters.nlargest(k).items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'count': self.count, 'null_count': self.null_count,
+                'hashes': [int(h) for h in self.hashes],
+                'counters': {str(value): int(count) for value, count in self.counters.items()},
+                'errors': {str(value): int(error) for value, error in self.errors.items()},
+                'floor': self.floor}
+
+
+class DatasetStats:
+    """一个或多个文件的统计量"""
+
+    def __init__(self, rows: int = 0, columns: Optional[List[str]] = None,
+                 numeric: Optional[Dict[str, NumericStats]] = None,
+                 categorical: Optional[Dict[str, CategoricalStats]] = None,
+                 uncompressed_bytes: int = 0):
+        self.rows = rows
+        self.columns = columns or []
+        self.numeric = numeric or {}
+        self.categorical = categorical or {}
+        self.uncompressed_bytes = uncompressed_bytes
+
+    def update(self, table: pa.Table):
+        """累积一个row group（或其过滤后的部分）"""
+        self.rows += table.num_rows
+        for name in table.column_names:
+            if name not in self.columns:
+                self.columns.append(name)
+            column = table.column(name)
+            arrow_type = column.type
+            if pa.types.is_dictionary(arrow_type):
+                arrow_type = arrow_type.value_type
+            if pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type):
+                self.numeric.setdefault(name, NumericStats()).update(pc.cast(column, pa.float64()).to_numpy())
+            elif pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+                self.categorical.setdefault(name, CategoricalStats()).update(column)
+
+    def merge(self, other: 'DatasetStats'):
+        self.rows += other.rows
+        self.uncompressed_bytes += other.uncompressed_bytes
+        for name in other.columns:
+            if name not in self.columns:
+                self.columns.append(name)
+        for name, stats in other.numeric.items():
+            self.numeric.setdefault(name, NumericStats()).merge(stats)
+        for name, cat_stats in other.categorical.items():
+            self.categorical.setdefault(name, CategoricalStats()).merge(cat_stats)
+
+    def summary(self) -> Dict[str, Any]:
+        """与原先的摘要统计相同的输出格式"""
+        return {
+            'total_rows': self.rows,
+            'total_columns': len(self.columns),
+            'numeric_columns': {
+                name: {'count': s.count, 'mean': s.mean if s.count else float('nan'), 'std': s.std,
+                       'min': s.min if s.min is not None else float('nan'),
+                       'max': s.max if s.max is not None else float('nan'),
+                       'null_count': s.null_count}
+                for name, s in self.numeric.items()
+            },
+            'categorical_columns': {
+                name: {'unique_count': s.unique_count, 'approximate': s.approximate,
+                       'null_count': s.null_count, 'top_values': s.top_values(),
+                       'top_values_approximate': s.top_values_approximate}
+                for name, s in self.categorical.items()
+            },
+            'uncompressed_size_mb': round(self.uncompressed_bytes / (1024 * 1024), 2),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'rows': self.rows,
+            'columns': self.columns,
+            'numeric': {name: s.to_dict() for name, s in self.numeric.items()},
+            'categorical': {name: s.to_dict() for name, s in self.categorical.items()},
+            'uncompressed_bytes': self.uncompressed_bytes,
+        }
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> 'DatasetStats':
+        return cls(
+            rows=raw['rows'],
+            columns=raw['columns'],
+            numeric={name: NumericStats(**s) for name, s in raw['numeric'].items()},
+            categorical={name: CategoricalStats(**s) for name, s in raw['categorical'].items()},
+            uncompressed_bytes=raw['uncompressed_bytes'],
+        )
+
+
+def stats_path(file_path: Path) -> Path:
+    return sidecar_path(file_path, 'stats')
+
+
+def compute_file_stats(file_path: Path, row_filter: Optional[ds.Expression] = None) -> DatasetStats:
+    """逐个row group计算文件的统计量（row_filter用于只统计合并文件中的部分日期）"""
+    parquet_file = pq.ParquetFile(file_path)
+    metadata = parquet_file.metadata
+    stats = DatasetStats(columns=list(parquet_file.schema_arrow.names))
+    for i in range(metadata.num_row_groups):
+        table = parquet_file.read_row_group(i)
+        if row_filter is not None:
+            table = table.filter(row_filter)
+            if table.num_rows == 0:
+                continue
+        stats.update(table)
+        row_group = metadata.row_group(i)
+        size = sum(row_group.column(j).total_uncompressed_size for j in range(row_group.num_columns))
+        # 过滤后按行数比例估算
+        if row_filter is not None:
+            size = int(size * table.num_rows / max(row_group.num_rows, 1))
+        stats.uncompressed_bytes += size
+    return stats
+
+
+def file_stats(file_path: Path, use_cache: bool = True) -> DatasetStats:
+    """整个文件的统计量（按文件签名缓存）"""
+    cache_path = stats_path(file_path)
+    if use_cache and cache_path.exists():
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            if raw.get('version') == STATS_VERSION and signature_matches(file_path, raw):
+                return DatasetStats.from_dict(raw['stats'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    stats = compute_file_stats(file_path)
+    if use_cache:
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': STATS_VERSION, **file_signature(file_path), 'stats': stats.to_dict()},
+                      f, ensure_ascii=False)
+    return stats
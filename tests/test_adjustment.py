@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+from jquantsapi import adjustment
+
+
+def _quotes():
+    return pd.DataFrame(
+        {
+            "Date": pd.to_datetime(
+                [
+                    "2022-01-03",
+                    "2022-01-04",
+                    "2022-01-05",
+                    "2022-01-03",
+                    "2022-01-04",
+                    "2022-01-05",
+                ]
+            ),
+            "Code": ["13010", "13010", "13010", "72030", "72030", "72030"],
+            "AdjustmentFactor": [1.0, 0.5, 1.0, 1.0, 1.0, 0.25],
+            "Open": [100.0, 50.0, 52.0, 10.0, 10.0, 2.5],
+            "High": [100.0, 50.0, 52.0, 10.0, 10.0, 2.5],
+            "Low": [100.0, 50.0, 52.0, 10.0, 10.0, 2.5],
+            "Close": [100.0, 50.0, 52.0, 10.0, 10.0, 2.5],
+            "Volume": [1.0, 2.0, 2.0, 4.0, 4.0, 16.0],
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "how, exp_close, exp_volume",
+    (
+        ("backward", [50.0, 50.0, 52.0, 2.5, 2.5, 2.5], [2.0, 2.0, 2.0, 16, 16, 16]),
+        ("forward", [100.0, 100.0, 104.0, 10, 10, 10], [1.0, 1.0, 1.0, 4.0, 4.0, 4.0]),
+    ),
+)
+def test_adjust_prices(how, exp_close, exp_volume):
+    df = _quotes().sample(frac=1, random_state=0)
+    ret = adjustment.adjust_prices(df, how=how)
+    assert ret["Close"].tolist() == exp_close
+    assert ret["Volume"].tolist() == exp_volume
+
+    adjuster = adjustment.PriceAdjuster()
+    for date, chunk in _quotes().groupby("Date"):
+        adjuster.append(chunk)
+    ret = adjuster.adjusted(how=how)
+    assert ret["Close"].tolist() == exp_close
+    assert ret["Volume"].tolist() == exp_volume
+
+
+def test_price_adjuster_rejects_old_dates():
+    df = _quotes()
+    adjuster = adjustment.PriceAdjuster(df)
+    with pytest.raises(ValueError):
+        adjuster.append(df.iloc[[2]])
+
+
+def test_adjust_prices_invalid_how():
+    with pytest.raises(ValueError):
+        adjustment.adjust_prices(_quotes(), how="both")
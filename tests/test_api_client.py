@@ -257,4 +257,13 @@ class TestJQuantsAPIClient:
         
         # 测试无效日期
         result = self.api_client._parse_date('invalid_date')
-        assert result == 'invalid_date' 
\ No newline at end of file
+        assert result == 'invalid_date' 
+    
+    def test_shared_client(self):
+        """测试传入已有Client时直接复用"""
+        shared = Mock()
+        api_client = JQuantsAPIClient(client=shared)
+        assert api_client.client is shared
+        
+        api_client.close()
+        shared.close.assert_called_once()
@@ -1,3 +1,7 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import nullcontext as does_not_raise
 from datetime import datetime
 from unittest.mock import MagicMock, call, patch
@@ -5,8 +9,10 @@ from unittest.mock import MagicMock, call, patch
 import pandas as pd
 import pytest
 from dateutil import tz
+from requests.exceptions import HTTPError
 
 import jquantsapi
+from jquantsapi.resilience import CircuitBreakerRegistry, CircuitOpenError
 
 
 @pytest.mark.parametrize(
@@ -315,3 +321,293 @@ def test_get_price_range():
             call.get_prices_daily_quotes(date_yyyymmdd="2020-03-02"),
         ]
         mock.reset_mock()
+
+
+@pytest.mark.parametrize(
+    "text, exp",
+    (
+        ('{"daily_quotes": []}', ""),
+        ('{"daily_quotes": [], "pagination_key": "abc"}', "abc"),
+        (
+            '{"daily_quotes": [{"Code": "pagination_key"}],\n "pagination_key" : "x\\"y"}',
+            'x"y',
+        ),
+    ),
+)
+def test_pagination_key(text, exp):
+    assert jquantsapi.client._pagination_key(text) == exp
+
+
+def test_get_price_range_decode_processes():
+    """
+    decode_processes を指定した場合も、全ページを取得して同じ結果を返す事を確認する。
+    """
+
+    def quote(code, date):
+        row = {col: 1.0 for col in jquantsapi.constants.PRICES_DAILY_QUOTES_COLUMNS}
+        row.update({"Code": code, "Date": date})
+        return row
+
+    def raw(date_yyyymmdd, pagination_key=""):
+        if pagination_key == "":
+            d = {"daily_quotes": [quote("13010", date_yyyymmdd)]}
+            d["pagination_key"] = date_yyyymmdd
+        else:
+            d = {"daily_quotes": [quote("72030", date_yyyymmdd)]}
+        return json.dumps(d)
+
+    cli = jquantsapi.Client(refresh_token="dummy", decode_processes=2)
+    cli.get_id_token = MagicMock()
+    cli._get_prices_daily_quotes_raw = MagicMock(side_effect=raw)
+    try:
+        ret = cli.get_price_range("20220104", "20220105")
+    finally:
+        cli.close()
+
+    assert ret["Code"].tolist() == ["13010", "13010", "72030", "72030"]
+    dates = list(pd.to_datetime(["2022-01-04", "2022-01-05"]))
+    assert ret["Date"].tolist() == dates * 2
+    assert cli._get_prices_daily_quotes_raw.call_count == 4
+
+
+def test_client_shared_executor():
+    """
+    range 系メソッドは渡された executor を共有し、close() でも停止しない事を確認する。
+    """
+    executor = ThreadPoolExecutor(max_workers=2)
+    with jquantsapi.Client(
+        refresh_token="dummy", max_workers=2, executor=executor
+    ) as cli:
+        cli.get_id_token = MagicMock()
+        cli.get_prices_daily_quotes = MagicMock(
+            return_value=pd.DataFrame(columns=["Code", "Date"])
+        )
+        cli.get_price_range("20220104", "20220105")
+        assert cli._get_executor() is executor
+        adapter = cli._request_session().get_adapter("https://")
+        assert adapter._pool_maxsize == 2 + 10
+    assert cli._executor is executor
+    executor.submit(lambda: None).result()
+    executor.shutdown()
+
+
+def test_client_limits_in_flight_requests():
+    """
+    複数の range 系メソッドを同時に呼んでも、同時リクエスト数が max_workers 以下である事を確認する。
+    """
+    cli = jquantsapi.Client(
+        refresh_token="dummy", max_workers=3, coalesce_requests=False
+    )
+    cli._base_headers = MagicMock(return_value={})
+    lock = threading.Lock()
+    peak = [0]
+
+    def get(*args, **kwargs):
+        with lock:
+            peak[0] = max(peak[0], cli._limiter.in_flight)
+        time.sleep(0.01)
+        ret = MagicMock(status_code=200)
+        ret.text = '{"daily_quotes": []}'
+        return ret
+
+    session = MagicMock()
+    session.get.side_effect = get
+    cli._session = session
+    cli.get_id_token = MagicMock()
+    with ThreadPoolExecutor(max_workers=4) as callers:
+        futures = [
+            callers.submit(cli.get_price_range, "20220101", "20220110")
+            for _ in range(4)
+        ]
+        for future in futures:
+            future.result()
+    cli.close()
+    assert session.get.call_count == 40
+    assert peak[0] <= 3
+
+
+@pytest.mark.parametrize(
+    "status_code, history, exp",
+    (
+        (200, (), False),
+        (503, (), True),
+        (200, (MagicMock(status=429),), True),
+        (200, (MagicMock(status=None),), False),
+    ),
+)
+def test_is_congested(status_code, history, exp):
+    ret = MagicMock(status_code=status_code)
+    ret.raw.retries.history = history
+    assert jquantsapi.client._is_congested(ret) == exp
+
+
+def test_client_adaptive_concurrency():
+    cli = jquantsapi.Client(
+        refresh_token="dummy", max_workers=8, adaptive_concurrency=True
+    )
+    cli._base_headers = MagicMock(return_value={})
+    ret = MagicMock(status_code=429)
+    ret.raise_for_status.side_effect = HTTPError("429")
+    cli._session = MagicMock()
+    cli._session.get.return_value = ret
+    assert cli.concurrency == cli.MAX_WORKERS
+    with pytest.raises(HTTPError):
+        cli._get("https://example.com")
+    assert cli.concurrency == 2
+
+
+def test_client_circuit_breaker_fails_fast():
+    """
+    エンドポイントの失敗が続くと、以降のリクエストは送信せずに失敗する事を確認する。
+    """
+    cli = jquantsapi.Client(
+        refresh_token="dummy",
+        circuit_breakers=CircuitBreakerRegistry(failure_threshold=2),
+    )
+    cli._base_headers = MagicMock(return_value={})
+    ret = MagicMock(status_code=503)
+    ret.raise_for_status.side_effect = HTTPError("503")
+    cli._session = MagicMock()
+    cli._session.get.return_value = ret
+    url = f"{cli.JQUANTS_API_BASE}/prices/daily_quotes"
+    for _ in range(2):
+        with pytest.raises(HTTPError):
+            cli._get(url)
+    with pytest.raises(CircuitOpenError):
+        cli._get(url)
+    assert cli._session.get.call_count == 2
+    assert cli.circuit_breakers.states() == {"/prices/daily_quotes": "open"}
+
+
+def test_client_circuit_breaker_releases_probe():
+    """
+    half-open の試行がリクエスト前に失敗しても、次の試行を許可する事を確認する。
+    """
+    rate_limiter = MagicMock()
+    cli = jquantsapi.Client(
+        refresh_token="dummy",
+        rate_limiter=rate_limiter,
+        circuit_breakers=CircuitBreakerRegistry(failure_threshold=1, reset_timeout=0),
+    )
+    cli._base_headers = MagicMock(return_value={})
+    cli._session = MagicMock()
+    cli._session.get.return_value = MagicMock(status_code=200)
+    url = f"{cli.JQUANTS_API_BASE}/prices/daily_quotes"
+    cli.circuit_breakers.get("/prices/daily_quotes").record_failure()
+
+    rate_limiter.acquire.side_effect = TimeoutError()
+    with pytest.raises(TimeoutError):
+        cli._get(url)
+    rate_limiter.acquire.side_effect = None
+    cli._get(url)
+    assert cli.circuit_breakers.states() == {"/prices/daily_quotes": "closed"}
+
+
+@pytest.mark.parametrize("coalesce_requests, exp_calls", ((True, 2), (False, 6)))
+def test_client_coalesces_identical_requests(coalesce_requests, exp_calls):
+    """
+    同じ URL・パラメーターで同時に呼ばれた GET は1回だけ送信される事を確認する。
+    """
+    cli = jquantsapi.Client(refresh_token="dummy", coalesce_requests=coalesce_requests)
+    cli._base_headers = MagicMock(return_value={})
+    barrier = threading.Barrier(6)
+
+    def get(url, params=None, **kwargs):
+        time.sleep(0.05)
+        ret = MagicMock(status_code=200)
+        ret.text = json.dumps(params)
+        return ret
+
+    cli._session = MagicMock()
+    cli._session.get.side_effect = get
+    url = f"{cli.JQUANTS_API_BASE}/prices/daily_quotes"
+
+    def call(i):
+        params = {"date": "20220104", "pagination_key": str(i % 2)}
+        barrier.wait()
+        return cli._get_text(url, params)
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        rets = list(executor.map(call, range(6)))
+    assert cli._session.get.call_count == exp_calls
+    assert rets == [
+        json.dumps({"date": "20220104", "pagination_key": str(i % 2)}) for i in range(6)
+    ]
+
+
+def test_range_priority():
+    """
+    range 系メソッドは既定で bulk、priority() 内では指定した優先度で実行される事を確認する。
+    """
+    cli = jquantsapi.Client(refresh_token="dummy")
+    cli.get_id_token = MagicMock()
+    priorities = []
+
+    def getter(date_yyyymmdd):
+        priorities.append(jquantsapi.concurrency.current_priority())
+        return pd.DataFrame(columns=["Code", "Date"])
+
+    cli.get_prices_daily_quotes = getter
+    cli.get_price_range("20220104", "20220105")
+    assert priorities == ["bulk", "bulk"]
+
+    priorities.clear()
+    with cli.priority("interactive"):
+        cli.get_price_range("20220104", "20220105")
+    assert priorities == ["interactive", "interactive"]
+    cli.close()
+
+
+def test_client_rate_limiter():
+    """
+    rate_limiter を指定するとリクエストごとにトークンを取得する事を確認する。
+    """
+    rate_limiter = MagicMock()
+    cli = jquantsapi.Client(refresh_token="dummy", rate_limiter=rate_limiter)
+    cli._base_headers = MagicMock(return_value={})
+    ret = MagicMock(status_code=200)
+    cli._session = MagicMock()
+    cli._session.get.return_value = ret
+    url = f"{cli.JQUANTS_API_BASE}/prices/daily_quotes"
+    cli._get(url, {"date": "20220725"})
+    cli._get(url, {"date": "20220726"})
+    assert rate_limiter.acquire.call_count == 2
+
+
+def test_client_request_stats():
+    """
+    送信したリクエストがエンドポイントごとに1ページ目と全ページに分けて集計される事を確認する。
+    """
+    cli = jquantsapi.Client(refresh_token="dummy")
+    cli._base_headers = MagicMock(return_value={})
+    cli._session = MagicMock()
+    cli._session.get.return_value = MagicMock(status_code=200)
+    url = f"{cli.JQUANTS_API_BASE}/prices/daily_quotes"
+    cli._get(url, {"date": "20220725"})
+    cli._get(url, {"date": "20220725", "pagination_key": "key"})
+    cli._get(f"{cli.JQUANTS_API_BASE}/indices", {"date": "20220725"})
+    stats = cli.request_stats()
+    assert {k: (v["calls"], v["pages"]) for k, v in stats.items()} == {
+        "/prices/daily_quotes": (1, 2),
+        "/indices": (1, 1),
+    }
+    assert stats["/indices"]["seconds"] >= 0
+
+
+def test_get_id_token_refreshes_once():
+    """
+    複数スレッドから同時にトークンを要求しても更新は1回だけ行われる事を確認する。
+    """
+    cli = jquantsapi.Client(refresh_token="dummy")
+
+    def post(url, **kwargs):
+        time.sleep(0.05)
+        ret = MagicMock()
+        ret.json.return_value = {"idToken": "id-token"}
+        return ret
+
+    cli._post = MagicMock(side_effect=post)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        tokens = list(executor.map(lambda _: cli.get_id_token(), range(8)))
+    assert tokens == ["id-token"] * 8
+    assert cli._post.call_count == 1
@@ -0,0 +1,260 @@
+import threading
+import time
+
+import pytest
+
+from jquantsapi.concurrency import (
+    AdaptiveConcurrencyLimiter,
+    ConcurrencyLimiter,
+    PriorityExecutor,
+    RequestCoalescer,
+    _WeightedQueues,
+    current_priority,
+    priority,
+)
+
+
+def test_concurrency_limiter_bounds_in_flight():
+    limiter = ConcurrencyLimiter(2)
+    lock = threading.Lock()
+    peak = [0]
+
+    def work():
+        with limiter:
+            with lock:
+                peak[0] = max(peak[0], limiter.in_flight)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] == 2
+    assert limiter.in_flight == 0
+
+
+def test_concurrency_limiter_raise_limit_wakes_waiters():
+    limiter = ConcurrencyLimiter(1)
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def work():
+        with limiter:
+            acquired.set()
+
+    t = threading.Thread(target=work)
+    t.start()
+    assert not acquired.wait(0.05)
+    limiter.limit = 2
+    assert acquired.wait(1)
+    t.join()
+    limiter.release()
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.parametrize("limit", (0, -1))
+def test_concurrency_limiter_invalid_limit(limit):
+    with pytest.raises(ValueError):
+        ConcurrencyLimiter(limit)
+    with pytest.raises(ValueError):
+        ConcurrencyLimiter(1).limit = limit
+
+
+def test_adaptive_limiter_additive_increase():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=2, max_limit=4)
+    assert limiter.limit == 2
+    # 1往復 (上限とおおよそ同数の応答) ごとに1ずつ増える
+    for _ in range(3):
+        limiter.record(0.1)
+    assert limiter.limit == 3
+    for _ in range(100):
+        limiter.record(0.1)
+    assert limiter.limit == 4
+
+
+def test_adaptive_limiter_multiplicative_decrease():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=16, initial=16)
+    limiter.record(0.1, congested=True)
+    assert limiter.limit == 8
+    # 同じ混雑に対する並行中の応答では続けて減らさない
+    limiter.record(0.1, congested=True)
+    assert limiter.limit == 8
+    time.sleep(0.12)
+    limiter.record(0.1, congested=True)
+    assert limiter.limit == 4
+
+
+def test_adaptive_limiter_decrease_on_rising_latency():
+    limiter = AdaptiveConcurrencyLimiter(
+        min_limit=1, max_limit=16, initial=16, latency_alpha=1.0
+    )
+    limiter.record(0.01)
+    assert limiter.limit == 16
+    limiter.record(0.05)
+    assert limiter.limit == 8
+
+
+def test_adaptive_limiter_bounds():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=3, max_limit=5, initial=10)
+    assert limiter.limit == 5
+    for _ in range(10):
+        time.sleep(0.001)
+        limiter.record(0.0, congested=True)
+    assert limiter.limit == 3
+    with pytest.raises(ValueError):
+        AdaptiveConcurrencyLimiter(min_limit=5, max_limit=3)
+    with pytest.raises(ValueError):
+        AdaptiveConcurrencyLimiter(decrease=1.0)
+
+
+def test_request_coalescer_shares_in_flight_call():
+    coalescer = RequestCoalescer()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def func(x):
+        calls.append(x)
+        started.set()
+        release.wait(1)
+        return object()
+
+    results = [None] * 4
+
+    def work(i, key):
+        results[i] = coalescer.call(key, func, key)
+
+    leader = threading.Thread(target=work, args=(0, "a"))
+    leader.start()
+    started.wait(1)
+    followers = [threading.Thread(target=work, args=(i, "a")) for i in (1, 2)]
+    for t in followers:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in [leader] + followers:
+        t.join()
+    assert calls == ["a"]
+    assert results[0] is results[1] is results[2]
+
+    # 完了後の呼び出しは改めて実行する
+    work(3, "a")
+    assert calls == ["a", "a"]
+    assert results[3] is not results[0]
+
+
+def test_request_coalescer_shares_exception():
+    coalescer = RequestCoalescer()
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def func():
+        started.set()
+        release.wait(1)
+        raise ValueError("failed")
+
+    def work():
+        try:
+            coalescer.call("a", func)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work)]
+    threads[0].start()
+    started.wait(1)
+    threads.append(threading.Thread(target=work))
+    threads[1].start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+    assert len(errors) == 2
+    assert coalescer._in_flight == {}
+
+
+def test_weighted_queues_fair_share():
+    queues = _WeightedQueues({"interactive": 16, "normal": 4, "bulk": 1})
+    for i in range(100):
+        queues.push("bulk", i)
+        queues.push("interactive", i)
+    popped = [queues.pop()[0] for _ in range(34)]
+    # 重みの比率で取り出し、bulk も飢餓状態にならない
+    assert popped.count("interactive") == 32
+    assert popped.count("bulk") == 2
+    assert len(queues) == 200 - 34
+
+
+def test_priority_context():
+    assert current_priority() == "normal"
+    assert current_priority(default="bulk") == "bulk"
+    with priority("interactive"):
+        assert current_priority(default="bulk") == "interactive"
+        with priority("bulk"):
+            assert current_priority() == "bulk"
+        assert current_priority() == "interactive"
+    assert current_priority() == "normal"
+    with pytest.raises(ValueError):
+        with priority("urgent"):
+            pass
+
+
+def test_concurrency_limiter_grants_by_priority():
+    limiter = ConcurrencyLimiter(1)
+    limiter.acquire()
+    order = []
+
+    def work(name):
+        with priority(name):
+            with limiter:
+                order.append(name)
+
+    threads = []
+    for name in ("bulk", "bulk", "interactive"):
+        t = threading.Thread(target=work, args=(name,))
+        t.start()
+        threads.append(t)
+        while limiter.waiting < len(threads):
+            time.sleep(0.001)
+    limiter.release()
+    for t in threads:
+        t.join()
+    assert order == ["interactive", "bulk", "bulk"]
+
+
+def test_priority_executor():
+    executor = PriorityExecutor(max_workers=1)
+    release = threading.Event()
+    order = []
+
+    def task(name):
+        order.append((name, current_priority()))
+
+    blocker = executor.submit(release.wait, 1)
+    with priority("bulk"):
+        bulk = [executor.submit(task, "bulk") for _ in range(3)]
+    with priority("interactive"):
+        interactive = executor.submit(task, "interactive")
+    release.set()
+    for future in [blocker, interactive] + bulk:
+        future.result()
+    executor.shutdown()
+
+    assert order[0] == ("interactive", "interactive")
+    assert order[1:] == [("bulk", "bulk")] * 3
+    with pytest.raises(RuntimeError):
+        executor.submit(task, "normal")
+
+
+def test_priority_executor_shutdown_cancel_futures():
+    executor = PriorityExecutor(max_workers=1)
+    release = threading.Event()
+    blocker = executor.submit(release.wait, 1)
+    while not blocker.running():
+        time.sleep(0.001)
+    pending = executor.submit(time.sleep, 0)
+    executor.shutdown(wait=False, cancel_futures=True)
+    release.set()
+    assert blocker.result() is True
+    assert pending.cancelled()
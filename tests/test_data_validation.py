@@ -8,11 +8,13 @@ import numpy as np
 from datetime import datetime
 import sys
 import os
+from unittest.mock import patch
 
 # 添加scripts目录到路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
 
-from utils.data_validator import DataValidator
+from utils.data_validator import DataValidator, ValidationPlan, validation_path
+from utils.parquet_writer import write_parquet
 
 class TestDataValidator:
     def setup_method(self):
@@ -243,4 +245,135 @@ class TestDataValidator:
         
         is_valid, errors = self.validator.validate_api_data('daily_quotes', duplicate_data)
         assert not is_valid
-        assert any("重复记录" in error for error in errors) 
\ No newline at end of file
+        assert any("重复记录" in error for error in errors)
+    
+    def test_compiled_plan_cached(self):
+        """测试验证计划按API和列名编译并缓存"""
+        data = pd.DataFrame({
+            'Date': ['2024-01-01'],
+            'Code': ['7203'],
+            'Open': [100.0],
+            'High': [110.0],
+            'Low': [95.0],
+            'Close': [105.0],
+            'Volume': [1000000]
+        })
+        
+        self.validator.validate_api_data('daily_quotes', data)
+        plan = self.validator.compile_plan('daily_quotes', list(data.columns))
+        self.validator.validate_api_data('daily_quotes', data)
+        
+        assert self.validator.compile_plan('daily_quotes', list(data.columns)) is plan
+        assert self.validator.compile_plan('daily_quotes', ['Date', 'Code']) is not plan
+    
+    def test_ohlc_counts_and_parallel(self):
+        """测试OHLC错误计数，并行执行时错误顺序不变"""
+        data = pd.DataFrame({
+            'Date': ['2024-01-01'] * 4,
+            'Code': ['7203', '6758', '1301', 'ABC!'],
+            'Open': [100.0, 100.0, 100.0, np.nan],
+            'High': [90.0, 110.0, 90.0, 110.0],
+            'Low': [95.0, 95.0, 95.0, 95.0],
+            'Close': [105.0, 105.0, 105.0, 105.0],
+            'Volume': [1000000, -1, 1000000, 1000000]
+        })
+        validator = DataValidator(cache_size=0)
+        validator.validation_rules['daily_quotes']['code_format'] = r'^[A-Z0-9]{4,5}$'
+        
+        _, errors = validator.validate_api_data('daily_quotes', data)
+        with patch('utils.data_validator.PARALLEL_MIN_ROWS', 1):
+            _, parallel_errors = validator.validate_api_data('daily_quotes', data)
+        
+        assert errors == [
+            "列 Volume 包含负值",
+            "发现 2 条记录 High < Low",
+            "发现 2 条记录 High 不是最高价",
+            "列 Code 包含格式不正确的代码",
+        ]
+        assert parallel_errors == errors
+    
+    def test_payable_date_placeholder(self):
+        """测试PayableDate允许 "-" 和空字符串"""
+        data = pd.DataFrame({
+            'AnnouncementDate': ['2024-01-01', '2024-01-02'],
+            'Code': ['7203', '6758'],
+            'ReferenceNumber': ['2024-001', '2024-002'],
+            'PayableDate': ['-', '2024-03-01']
+        })
+        
+        is_valid, errors = self.validator.validate_api_data('dividend', data)
+        assert is_valid, f"有效数据验证失败: {errors}"
+        
+        data['PayableDate'] = ['-', '2024/03/01']
+        is_valid, errors = self.validator.validate_api_data('dividend', data)
+        assert errors == ["列 PayableDate 日期格式不正确，应为 %Y-%m-%d"]
+    
+    def test_sampled_validation(self):
+        """测试抽样模式只在样本上做逐行检查，重复记录仍检查全部行"""
+        data = pd.DataFrame({
+            'Date': ['2024-01-01'] * 1000,
+            'Code': [str(1000 + i) for i in range(999)] + ['1000'],
+            'Open': [100.0] * 1000,
+            'High': [110.0] * 1000,
+            'Low': [95.0] * 1000,
+            'Close': [105.0] * 1000,
+            'Volume': [1000000] * 1000
+        })
+        data.loc[0, 'High'] = 90.0
+        
+        _, errors = self.validator.validate_api_data('daily_quotes', data)
+        assert "发现 1 条记录 High 不是最高价" in errors
+        assert "发现 1 条重复记录" in errors
+        
+        validator = DataValidator(sample_rows=100)
+        _, errors = validator.validate_api_data('daily_quotes', data)
+        assert "发现 1 条重复记录" in errors
+        assert all("抽样 100/1000 行" in error for error in errors if "最高价" in error)
+
+    
+    def test_result_cache(self):
+        """测试相同数据不重复验证，数据变化后重新验证"""
+        data = pd.DataFrame({
+            'Date': ['2024-01-01'],
+            'Sector33Code': ['0050'],
+            'SellingExcludingShortSellingTurnoverValue': [-1000000]
+        })
+        
+        first = self.validator.validate_api_data('short_selling', data)
+        with patch.object(ValidationPlan, 'run') as mock_run:
+            second = self.validator.validate_api_data('short_selling', data.copy())
+        mock_run.assert_not_called()
+        assert second == first
+        
+        data['SellingExcludingShortSellingTurnoverValue'] = [1000000]
+        is_valid, errors = self.validator.validate_api_data('short_selling', data)
+        assert is_valid, f"有效数据验证失败: {errors}"
+    
+    def test_file_result(self, tmp_path):
+        """测试验证结果保存为附属文件，文件内容或规则变化后失效"""
+        data = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-01']),
+            'Sector33Code': ['0050'],
+            'SellingExcludingShortSellingTurnoverValue': [1000000000]
+        })
+        file_path = tmp_path / '20240101.parquet'
+        write_parquet(data, file_path)
+        
+        assert self.validator.load_file_result(file_path) is None
+        assert self.validator.validate_file('short_selling', file_path) == (True, [])
+        assert validation_path(file_path).exists()
+        with patch('utils.data_validator.pd.read_parquet') as mock_read:
+            assert self.validator.validate_file('short_selling', file_path) == (True, [])
+        mock_read.assert_not_called()
+        
+        # 文件被改写
+        write_parquet(data.assign(SellingExcludingShortSellingTurnoverValue=-1), file_path)
+        os.utime(file_path, ns=(0, 0))
+        is_valid, errors = self.validator.validate_file('short_selling', file_path)
+        assert not is_valid
+        assert any("包含负值" in error for error in errors)
+        
+        # 规则变化
+        validator = DataValidator()
+        validator.validation_rules['short_selling']['positive_columns'] = []
+        assert validator.load_file_result(file_path) is None
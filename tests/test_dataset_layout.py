@@ -0,0 +1,132 @@
+"""
+数据目录布局与压缩合并测试
+"""
+
+import pytest
+import pandas as pd
+import pyarrow.parquet as pq
+import sys
+import os
+
+# 添加scripts目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from utils.dataset_layout import (
+    compact_api, compacted_dates, daily_file_path, file_signature, find_daily_files, load_manifest,
+    locate_date, signature_matches
+)
+
+def _write_daily(api_dir, date, codes):
+    path = daily_file_path(api_dir, date)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame({
+        'Date': pd.to_datetime([date] * len(codes)),
+        'Code': codes,
+        'Close': [float(i) for i in range(len(codes))],
+    }).to_parquet(path, index=False)
+
+class TestDatasetLayout:
+    def test_daily_file_path(self, tmp_path):
+        """测试flat和hive布局的文件路径"""
+        assert daily_file_path(tmp_path, '20240501') == tmp_path / '20240501.parquet'
+        assert daily_file_path(tmp_path, '20240501', layout='hive') == \
+            tmp_path / 'year=2024' / 'month=05' / '20240501.parquet'
+        with pytest.raises(ValueError):
+            daily_file_path(tmp_path, '20240501', layout='unknown')
+
+    def test_compact_api(self, tmp_path):
+        """测试按月合并、排序、manifest和删除单日文件"""
+        _write_daily(tmp_path, '20240430', ['67580'])
+        _write_daily(tmp_path, '20240501', ['72030', '13010'])
+        _write_daily(tmp_path, '20240502', ['13010'])
+        _write_daily(tmp_path, '20240601', ['72030'])
+
+        results = compact_api(tmp_path, 'daily_quotes', before_month='202406')
+
+        assert [r['month'] for r in results] == ['202404', '202405']
+        assert sorted(find_daily_files(tmp_path)) == ['20240601']
+        may = pd.read_parquet(tmp_path / 'year=2024' / 'month=05' / '202405.parquet')
+        assert may['Code'].tolist() == ['13010', '13010', '72030']
+        assert may['Date'].dt.strftime('%Y%m%d').tolist() == ['20240501', '20240502', '20240501']
+
+        entry = load_manifest(tmp_path)['files']['year=2024/month=05/202405.parquet']
+        assert entry['dates'] == ['20240501', '20240502']
+        assert entry['date_column'] == 'Date'
+        assert entry['rows'] == 3
+        assert sorted(compacted_dates(tmp_path)) == ['20240430', '20240501', '20240502']
+
+    def test_compact_api_merges_existing_month(self, tmp_path):
+        """测试新的单日文件与已有的月文件合并"""
+        _write_daily(tmp_path, '20240501', ['72030'])
+        compact_api(tmp_path)
+        _write_daily(tmp_path, '20240502', ['72030'])
+        compact_api(tmp_path)
+
+        month_file = tmp_path / 'year=2024' / 'month=05' / '202405.parquet'
+        assert pq.ParquetFile(month_file).metadata.num_rows == 2
+        assert load_manifest(tmp_path)['files']['year=2024/month=05/202405.parquet']['dates'] == \
+            ['20240501', '20240502']
+
+    def test_compact_api_replaces_compacted_dates(self, tmp_path):
+        """测试月文件已包含的日期又有单日文件时替换该日期的数据，不重复"""
+        _write_daily(tmp_path, '20240501', ['72030', '13010'])
+        _write_daily(tmp_path, '20240502', ['72030'])
+        compact_api(tmp_path)
+        _write_daily(tmp_path, '20240501', ['72030'])
+        compact_api(tmp_path)
+
+        month_file = tmp_path / 'year=2024' / 'month=05' / '202405.parquet'
+        data = pd.read_parquet(month_file)
+        assert len(data) == 2
+        assert sorted(data['Date'].dt.strftime('%Y%m%d')) == ['20240501', '20240502']
+        assert load_manifest(tmp_path)['files']['year=2024/month=05/202405.parquet']['rows'] == 2
+        assert find_daily_files(tmp_path) == {}
+
+    def test_compact_api_without_date_column(self, tmp_path):
+        """测试月文件没有日期列时，已包含日期的单日文件视为被取代并删除，之后不再重写月文件"""
+        for date in ['20240501', '20240502']:
+            pd.DataFrame({'Code': ['72030'], 'Close': [1.0]}).to_parquet(tmp_path / f'{date}.parquet', index=False)
+        compact_api(tmp_path)
+        pd.DataFrame({'Code': ['13010'], 'Close': [2.0]}).to_parquet(tmp_path / '20240501.parquet', index=False)
+
+        results = compact_api(tmp_path)
+
+        assert (results[0]['daily_files'], results[0]['superseded'], results[0]['rows']) == (0, 1, 2)
+        assert find_daily_files(tmp_path) == {}
+        month_file = tmp_path / 'year=2024' / 'month=05' / '202405.parquet'
+        assert pd.read_parquet(month_file)['Code'].tolist() == ['72030', '72030']
+        assert compact_api(tmp_path) == []
+
+    def test_compact_api_dry_run(self, tmp_path):
+        """测试试运行不写入"""
+        _write_daily(tmp_path, '20240501', ['72030'])
+
+        results = compact_api(tmp_path, dry_run=True)
+
+        assert results[0]['daily_files'] == 1
+        assert sorted(find_daily_files(tmp_path)) == ['20240501']
+        assert load_manifest(tmp_path)['files'] == {}
+
+    def test_locate_date(self, tmp_path):
+        """测试查找单日文件和合并后的文件"""
+        _write_daily(tmp_path, '20240501', ['72030'])
+        assert locate_date(tmp_path, '20240501') == (tmp_path / '20240501.parquet', None)
+
+        compact_api(tmp_path)
+
+        assert locate_date(tmp_path, '20240501') == \
+            (tmp_path / 'year=2024' / 'month=05' / '202405.parquet', 'Date')
+        assert locate_date(tmp_path, '20240502') is None
+
+    def test_signature_matches(self, tmp_path):
+        """测试文件签名：大小和修改时间相同时不计算哈希，只有修改时间变化时比较内容哈希"""
+        _write_daily(tmp_path, '20240501', ['72030'])
+        path = daily_file_path(tmp_path, '20240501')
+        signature = file_signature(path)
+
+        assert signature_matches(path, signature)
+        assert not signature_matches(path, None)
+        assert not signature_matches(path, {**signature, 'size': signature['size'] + 1})
+        os.utime(path, ns=(0, 0))
+        assert signature_matches(path, signature)
+        assert not signature_matches(path, {**signature, 'content_hash': 'other'})
@@ -0,0 +1,219 @@
+"""
+数据检查工具测试
+"""
+
+import pytest
+import pandas as pd
+import sys
+import os
+from unittest.mock import patch
+
+# 添加scripts目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from inspect_data import DataInspector, parse_condition, read_parquet_footer
+from utils.dataset_layout import compact_api
+from utils.parquet_writer import write_parquet
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'api_config.yaml')
+
+class TestDataInspector:
+    def setup_method(self):
+        self.data = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-05-01', '2024-05-01', '2024-05-01']),
+            'Code': ['72030', '13010', None],
+            'Close': [105.0, 205.0, None],
+        })
+
+    def _write(self, tmp_path, date, row_group_size=2):
+        api_dir = tmp_path / 'daily_quotes'
+        api_dir.mkdir(exist_ok=True)
+        data = self.data.assign(Date=pd.Timestamp(date))
+        write_parquet(data, api_dir / f'{date}.parquet', 'daily_quotes', row_group_size=row_group_size)
+
+    def test_read_parquet_footer(self, tmp_path):
+        """测试只读取footer获取行数、schema和统计信息"""
+        self._write(tmp_path, '20240501')
+
+        info = read_parquet_footer(tmp_path / 'daily_quotes' / '20240501.parquet')
+
+        assert info['rows'] == 3
+        assert info['row_groups'] == 2
+        assert info['columns'] == ['Date', 'Code', 'Close']
+        assert info['dtypes']['Code'] == 'string'
+        assert info['row_group_stats'][0]['statistics']['Close'] == {'min': 105.0, 'max': 205.0, 'null_count': 0}
+        assert info['row_group_stats'][1]['statistics']['Code'] == {'min': None, 'max': None, 'null_count': 1}
+        assert info['compressed_bytes'] > 0
+
+    def test_get_file_info_does_not_decode(self, tmp_path):
+        """测试文件信息不读取数据"""
+        self._write(tmp_path, '20240501')
+        inspector = DataInspector(str(tmp_path), CONFIG_PATH)
+
+        with patch('inspect_data.pd.read_parquet') as mock_read:
+            info = inspector.get_file_info('daily_quotes', '20240501')
+
+        mock_read.assert_not_called()
+        assert info['rows'] == 3
+        assert info['shape'] == (3, 3)
+        assert info['api_config']['method'] == 'get_price_range'
+
+    def test_get_file_info_compacted(self, tmp_path):
+        """测试合并后的月文件返回该日行数"""
+        self._write(tmp_path, '20240501')
+        self._write(tmp_path, '20240502')
+        compact_api(tmp_path / 'daily_quotes', 'daily_quotes')
+        inspector = DataInspector(str(tmp_path), CONFIG_PATH)
+
+        info = inspector.get_file_info('daily_quotes', '20240502')
+
+        assert info['rows'] == 3
+        assert info['file_rows'] == 6
+
+    def test_summarize_apis(self, tmp_path):
+        """测试并行汇总所有文件"""
+        for date in ['20240501', '20240502', '20240503']:
+            self._write(tmp_path, date)
+        (tmp_path / 'daily_quotes' / '20240504.parquet').write_bytes(b'broken')
+        inspector = DataInspector(str(tmp_path), CONFIG_PATH)
+
+        summary = inspector.summarize_apis(max_workers=2)
+
+        assert summary['daily_quotes']['files'] == 4
+        assert summary['daily_quotes']['errors'] == 1
+        assert summary['daily_quotes']['rows'] == 9
+        assert summary['daily_quotes']['row_groups'] == 6
+
+    def test_parse_condition(self):
+        """测试解析查询条件"""
+        assert parse_condition('Code=7203') == ('Code', '=', '7203')
+        assert parse_condition('Close >= 1000') == ('Close', '>=', '1000')
+        with pytest.raises(ValueError):
+            parse_condition('Code~7203')
+
+    def test_query_across_dates(self, tmp_path):
+        """测试跨日期查询（单日文件和合并后的月文件）"""
+        for date in ['20240430', '20240501', '20240502', '20240503']:
+            self._write(tmp_path, date, row_group_size=1)
+        compact_api(tmp_path / 'daily_quotes', 'daily_quotes', before_month='202405')
+        inspector = DataInspector(str(tmp_path), CONFIG_PATH)
+
+        df = inspector.query('daily_quotes', '20240430', '20240502', columns=['Date', 'Close'],
+                             where=['Code=7203'], max_workers=2)
+
+        assert list(df.columns) == ['Date', 'Close']
+        assert df['Date'].dt.strftime('%Y%m%d').tolist() == ['20240430', '20240501', '20240502']
+        assert df['Close'].tolist() == [105.0, 105.0, 105.0]
+
+    def test_query_open_range_on_compacted_file(self, tmp_path):
+        """测试不限开始/结束日期时查询合并后的月文件（日期列为timestamp）"""
+        for date in ['20240501', '20240502']:
+            self._write(tmp_path, date)
+        compact_api(tmp_path / 'daily_quotes', 'daily_quotes')
+        inspector = DataInspector(str(tmp_path), CONFIG_PATH)
+
+        df = inspector.query('daily_quotes', '00000000', '99999999', where=['Code=7203'])
+        assert df['Date'].dt.strftime('%Y%m%d').tolist() == ['20240501', '20240502']
+
+        df = inspector.query('daily_quotes', '20240502', '99999999', where=['Code=7203'])
+        assert df['Date'].dt.strftime('%Y%m%d').tolist() == ['20240502']
+
+    def test_query_numeric_condition_and_missing_column(self, tmp_path):
+        """测试数值条件，以及条件列不存在时跳过文件"""
+        self._write(tmp_path, '20240501')
+        inspector = DataInspector(str(tmp_path), CONFIG_PATH)
+
+        df = inspector.query('daily_quotes', '20240501', '20240501', where=['Close>150'])
+        assert df['Code'].tolist() == ['13010']
+
+        df = inspector.query('daily_quotes', '20240501', '20240501', where=['Missing=1'])
+        assert df.empty
+
+    def test_iter_query_streams_chunks(self, tmp_path):
+        """测试按文件逐块返回结果"""
+        for date in ['20240501', '20240502', '20240503']:
+            self._write(tmp_path, date)
+        inspector = DataInspector(str(tmp_path), CONFIG_PATH)
+
+        chunks = list(inspector.iter_query('daily_quotes', '20240501', '20240503', max_workers=2))
+
+        assert [len(chunk) for chunk in chunks] == [3, 3, 3]
+        assert [chunk['Date'].iloc[0].strftime('%Y%m%d') for chunk in chunks] == \
+            ['20240501', '20240502', '20240503']
+
+    def test_search_data_with_index(self, tmp_path):
+        """测试使用索引搜索（单日和日期范围，包括合并后的月文件）"""
+        for date in ['20240430', '20240501', '20240502']:
+            self._write(tmp_path, date)
+        compact_api(tmp_path / 'daily_quotes', 'daily_quotes', before_month='202405')
+        inspector = DataInspector(str(tmp_path), CONFIG_PATH)
+
+        with patch('inspect_data.pd.read_parquet') as mock_read:
+            df = inspector.search_data('daily_quotes', '20240501', '7203')
+        mock_read.assert_not_called()
+        assert df['Code'].tolist() == ['72030']
+
+        df = inspector.search_data('daily_quotes', '20240430-20240502', '13010', ['Code'])
+        assert df['Date'].dt.strftime('%Y%m%d').tolist() == ['20240430', '20240501', '20240502']
+
+    def test_search_data_index_and_scan(self, tmp_path):
+        """测试默认搜索同时搜索未建立索引的字符串列，部分代码也能匹配"""
+        api_dir = tmp_path / 'listed_info'
+        api_dir.mkdir()
+        data = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-05-01'] * 3),
+            'Code': ['72030', '90200', '13010'],
+            'CompanyName': ['トヨタ自動車', '東日本旅客鉄道', '極洋'],
+            'Sector33CodeName': ['輸送用機器', '陸運業', '水産・農林業'],
+        })
+        write_parquet(data, api_dir / '20240501.parquet', 'listed_info')
+        inspector = DataInspector(str(tmp_path), CONFIG_PATH)
+
+        assert inspector.search_data('listed_info', '20240501', '輸送')['Code'].tolist() == ['72030']
+        assert inspector.search_data('listed_info', '20240501', '720')['Code'].tolist() == ['72030']
+        assert inspector.search_data('listed_info', '20240501', '東日本')['Code'].tolist() == ['90200']
+        assert inspector.search_data('listed_info', '20240501', '輸送', ['Code']).empty
+
+    def test_search_data_scan_string_columns(self, tmp_path):
+        """测试未建立索引的列逐列扫描字符串列"""
+        api_dir = tmp_path / 'daily_quotes'
+        api_dir.mkdir()
+        pd.DataFrame({
+            'Name': ['Toyota', 'Sony', None],
+            'Close': [7203.0, 1.0, 2.0],
+        }).to_parquet(api_dir / '20240501.parquet', index=False)
+        inspector = DataInspector(str(tmp_path), CONFIG_PATH)
+
+        assert inspector.search_data('daily_quotes', '20240501', 'sony')['Name'].tolist() == ['Sony']
+        # 数值列不参与扫描
+        assert inspector.search_data('daily_quotes', '20240501', '7203').empty
+
+    def test_get_summary_stats_range(self, tmp_path):
+        """测试日期范围的流式摘要统计（合并文件只统计范围内的日期）"""
+        for date in ['20240430', '20240501', '20240502']:
+            self._write(tmp_path, date)
+        compact_api(tmp_path / 'daily_quotes', 'daily_quotes', before_month='202405')
+        inspector = DataInspector(str(tmp_path), CONFIG_PATH)
+
+        stats = inspector.get_summary_stats('daily_quotes', '20240501-20240502', max_workers=2)
+        assert stats['total_rows'] == 6
+        assert stats['files'] == 2
+        assert stats['numeric_columns']['Close']['mean'] == 155.0
+        assert stats['categorical_columns']['Code']['null_count'] == 2
+
+        assert inspector.get_summary_stats('daily_quotes', 'all')['total_rows'] == 9
+        assert inspector.get_summary_stats('daily_quotes', '20240430')['total_rows'] == 3
+
+    def test_validate_data_uses_saved_result(self, tmp_path):
+        """测试验证已持久化的数据，文件未变化时不读取数据"""
+        for date in ['20240501', '20240502']:
+            self._write(tmp_path, date)
+        inspector = DataInspector(str(tmp_path), CONFIG_PATH)
+
+        result = inspector.validate_data('daily_quotes', '20240501-20240502', max_workers=2)
+        assert result['files'] == 2
+
+        with patch('utils.data_validator.pd.read_parquet') as mock_read:
+            again = inspector.validate_data('daily_quotes', 'all')
+        mock_read.assert_not_called()
+        assert again == result
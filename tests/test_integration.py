@@ -9,14 +9,23 @@ import shutil
 from pathlib import Path
 import sys
 import os
+import logging
+import threading
+import time
 from unittest.mock import Mock, patch
 
+import requests
+
 # 添加scripts目录到路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
 
-from utils.data_persister import DataPersister
+from utils.data_persister import DataPersister, contiguous_runs
 from utils.data_validator import DataValidator
 from utils.api_client import JQuantsAPIClient
+from utils.request_planner import load_trading_calendar
+from utils.job_journal import JobJournal
+import persist_date_range
+from jquantsapi.resilience import CircuitOpenError, RetryBudget
 
 class TestIntegration:
     def setup_method(self):
@@ -38,9 +47,14 @@ class TestIntegration:
             mock_api_client = Mock()
             mock_api_client_class.return_value = mock_api_client
             self.persister = DataPersister(self.config_path, self.output_dir)
+        
+        # 重试的退避等待不实际休眠
+        self.sleep_patcher = patch('utils.data_persister.time.sleep')
+        self.mock_sleep = self.sleep_patcher.start()
     
     def teardown_method(self):
         """清理测试环境"""
+        self.sleep_patcher.stop()
         shutil.rmtree(self.temp_dir, ignore_errors=True)
     
     def _create_test_config(self):
@@ -342,4 +356,265 @@ class TestIntegration:
             
             # 验证错误被正确捕获
             assert len(results['failed']) == 1
-            assert '网络错误' in results['failed'][0]['error'] 
\ No newline at end of file
+            assert '网络错误' in results['failed'][0]['error']
+
+    
+    def test_call_with_retry(self):
+        """测试按 retry_count 重试并共享重试预算"""
+        self.persister.api_client.client.retry_budget = RetryBudget(max_tokens=10)
+        api_config = {'retry_count': 3, 'retry_delay': 5}
+        func = Mock(side_effect=[requests.ConnectionError("网络错误"), requests.Timeout("超时"), 'ok'])
+        
+        result = self.persister._call_with_retry('daily_quotes', api_config, func, 'a')
+        
+        assert result == 'ok'
+        assert func.call_count == 3
+        assert self.mock_sleep.call_count == 2
+        assert self.persister.api_client.client.retry_budget.tokens == 8
+    
+    def test_call_with_retry_budget_exhausted(self):
+        """测试重试预算耗尽时不再重试"""
+        self.persister.api_client.client.retry_budget = RetryBudget(max_tokens=1)
+        api_config = {'retry_count': 3, 'retry_delay': 5}
+        func = Mock(side_effect=requests.ConnectionError("网络错误"))
+        
+        with pytest.raises(requests.ConnectionError, match="网络错误"):
+            self.persister._call_with_retry('daily_quotes', api_config, func)
+        assert func.call_count == 2
+    
+    def test_call_with_retry_permanent_error(self):
+        """测试400/403等永久性错误不重试、不消耗重试预算"""
+        self.persister.api_client.client.retry_budget = RetryBudget(max_tokens=10)
+        api_config = {'retry_count': 3, 'retry_delay': 5}
+        error = requests.HTTPError("403", response=Mock(status_code=403))
+        func = Mock(side_effect=error)
+        
+        with pytest.raises(requests.HTTPError):
+            self.persister._call_with_retry('daily_quotes', api_config, func)
+        assert func.call_count == 1
+        assert self.persister.api_client.client.retry_budget.tokens == 10
+        self.mock_sleep.assert_not_called()
+    
+    def test_call_with_retry_circuit_open(self):
+        """测试熔断器打开时立即失败"""
+        api_config = {'retry_count': 3, 'retry_delay': 5}
+        func = Mock(side_effect=CircuitOpenError("open"))
+        
+        with pytest.raises(CircuitOpenError):
+            self.persister._call_with_retry('daily_quotes', api_config, func)
+        assert func.call_count == 1
+        self.mock_sleep.assert_not_called()
+    
+    def test_shared_api_client(self):
+        """测试多个持久化器共享同一个API客户端"""
+        with patch('utils.data_persister.JQuantsAPIClient') as mock_api_client_class:
+            a = DataPersister(self.config_path, self.output_dir, api_client=self.api_client)
+            b = DataPersister(self.config_path, self.output_dir, api_client=self.api_client)
+        
+        assert a.api_client is self.api_client
+        assert b.api_client.client is a.api_client.client
+        mock_api_client_class.assert_not_called()
+    
+    def test_chunks_share_persister(self):
+        """测试所有chunk共享main中创建的持久化器，不按chunk重新读取配置"""
+        persister = Mock()
+        persister.persist_data_for_date_range.return_value = {'success': ['daily_quotes'], 'failed': [], 'skipped': []}
+        chunks = [('20240101', '20240107'), ('20240108', '20240114')]
+        
+        with patch.object(persist_date_range, 'DataPersister') as mock_persister_class:
+            success_count, failed_chunks = persist_date_range.run_chunks(
+                chunks, {'persister': persister}, 2, logging.getLogger('test'))
+        
+        assert (success_count, failed_chunks) == (2, [])
+        mock_persister_class.assert_not_called()
+        assert sorted(call.args[:2] for call in persister.persist_data_for_date_range.call_args_list) == chunks
+    
+    def test_partition_data_by_date(self):
+        """测试按日期一次性分组（datetime列和字符串列）"""
+        data = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-01', None]),
+            'DisclosedDate': ['2024-01-05', '2024-01-05', '2024-01-06', '2024-01-04'],
+            'Code': ['7203', '6758', '9984', '8306']
+        })
+        
+        partitions = self.persister._partition_data_by_date(
+            data, ['20240101', '20240102', '20240103', '20240104'])
+        
+        assert sorted(partitions) == ['20240101', '20240102', '20240104']
+        assert partitions['20240101']['Code'].tolist() == ['7203', '9984']
+        assert partitions['20240102']['Code'].tolist() == ['6758']
+        # Date列没有的日期回退到DisclosedDate列
+        assert partitions['20240104']['Code'].tolist() == ['8306']
+    
+    def test_partition_data_by_date_string_columns(self):
+        """测试YYYYMMDD和YYYY-MM-DD字符串日期"""
+        data = pd.DataFrame({
+            'Date': ['20240101', '2024-01-02', '2024-01-02'],
+            'Code': ['7203', '6758', '9984']
+        })
+        
+        partitions = self.persister._partition_data_by_date(data, ['20240101', '20240102'])
+        
+        assert partitions['20240101']['Code'].tolist() == ['7203']
+        assert partitions['20240102']['Code'].tolist() == ['6758', '9984']
+    
+    def test_saved_validation_result(self):
+        """测试保存的文件旁记录验证结果"""
+        with patch.object(self.persister.api_client, 'call_static_method') as mock_static:
+            mock_static.return_value = self._create_mock_data('market_segments')
+            self.persister.persist_static_data()
+        
+        static_file = next(Path(self.output_dir).glob('market_segments/*.parquet'))
+        assert self.persister.validator.load_file_result(static_file) == (True, [])
+    
+    def test_persist_date_range_concurrently(self):
+        """测试日期范围的单日API并发获取，静态数据只获取一次"""
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+        
+        def mock_single_side_effect(method_name, date):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            # time.sleep已被替换，用Event等待
+            threading.Event().wait(0.02)
+            with lock:
+                state['running'] -= 1
+            for api_name, api_config in self.persister.config['apis'].items():
+                if api_config['method'] == method_name:
+                    return self._create_mock_data(api_name)
+            return pd.DataFrame()
+        
+        with patch.object(self.persister.api_client, 'call_single_method') as mock_single, \
+             patch.object(self.persister.api_client, 'call_static_method') as mock_static:
+            mock_single.side_effect = mock_single_side_effect
+            mock_static.return_value = self._create_mock_data('market_segments')
+            
+            results = self.persister.persist_data_for_date_range('20240101', '20240103')
+        
+        assert results['failed'] == []
+        assert len(results['success']) == 6 * 3
+        assert mock_single.call_count == 5 * 3
+        mock_static.assert_called_once()
+        assert state['peak'] > 1
+        assert (Path(self.output_dir) / 'market_segments' / '20240103.parquet').exists()
+    
+    def test_skip_apis_above_user_plan(self):
+        """测试计划等级不足的API不调用"""
+        self.persister.config['global'] = {'user_plan': 'standard'}
+        
+        with patch.object(self.persister.api_client, 'call_single_method') as mock_single, \
+             patch.object(self.persister.api_client, 'call_static_method') as mock_static:
+            mock_single.side_effect = lambda method_name, date: pd.DataFrame()
+            mock_static.return_value = pd.DataFrame()
+            
+            results = self.persister.persist_data_for_date_range('20240101', '20240102')
+        
+        assert results['total_apis'] == 5
+        assert 'get_markets_breakdown' not in {call.args[0] for call in mock_single.call_args_list}
+    
+    def test_static_single_file_written_once(self):
+        """测试文件名不含日期的静态数据在日期范围内只有一个写入任务"""
+        self.persister.config['apis']['market_segments']['file_pattern'] = 'market_segments.parquet'
+        apis = {'market_segments': self.persister.config['apis']['market_segments']}
+        
+        graph, units = self.persister._build_date_range_graph(apis, '20240101', '20240107')
+        
+        assert [task_id for task_id in graph.tasks if task_id.startswith('write:')] == ['write:market_segments:20240101']
+        assert [(api_name, date) for api_name, date, _ in units] == [('market_segments', '20240101')]
+    
+    def test_persist_date_range_trading_calendar(self):
+        """测试仅交易日发布的API按交易日历跳过非交易日"""
+        self.persister.config['apis']['indices']['trading_days_only'] = True
+        calendar = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-01', '2024-01-02']),
+            'HolidayDivision': ['0', '1'],
+        })
+        
+        with patch.object(self.persister.api_client, 'call_single_method') as mock_single, \
+             patch.object(self.persister.api_client, 'call_static_method') as mock_static, \
+             patch.object(self.persister.api_client, 'call_trading_calendar', return_value=calendar):
+            mock_single.side_effect = lambda method_name, date: (
+                self._create_mock_data('indices') if method_name == 'get_indices' else pd.DataFrame())
+            mock_static.return_value = pd.DataFrame()
+            
+            results = self.persister.persist_data_for_date_range('20240101', '20240102')
+        
+        assert 'indices_20240102' in results['success']
+        assert {'api': 'indices', 'date': '20240101', 'reason': 'non_trading_day'} in results['skipped']
+        assert [call.args for call in mock_single.call_args_list if call.args[0] == 'get_indices'] == \
+            [('get_indices', '20240102')]
+        # 交易日历缓存供请求规划离线使用
+        assert load_trading_calendar(Path(self.output_dir)) == {'20240101': False, '20240102': True}
+    
+    def test_persist_date_range_with_journal(self):
+        """测试作业日志：租约过期的中断单元恢复后执行，失败的单元退避后重试，已完成的日期不再获取，没有数据的日期等待重新检查"""
+        self.persister.config['apis']['daily_quotes']['is_range'] = True
+        journal = JobJournal(Path(self.temp_dir) / '_journal.sqlite', backoff_base=0.0)
+        self.persister.journal = journal
+        # 上次运行中断时认领的单元
+        journal.enqueue('indices', ['20240103'])
+        journal.claim('indices', ['20240103'], 'crashed')
+        # 20240102没有range数据（休日）
+        range_data = pd.concat([self._create_mock_data('daily_quotes'),
+                                self._create_mock_data('daily_quotes').assign(Date='2024-01-03')])
+        state = {'fail': True}
+        
+        def mock_single_side_effect(method_name, date):
+            if method_name == 'get_listed_info' and date == '20240102' and state['fail']:
+                raise Exception('HTTP 500')
+            for api_name, api_config in self.persister.config['apis'].items():
+                if api_config['method'] == method_name:
+                    return self._create_mock_data(api_name)
+            return pd.DataFrame()
+        
+        with patch.object(self.persister.api_client, 'call_single_method') as mock_single, \
+             patch.object(self.persister.api_client, 'call_range_method', return_value=range_data) as mock_range, \
+             patch.object(self.persister.api_client, 'call_static_method') as mock_static:
+            mock_single.side_effect = mock_single_side_effect
+            mock_static.return_value = self._create_mock_data('market_segments')
+            
+            results = self.persister.persist_data_for_date_range('20240101', '20240103')
+            assert [item['api'] for item in results['failed']] == ['listed_info']
+            assert mock_range.call_args.args == ('get_price_range', '20240101', '20240103')
+            units = {(unit['api'], unit['date']): unit for unit in journal.units()}
+            assert units[('daily_quotes', '20240101')]['status'] == 'done'
+            assert units[('daily_quotes', '20240101')]['rows'] == 2
+            assert units[('daily_quotes', '20240102')]['status'] == 'empty'
+            assert units[('daily_quotes', '20240102')]['error'] == 'no_data'
+            assert units[('listed_info', '20240102')]['status'] == 'failed'
+            assert units[('indices', '20240103')]['status'] == 'running'
+            
+            # 重新运行：只处理恢复的单元和失败的单元
+            state['fail'] = False
+            mock_single.reset_mock()
+            mock_range.reset_mock()
+            # 租约未过期的单元不恢复
+            assert journal.recover() == 0
+            with patch('utils.job_journal.time.time', return_value=time.time() + 3600):
+                assert journal.recover() == 1
+            results = self.persister.persist_data_for_date_range('20240101', '20240103')
+        
+        assert results['failed'] == []
+        mock_range.assert_not_called()
+        assert sorted(call.args for call in mock_single.call_args_list) == \
+            [('get_indices', '20240103'), ('get_listed_info', '20240102')]
+        assert journal.units('listed_info')[1]['attempt'] == 2
+        assert 'failed' not in journal.summary()
+        journal.close()
+    
+    def test_fetch_range_missing_runs_only(self):
+        """测试range API只获取缺少文件的连续日期段"""
+        assert contiguous_runs(['20240105', '20240101', '20240102', '20240104']) == \
+            [('20240101', '20240102'), ('20240104', '20240105')]
+        api_config = dict(self.persister.config['apis']['daily_quotes'], is_range=True)
+        existing = self.persister._get_output_file_path('daily_quotes', api_config, '20240102')
+        self.persister._save_data(self._create_mock_data('daily_quotes'), existing, api_config)
+        
+        with patch.object(self.persister.api_client, 'call_range_method',
+                          return_value=self._create_mock_data('daily_quotes')) as mock_range:
+            data, missing_dates = self.persister._fetch_range_stage('daily_quotes', api_config, '20240101', '20240103')
+        
+        assert missing_dates == ['20240101', '20240103']
+        assert [call.args[1:] for call in mock_range.call_args_list] == [('20240101', '20240101'), ('20240103', '20240103')]
+        assert len(data) == 4
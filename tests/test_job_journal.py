@@ -0,0 +1,237 @@
+"""
+作业日志测试
+"""
+
+import sys
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+# 添加scripts目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from utils.job_journal import DONE, EMPTY, FAILED, PENDING, RUNNING, SKIPPED, JobJournal
+import persist_date_range
+
+DATES = ['20240501', '20240502', '20240503']
+
+class TestJobJournal:
+    def setup_method(self):
+        self.journal = None
+
+    def teardown_method(self):
+        if self.journal is not None:
+            self.journal.close()
+
+    def _journal(self, tmp_path, **kwargs):
+        self.journal = JobJournal(tmp_path / '_journal.sqlite', **kwargs)
+        return self.journal
+
+    def _statuses(self, journal):
+        return {unit['date']: unit['status'] for unit in journal.units('daily_quotes')}
+
+    def test_enqueue(self, tmp_path):
+        """测试登记单元，已有数据的日期登记为已完成，重复登记不改变状态"""
+        journal = self._journal(tmp_path)
+
+        assert journal.enqueue('daily_quotes', DATES, done={'20240501'}) == 3
+        assert journal.enqueue('daily_quotes', DATES + ['20240504']) == 1
+        assert journal.unknown_dates('daily_quotes', DATES + ['20240505']) == ['20240505']
+        assert self._statuses(journal) == {
+            '20240501': DONE, '20240502': PENDING, '20240503': PENDING, '20240504': PENDING}
+
+    def test_claim_is_exclusive(self, tmp_path):
+        """测试多个线程同时认领时每个单元只被认领一次"""
+        journal = self._journal(tmp_path)
+        dates = [f'202405{day:02d}' for day in range(1, 31)]
+        journal.enqueue('daily_quotes', dates)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            claims = list(executor.map(lambda i: journal.claim('daily_quotes', dates, f'worker{i}'), range(8)))
+
+        claimed = [date for dates_claimed in claims for date in dates_claimed]
+        assert sorted(claimed) == dates
+        assert all(unit['attempt'] == 1 for unit in journal.units('daily_quotes'))
+
+    def test_claim_across_connections(self, tmp_path):
+        """测试另一个连接（进程）不能认领已认领的单元"""
+        journal = self._journal(tmp_path)
+        journal.enqueue('daily_quotes', DATES)
+        other = JobJournal(tmp_path / '_journal.sqlite')
+
+        assert journal.claim('daily_quotes', DATES[:2], 'a') == DATES[:2]
+        assert other.claim('daily_quotes', DATES, 'b') == DATES[2:]
+        other.close()
+
+    def test_complete_and_skip(self, tmp_path):
+        """测试完成和跳过的单元不再认领，只更新自己认领的单元"""
+        journal = self._journal(tmp_path)
+        journal.enqueue('daily_quotes', DATES)
+        journal.claim('daily_quotes', DATES, 'a')
+
+        journal.complete('daily_quotes', '20240501', 100, 2048, 'abc')
+        journal.skip('daily_quotes', ['20240502'], 'no_data', 'a')
+        journal.skip('daily_quotes', ['20240503'], 'no_data', 'b')
+
+        assert self._statuses(journal) == {'20240501': DONE, '20240502': SKIPPED, '20240503': RUNNING}
+        unit = journal.units('daily_quotes')[0]
+        assert (unit['rows'], unit['bytes'], unit['checksum']) == (100, 2048, 'abc')
+        assert journal.finished_dates('daily_quotes') == {'20240501', '20240502'}
+        assert journal.claim('daily_quotes', DATES, 'c') == []
+
+    def test_fail_backoff_and_max_attempts(self, tmp_path):
+        """测试失败的单元在退避时间后重试，超过最大尝试次数后不再认领"""
+        journal = self._journal(tmp_path, max_attempts=2, backoff_base=0.0)
+        journal.enqueue('daily_quotes', DATES[:1])
+
+        journal.claim('daily_quotes', DATES, 'a')
+        journal.fail('daily_quotes', DATES, 'HTTP 500', 'a')
+        assert journal.units('daily_quotes')[0]['error'] == 'HTTP 500'
+        assert journal.next_retry_at() is not None
+        assert journal.retry_dates() == {'20240501'}
+
+        assert journal.claim('daily_quotes', DATES, 'a') == ['20240501']
+        journal.fail('daily_quotes', DATES, 'HTTP 500', 'a')
+        assert journal.units('daily_quotes')[0]['attempt'] == 2
+        assert journal.next_retry_at() is None
+        assert journal.claim('daily_quotes', DATES, 'a') == []
+        assert journal.summary() == {FAILED: 1}
+
+    def test_fail_waits_for_backoff(self, tmp_path, monkeypatch):
+        """测试退避时间未到时不认领"""
+        journal = self._journal(tmp_path)
+        journal.enqueue('daily_quotes', DATES[:1])
+        journal.claim('daily_quotes', DATES, 'a')
+
+        monkeypatch.setattr('utils.job_journal.jittered_backoff', lambda attempt, base, cap: 1000.0)
+        journal.fail('daily_quotes', DATES, 'HTTP 500', 'a')
+
+        assert journal.claim('daily_quotes', DATES, 'a') == []
+        assert journal.retry_dates() == set()
+
+    def test_defer_rechecks_empty_units(self, tmp_path):
+        """测试没有数据的单元在重新检查时间后再次认领，不参与失败重试，超过最大尝试次数后不再认领"""
+        journal = self._journal(tmp_path, max_attempts=2, recheck_seconds=0.0)
+        journal.enqueue('daily_quotes', DATES[:1])
+
+        journal.claim('daily_quotes', DATES, 'a')
+        journal.defer('daily_quotes', DATES, 'no_data', 'a')
+        assert self._statuses(journal) == {'20240501': EMPTY}
+        assert journal.finished_dates('daily_quotes') == set()
+        assert journal.next_retry_at() is None
+
+        assert journal.claim('daily_quotes', DATES, 'a') == ['20240501']
+        journal.defer('daily_quotes', DATES, 'no_data', 'a')
+        assert journal.claim('daily_quotes', DATES, 'a') == []
+
+    def test_defer_waits_for_recheck(self, tmp_path):
+        """测试重新检查时间未到时不认领"""
+        journal = self._journal(tmp_path)
+        journal.enqueue('daily_quotes', DATES[:1])
+        journal.claim('daily_quotes', DATES, 'a')
+        journal.defer('daily_quotes', DATES, 'empty_data', 'a')
+
+        assert journal.claim('daily_quotes', DATES, 'b') == []
+
+    def test_retry_filter_by_api(self, tmp_path):
+        """测试只查询指定API的可重试单元和尝试次数"""
+        journal = self._journal(tmp_path, backoff_base=0.0)
+        journal.enqueue('daily_quotes', DATES[:1])
+        journal.enqueue('disabled_api', DATES[1:2])
+        journal.claim('daily_quotes', DATES, 'a')
+        journal.claim('disabled_api', DATES, 'a')
+        journal.fail('daily_quotes', DATES, 'HTTP 500', 'a')
+        journal.fail('disabled_api', DATES, 'HTTP 500', 'a')
+
+        assert journal.retry_dates() == {'20240501', '20240502'}
+        assert journal.retry_dates(apis=['daily_quotes']) == {'20240501'}
+        assert journal.retry_dates(apis=[]) == set()
+        assert journal.next_retry_at(apis=['other']) is None
+        assert journal.attempts() == 2
+        assert journal.attempts('20240502', '20240503', ['daily_quotes']) == 0
+
+    def test_recover_keeps_live_lease(self, tmp_path):
+        """测试租约未过期的执行中单元（可能仍在其他进程中执行）不恢复"""
+        journal = self._journal(tmp_path)
+        journal.enqueue('daily_quotes', DATES)
+        journal.claim('daily_quotes', DATES[:1], 'a')
+
+        assert journal.recover() == 0
+        assert self._statuses(journal)['20240501'] == RUNNING
+
+    def test_recover_and_expired_lease(self, tmp_path):
+        """测试中断后恢复执行中的单元，租约过期的单元可以被其他工作线程认领"""
+        journal = self._journal(tmp_path, lease_seconds=-1)
+        journal.enqueue('daily_quotes', DATES)
+        journal.claim('daily_quotes', DATES[:1], 'a')
+
+        assert journal.claim('daily_quotes', DATES[:1], 'b') == DATES[:1]
+        assert journal.recover() == 1
+        assert self._statuses(journal)['20240501'] == PENDING
+
+    def test_persists_across_reopen(self, tmp_path):
+        """测试重新打开后状态保留"""
+        journal = self._journal(tmp_path)
+        journal.enqueue('daily_quotes', DATES)
+        journal.claim('daily_quotes', DATES[:1], 'a')
+        journal.complete('daily_quotes', '20240501', 1, 1, 'x')
+        journal.close()
+
+        self.journal = journal = JobJournal(tmp_path / '_journal.sqlite')
+        assert journal.summary() == {DONE: 1, PENDING: 2}
+
+
+class TestRetryJournalUnits:
+    def setup_method(self):
+        self.logger = logging.getLogger('test_retry_journal_units')
+
+    def _failed_journal(self, tmp_path, api):
+        journal = JobJournal(tmp_path / '_journal.sqlite', backoff_base=0.0)
+        journal.enqueue(api, DATES[:1])
+        journal.claim(api, DATES, 'a')
+        journal.fail(api, DATES, 'HTTP 500', 'a')
+        return journal
+
+    def test_ignores_units_of_other_apis(self, tmp_path):
+        """测试不等待已停用或计划等级不足的API的失败单元"""
+        journal = self._failed_journal(tmp_path, 'disabled_api')
+
+        with patch.object(persist_date_range, 'run_chunks') as mock_run:
+            persist_date_range.retry_journal_units(journal, [(DATES[0], DATES[-1])], {}, 1, self.logger,
+                                                   ['daily_quotes'])
+
+        mock_run.assert_not_called()
+        journal.close()
+
+    def test_stops_when_nothing_claimed(self, tmp_path):
+        """测试一轮重试没有认领到单元时停止，不会无限循环"""
+        journal = self._failed_journal(tmp_path, 'daily_quotes')
+
+        with patch.object(persist_date_range, 'run_chunks') as mock_run:
+            persist_date_range.retry_journal_units(journal, [(DATES[0], DATES[-1])], {}, 1, self.logger,
+                                                   ['daily_quotes'])
+
+        assert mock_run.call_count == 1
+        journal.close()
+
+    def test_retries_until_done(self, tmp_path):
+        """测试重试的单元再次失败时继续重试，完成后停止"""
+        journal = self._failed_journal(tmp_path, 'daily_quotes')
+        outcomes = ['fail', 'done']
+
+        def run_chunks(chunks, config, max_workers, logger):
+            journal.claim('daily_quotes', DATES, 'b')
+            if outcomes.pop(0) == 'fail':
+                journal.fail('daily_quotes', DATES, 'HTTP 500', 'b')
+            else:
+                journal.complete('daily_quotes', DATES[0], 1, 1, 'x')
+            return 1, []
+
+        with patch.object(persist_date_range, 'run_chunks', side_effect=run_chunks) as mock_run:
+            persist_date_range.retry_journal_units(journal, [(DATES[0], DATES[-1])], {}, 1, self.logger,
+                                                   ['daily_quotes'])
+
+        assert mock_run.call_count == 2
+        assert journal.summary() == {DONE: 1}
+        journal.close()
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from jquantsapi.panel import PricePanel
+
+
+def _quotes(dates, codes, start=0.0):
+    rows = []
+    v = start
+    for date in dates:
+        for code in codes:
+            v += 1.0
+            rows.append({"Date": pd.Timestamp(date), "Code": code, "Close": v})
+    return pd.DataFrame(rows)
+
+
+def test_build_and_append(tmp_path):
+    path = tmp_path / "panel"
+    df = _quotes(["2022-01-04", "2022-01-05"], ["72030", "13010"])
+    panel = PricePanel.build(path, df, fields=["Close", "Volume"], code_capacity=2)
+    assert panel.fields == ["Close"]
+    assert panel.codes.tolist() == ["72030", "13010"]
+    np.testing.assert_array_equal(panel["Close"], [[1.0, 2.0], [3.0, 4.0]])
+
+    # 新しい銘柄が上限を超える場合はファイルを拡張する
+    panel.append(_quotes(["2022-01-06"], ["13010", "99990"], start=10.0))
+    assert panel.code_capacity >= 3
+    assert panel.codes.tolist() == ["72030", "13010", "99990"]
+    assert panel.dates.tolist() == list(
+        pd.to_datetime(["2022-01-04", "2022-01-05", "2022-01-06"])
+    )
+    reader = PricePanel(path)
+    close = reader["Close"]
+    assert isinstance(close.base, np.memmap) or isinstance(close, np.memmap)
+    np.testing.assert_array_equal(
+        close,
+        [[1.0, 2.0, np.nan], [3.0, 4.0, np.nan], [np.nan, 11.0, 12.0]],
+    )
+    assert reader.to_frame("Close").loc["2022-01-06", "99990"] == 12.0
+    assert close[reader.date_loc("2022-01-05"), reader.code_loc("13010")] == 4.0
+
+    # 既存の行は書き換えずに末尾へ追記する
+    panel.append(_quotes(["2022-01-07"], ["72030"], start=20.0))
+    assert PricePanel(path)["Close"].shape == (4, 3)
+
+
+def test_append_rejects_old_dates(tmp_path):
+    panel = PricePanel.build(tmp_path, _quotes(["2022-01-04"], ["72030"]))
+    with pytest.raises(ValueError):
+        panel.append(_quotes(["2022-01-04"], ["72030"]))
+    with pytest.raises(ValueError):
+        PricePanel(tmp_path).append(_quotes(["2022-01-05"], ["72030"]))
@@ -0,0 +1,90 @@
+"""
+Parquet写入测试
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+import pyarrow.parquet as pq
+import sys
+import os
+
+# 添加scripts目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from utils.parquet_writer import build_schema, write_parquet
+
+class TestParquetWriter:
+    def setup_method(self):
+        self.data = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-01', '2024-01-01', None]),
+            'Code': ['72030', '67580', None],
+            'Close': [105.0, None, 300.0],
+            'Count': pd.array([1, None, 3], dtype='Int64'),
+            'Detail': [{'a': 1}, None, 'text'],
+        })
+
+    def test_build_schema(self):
+        """测试按dtype和数据集配置构建schema"""
+        schema = build_schema(self.data, 'daily_quotes', {'Close': 'float32'})
+
+        assert schema.field('Date').type == pa.timestamp('ms')
+        assert schema.field('Code').type == pa.string()
+        assert schema.field('Close').type == pa.float32()
+        assert schema.field('Count').type == pa.int64()
+        assert schema.field('Detail').type == pa.string()
+
+    def test_write_parquet_preserves_nulls(self, tmp_path):
+        """测试写入后缺失值仍为null，且不修改原数据"""
+        output_file = tmp_path / '20240101.parquet'
+        original = self.data.copy()
+
+        write_parquet(self.data, output_file, 'daily_quotes', row_group_size=2)
+
+        table = pq.read_table(output_file)
+        assert table.column('Code').null_count == 1
+        assert table.column('Close').null_count == 1
+        assert table.column('Count').to_pylist() == [1, None, 3]
+        assert table.column('Detail').to_pylist() == ["{'a': 1}", None, 'text']
+        assert pq.ParquetFile(output_file).metadata.num_row_groups == 2
+        pd.testing.assert_frame_equal(self.data, original)
+
+    def test_write_parquet_volume_as_nullable_int(self, tmp_path):
+        """测试成交量列（缺失值使其变为float64）保存为可空整数"""
+        output_file = tmp_path / '20240101.parquet'
+        data = pd.DataFrame({'Code': ['72030', '67580'], 'Volume': [1200.0, None]})
+
+        write_parquet(data, output_file, 'daily_quotes')
+
+        column = pq.read_table(output_file).column('Volume')
+        assert column.type == pa.int64()
+        assert column.to_pylist() == [1200, None]
+
+    def test_write_parquet_code_as_string(self, tmp_path):
+        """测试数字类型的代码列保存为字符串"""
+        output_file = tmp_path / 'listed.parquet'
+        data = pd.DataFrame({'Code': [72030, 67580]})
+
+        write_parquet(data, output_file)
+
+        assert pq.read_table(output_file).column('Code').to_pylist() == ['72030', '67580']
+
+    def test_write_parquet_non_integral_volume_as_float(self, tmp_path, caplog):
+        """测试成交量列含有非整数值时该列保存为float64，其他列不受影响"""
+        output_file = tmp_path / '20240101.parquet'
+        data = pd.DataFrame({'Code': ['72030', '67580'], 'Volume': [1.5, None], 'MorningVolume': [100.0, 200.0]})
+
+        schema = write_parquet(data, output_file, 'daily_quotes')
+
+        table = pq.read_table(output_file)
+        assert schema.field('Volume').type == pa.float64()
+        assert table.column('Volume').to_pylist() == [1.5, None]
+        assert table.column('MorningVolume').type == pa.int64()
+        assert 'Volume' in caplog.text
+
+    def test_write_parquet_names_unconvertible_column(self, tmp_path):
+        """测试无法转换的列在错误信息中给出列名"""
+        data = pd.DataFrame({'Close': ['abc', 'def']})
+
+        with pytest.raises(ValueError, match='Close'):
+            write_parquet(data, tmp_path / '20240101.parquet', 'daily_quotes')
@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from jquantsapi import pit
+
+
+def _prices():
+    dates = pd.to_datetime(["2022-05-10", "2022-05-11", "2022-05-12", "2022-05-13"])
+    return pd.DataFrame(
+        {
+            "Date": list(dates) * 2,
+            "Code": ["72030"] * 4 + ["13010"] * 4,
+            "Close": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0],
+        }
+    )
+
+
+def _statements():
+    return pd.DataFrame(
+        {
+            "DisclosedDate": pd.to_datetime(
+                ["2022-05-10", "2022-05-11", "2022-05-11", "2022-05-10"]
+            ),
+            "DisclosedTime": ["15:00:00", "13:00:00", "14:00:00", "11:30:00"],
+            "LocalCode": ["72030", "72030", "72030", "1301"],
+            "DisclosureNumber": ["1", "2", "3", "4"],
+            "TypeOfDocument": ["FY", "FY", "FY", "1Q"],
+            "Profit": ["100", "200", "210", "10"],
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "market_close, exp_7203, exp_1301",
+    (
+        # 15:00 の開示は翌日扱い、同日の訂正は最後の開示を採用する
+        ("15:00:00", [None, "210", "210", "210"], ["10", "10", "10", "10"]),
+        ("15:30:00", ["100", "210", "210", "210"], ["10", "10", "10", "10"]),
+        ("11:00:00", [None, "100", "210", "210"], [None, "10", "10", "10"]),
+    ),
+)
+def test_align_statements(market_close, exp_7203, exp_1301):
+    ret = pit.align_statements(
+        _prices(), _statements(), columns=["Profit"], market_close=market_close
+    )
+    assert ret["Code"].tolist() == ["13010"] * 4 + ["72030"] * 4
+    assert len(ret) == 8
+    got_1301 = ret.loc[ret["Code"] == "13010", "Profit"].tolist()
+    got_7203 = ret.loc[ret["Code"] == "72030", "Profit"].tolist()
+    assert [None if pd.isna(v) else v for v in got_1301] == exp_1301
+    assert [None if pd.isna(v) else v for v in got_7203] == exp_7203
+
+
+def test_normalize_code():
+    ret = pit.normalize_code(pd.Series(["7203", "72030", 1301]))
+    assert ret.tolist() == ["72030", "72030", "13010"]
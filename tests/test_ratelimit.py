@@ -0,0 +1,70 @@
+import multiprocessing
+import time
+from unittest.mock import patch
+
+import pytest
+
+from jquantsapi.ratelimit import HostRateLimiter
+
+
+def test_host_rate_limiter_invalid_rate(tmp_path):
+    with pytest.raises(ValueError):
+        HostRateLimiter(0, path=tmp_path / "bucket")
+
+
+def test_host_rate_limiter_tokens_exceed_burst(tmp_path):
+    limiter = HostRateLimiter(10, burst=3, path=tmp_path / "bucket")
+    with pytest.raises(ValueError):
+        limiter.acquire(4)
+    limiter.acquire(3)
+    limiter.close()
+
+
+def test_host_rate_limiter_burst_then_wait(tmp_path):
+    limiter = HostRateLimiter(10, burst=3, path=tmp_path / "bucket")
+    with patch("jquantsapi.ratelimit.time.time", return_value=1000.0):
+        for _ in range(3):
+            assert limiter._take(1) == 0
+        assert limiter._take(1) == pytest.approx(0.1)
+    with patch("jquantsapi.ratelimit.time.time", return_value=1000.2):
+        # 0.2 秒で 2 トークン補充される
+        assert limiter._take(1) == 0
+        assert limiter._take(1) == 0
+        assert limiter._take(1) > 0
+    limiter.close()
+
+
+def test_host_rate_limiter_shares_state_file(tmp_path):
+    """
+    同じファイルを指定した別インスタンス (別プロセス相当) とバケットを共有する事を確認する。
+    """
+    a = HostRateLimiter(1, burst=2, path=tmp_path / "bucket")
+    b = HostRateLimiter(1, burst=2, path=tmp_path / "bucket")
+    with patch("jquantsapi.ratelimit.time.time", return_value=1000.0):
+        assert a._take(1) == 0
+        assert b._take(1) == 0
+        assert a._take(1) > 0
+        assert b._take(1) > 0
+    a.close()
+    b.close()
+
+
+def _acquire_many(path, n):
+    limiter = HostRateLimiter(20, burst=1, path=path)
+    for _ in range(n):
+        limiter.acquire()
+    limiter.close()
+
+
+def test_host_rate_limiter_across_processes(tmp_path):
+    path = tmp_path / "bucket"
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_acquire_many, args=(path, 4)) for _ in range(3)]
+    start = time.monotonic()
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=30)
+        assert p.exitcode == 0
+    # 12 リクエストを 20 req/s (burst 1) で処理すると 11 / 20 秒以上かかる
+    assert time.monotonic() - start >= 11 / 20
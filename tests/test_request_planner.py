@@ -0,0 +1,121 @@
+"""
+请求规划测试
+"""
+
+import pytest
+import pandas as pd
+import sys
+import os
+
+# 添加scripts目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from utils.dataset_layout import compact_api
+from utils.job_journal import JobJournal
+from utils.parquet_writer import write_parquet
+from utils.request_planner import (
+    RequestPlanner, format_duration, format_plan, load_request_history, plan_allows,
+    record_request_history, record_trading_calendar
+)
+
+def _config(user_plan='standard'):
+    return {
+        'apis': {
+            'daily_quotes': {'method': 'get_price_range', 'is_range': True, 'output_dir': 'daily_quotes',
+                             'file_pattern': '{date}.parquet', 'plan_required': 'free'},
+            'indices': {'method': 'get_indices', 'is_range': False, 'trading_days_only': True,
+                        'output_dir': 'indices', 'file_pattern': '{date}.parquet', 'plan_required': 'standard'},
+            'listed_info': {'method': 'get_listed_info', 'is_range': False, 'output_dir': 'listed_info',
+                            'file_pattern': '{date}.parquet', 'plan_required': 'free'},
+            'breakdown': {'method': 'get_breakdown_range', 'is_range': True, 'output_dir': 'breakdown',
+                          'file_pattern': '{date}.parquet', 'plan_required': 'premium'},
+            'sectors_17': {'method': 'get_17_sectors', 'is_static': True, 'output_dir': 'static',
+                           'file_pattern': 'sectors_17.parquet'},
+            'disabled': {'enabled': False, 'method': 'get_indices', 'output_dir': 'disabled',
+                         'file_pattern': '{date}.parquet'},
+        },
+        'global': {'user_plan': user_plan},
+    }
+
+
+class TestRequestPlanner:
+    def _write(self, tmp_path, api, date):
+        api_dir = tmp_path / api
+        api_dir.mkdir(exist_ok=True)
+        write_parquet(pd.DataFrame({'Date': [pd.Timestamp(date)], 'Close': [1.0]}), api_dir / f'{date}.parquet')
+
+    def test_plan_allows(self):
+        """测试计划等级比较"""
+        assert plan_allows('free', 'light')
+        assert plan_allows('standard', 'standard')
+        assert not plan_allows('premium', 'standard')
+        assert plan_allows(None, 'free')
+
+    def test_plan_without_history(self, tmp_path):
+        """测试没有历史记录时按每次调用1页、交易日历按工作日估算"""
+        # 20240503(金) - 20240509(木)，周末2天
+        plan = RequestPlanner(_config(), str(tmp_path)).plan([('20240503', '20240509')], rate_limit=2.0)
+
+        apis = plan['apis']
+        assert 'disabled' not in apis
+        assert apis['daily_quotes']['requests'] == 7
+        assert apis['indices']['requests'] == 5
+        assert apis['indices']['non_trading_days'] == 2
+        assert apis['listed_info']['requests'] == 7
+        assert apis['sectors_17']['requests'] == 0
+        assert not apis['breakdown']['allowed']
+        assert plan['calendar'] == {'requests': 1, 'seconds': 1.0, 'cached_days': 0, 'estimated_days': 7}
+        # premium的API不计入合计
+        assert plan['total_requests'] == 7 + 5 + 7 + 1
+        assert plan['wall_seconds'] == pytest.approx(20 / 2.0)
+
+    def test_plan_uses_disk_calendar_and_history(self, tmp_path):
+        """测试已有文件（包括合并后的月文件）、缓存的交易日历和历史分页数"""
+        for date in ['20240501', '20240502']:
+            self._write(tmp_path, 'daily_quotes', date)
+            self._write(tmp_path, 'listed_info', date)
+        compact_api(tmp_path / 'listed_info', 'listed_info')
+        # 20240503是祝日
+        record_trading_calendar(tmp_path, {'20240502': True, '20240503': False})
+        record_request_history(tmp_path, {'/prices/daily_quotes': {'calls': 2, 'pages': 5, 'seconds': 2.5}})
+        record_request_history(tmp_path, {'/prices/daily_quotes': {'calls': 2, 'pages': 3, 'seconds': 1.5}})
+        assert load_request_history(tmp_path)['/prices/daily_quotes'] == {'calls': 4, 'pages': 8, 'seconds': 4.0}
+
+        plan = RequestPlanner(_config(), str(tmp_path)).plan([('20240501', '20240502'), ('20240503', '20240503')])
+
+        quotes = plan['apis']['daily_quotes']
+        assert quotes['on_disk'] == 2
+        assert quotes['calls'] == 1
+        assert quotes['requests'] == 2
+        assert quotes['history']
+        assert plan['apis']['listed_info']['on_disk'] == 2
+        assert plan['apis']['listed_info']['calls'] == 1
+        indices = plan['apis']['indices']
+        assert indices['calls'] == 2
+        assert indices['non_trading_days'] == 1
+        assert plan['calendar']['cached_days'] == 2
+
+    def test_range_fetches_missing_dates_only(self, tmp_path):
+        """测试range API只获取缺少的日期，作业日志中已完成或已跳过的日期视为已有"""
+        self._write(tmp_path, 'daily_quotes', '20240501')
+        journal = JobJournal(tmp_path / '_journal.sqlite')
+        journal.enqueue('daily_quotes', ['20240502', '20240503'])
+        journal.claim('daily_quotes', ['20240502'], 'worker')
+        journal.skip('daily_quotes', ['20240502'], 'no_data', 'worker')
+
+        assert RequestPlanner(_config(), str(tmp_path)).plan(
+            [('20240501', '20240503')])['apis']['daily_quotes']['calls'] == 2
+        assert RequestPlanner(_config(), str(tmp_path), journal).plan(
+            [('20240501', '20240503')])['apis']['daily_quotes']['calls'] == 1
+        journal.close()
+
+    def test_format_plan(self, tmp_path):
+        """测试输出包含每个API的请求数和预计耗时"""
+        plan = RequestPlanner(_config('premium'), str(tmp_path)).plan([('20240501', '20240507')], rate_limit=1.0)
+
+        lines = format_plan(plan)
+
+        assert any(line.startswith('breakdown') for line in lines)
+        assert lines[-1].startswith(f"合计: {plan['total_requests']} 次请求")
+        assert format_duration(30) == '30秒'
+        assert format_duration(90061) == '1天1小时1分'
@@ -0,0 +1,123 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError
+
+from jquantsapi.resilience import (
+    BudgetedRetry,
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    RetryBudget,
+    is_transient_error,
+    jittered_backoff,
+)
+
+
+def test_jittered_backoff():
+    for attempt in range(5):
+        wait = jittered_backoff(attempt, 1.0, cap=10.0)
+        assert 0 <= wait <= min(10.0, 2**attempt)
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    (
+        (requests.exceptions.ConnectionError(), True),
+        (requests.exceptions.ReadTimeout(), True),
+        (requests.exceptions.HTTPError(response=MagicMock(status_code=429)), True),
+        (requests.exceptions.HTTPError(response=MagicMock(status_code=503)), True),
+        (requests.exceptions.HTTPError(response=MagicMock(status_code=400)), False),
+        (requests.exceptions.HTTPError(response=MagicMock(status_code=403)), False),
+        (CircuitOpenError(), False),
+        (ValueError(), False),
+    ),
+)
+def test_is_transient_error(error, expected):
+    assert is_transient_error(error) == expected
+
+
+def test_retry_budget():
+    budget = RetryBudget(ratio=0.5, max_tokens=2)
+    assert budget.withdraw()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert budget.withdraw()
+    for _ in range(10):
+        budget.deposit()
+    assert budget.tokens == 2
+
+
+def test_circuit_breaker():
+    breaker = CircuitBreaker(
+        "/prices/daily_quotes", failure_threshold=2, reset_timeout=0.05
+    )
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # half-open では1件だけ試行を許可する
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_circuit_breaker_release():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+
+
+def test_circuit_breaker_success_resets_failures():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_circuit_breaker_registry():
+    registry = CircuitBreakerRegistry(failure_threshold=1)
+    assert registry.get("/a") is registry.get("/a")
+    registry.get("/a").record_failure()
+    assert registry.states() == {"/a": CircuitBreaker.OPEN}
+    registry.get("/b").before_call()
+
+
+def test_budgeted_retry():
+    budget = RetryBudget(max_tokens=1)
+    retry = BudgetedRetry(total=3, budget=budget)
+    retry = retry.increment(method="GET", url="/a", error=ConnectionError())
+    assert retry.budget is budget
+    with pytest.raises(MaxRetryError):
+        retry.increment(method="GET", url="/a", error=ConnectionError())
+
+
+def test_budgeted_retry_backoff_jitter():
+    retry = BudgetedRetry(total=5, backoff_factor=1.0)
+    for _ in range(3):
+        retry = retry.increment(method="GET", url="/a", response=MagicMock(status=503))
+    assert 0 <= retry.get_backoff_time() <= 4
@@ -0,0 +1,87 @@
+"""
+任务图调度测试
+"""
+
+import threading
+import time
+import pytest
+import sys
+import os
+
+# 添加scripts目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from utils.scheduler import FAILED, SKIPPED, SUCCESS, SkipTask, TaskGraph
+
+class TestTaskGraph:
+    def test_dependencies_receive_results(self):
+        """测试依赖的返回值按顺序传给下游任务"""
+        graph = TaskGraph()
+        graph.add('a', lambda: 1)
+        graph.add('b', lambda: 2)
+        graph.add('sum', lambda a, b: a + b, ['a', 'b'], pool='process')
+
+        tasks = graph.run({'default': 2, 'process': 1})
+
+        assert tasks['sum'].status == SUCCESS
+        assert tasks['sum'].result == 3
+        # 下游已取用的结果被释放
+        assert tasks['a'].result is None
+
+    def test_failure_and_skip_propagate(self):
+        """测试依赖失败或跳过时下游任务跳过"""
+        def fail():
+            raise RuntimeError('boom')
+
+        def skip():
+            raise SkipTask('file_exists')
+
+        called = []
+        graph = TaskGraph()
+        graph.add('fail', fail)
+        graph.add('skip', skip)
+        graph.add('after_fail', lambda _: called.append('after_fail'), ['fail'])
+        graph.add('after_skip', lambda _: called.append('after_skip'), ['skip'])
+        graph.add('last', lambda _: called.append('last'), ['after_skip'])
+
+        tasks = graph.run({})
+
+        assert called == []
+        assert tasks['fail'].status == FAILED
+        assert tasks['fail'].error == 'boom'
+        assert tasks['after_fail'].status == SKIPPED
+        assert tasks['after_fail'].error == '依赖任务失败: fail'
+        assert tasks['last'].status == SKIPPED
+        assert tasks['last'].error == 'file_exists'
+
+    def test_runs_concurrently_within_pool_size(self):
+        """测试同一线程池中的任务并发执行，且不超过线程数"""
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def work():
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.05)
+            with lock:
+                state['running'] -= 1
+
+        graph = TaskGraph()
+        for i in range(8):
+            graph.add(f"fetch:{i}", work, pool='fetch')
+
+        start = time.monotonic()
+        graph.run({'fetch': 4})
+
+        assert state['peak'] == 4
+        assert time.monotonic() - start < 0.05 * 8
+
+    def test_invalid_graph(self):
+        """测试重复任务和不存在的依赖"""
+        graph = TaskGraph()
+        graph.add('a', lambda: None)
+        with pytest.raises(ValueError):
+            graph.add('a', lambda: None)
+        with pytest.raises(ValueError):
+            graph.add('b', lambda _: None, ['missing'])
@@ -0,0 +1,82 @@
+"""
+搜索索引测试
+"""
+
+import pandas as pd
+import sys
+import os
+from unittest.mock import patch
+
+# 添加scripts目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from utils.parquet_writer import write_parquet
+from utils.search_index import SearchIndex, index_path, load_or_build_index, read_rows, write_index
+
+class TestSearchIndex:
+    def setup_method(self):
+        self.data = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-05-01'] * 4),
+            'Code': ['72030', '67580', '13010', None],
+            'CompanyName': ['トヨタ自動車', 'ソニーグループ', '極洋', None],
+            'CompanyNameEnglish': ['TOYOTA MOTOR CORPORATION', 'Sony Group Corporation', 'KYOKUYO CO.,LTD.', None],
+        })
+
+    def test_lookup_exact_code(self):
+        """测试代码精确匹配（4位代码匹配5位代码）"""
+        index = SearchIndex.build(self.data)
+
+        assert index.lookup('7203').tolist() == [0]
+        assert index.lookup('67580', ['Code']).tolist() == [1]
+        assert index.lookup('720', ['Code']).tolist() == []
+
+    def test_contains_partial_code(self):
+        """测试在不同的代码中部分匹配"""
+        index = SearchIndex.build(self.data)
+
+        assert index.contains('720').tolist() == [0]
+        assert index.contains('0').tolist() == [0, 1, 2]
+        assert index.contains('720', ['CompanyName']).tolist() == []
+
+    def test_lookup_text(self):
+        """测试公司名部分匹配（不区分大小写）"""
+        index = SearchIndex.build(self.data)
+
+        assert index.lookup('トヨタ').tolist() == [0]
+        assert index.lookup('corporation', ['CompanyNameEnglish']).tolist() == [0, 1]
+        assert index.lookup('極').tolist() == [2]
+        assert index.lookup('グループ自動車').tolist() == []
+
+    def test_save_and_load(self, tmp_path):
+        """测试索引保存为附属文件，文件内容变化后重新建立"""
+        file_path = tmp_path / '20240501.parquet'
+        write_parquet(self.data, file_path)
+        write_index(self.data, file_path)
+        assert index_path(file_path).exists()
+
+        index = load_or_build_index(file_path)
+        assert index.lookup('ソニー').tolist() == [1]
+
+        write_parquet(self.data.iloc[::-1].reset_index(drop=True), file_path)
+        os.utime(file_path, ns=(0, 0))
+        index = load_or_build_index(file_path)
+        assert index.lookup('ソニー').tolist() == [2]
+
+    def test_load_does_not_hash_unchanged_file(self, tmp_path):
+        """测试文件大小和修改时间未变化时不读取文件计算哈希"""
+        file_path = tmp_path / '20240501.parquet'
+        write_parquet(self.data, file_path)
+        write_index(self.data, file_path)
+
+        with patch('utils.dataset_layout.content_hash', side_effect=AssertionError):
+            assert load_or_build_index(file_path).lookup('ソニー').tolist() == [1]
+
+    def test_read_rows(self, tmp_path):
+        """测试只读取包含指定行的row group"""
+        file_path = tmp_path / '20240501.parquet'
+        write_parquet(self.data, file_path, row_group_size=1)
+
+        df = read_rows(file_path, SearchIndex.build(self.data).lookup('Corporation'))
+
+        assert df['Code'].tolist() == ['72030', '67580']
+        assert read_rows(file_path, SearchIndex.build(self.data).lookup('none')).empty
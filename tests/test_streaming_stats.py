@@ -0,0 +1,128 @@
+"""
+流式摘要统计测试
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import sys
+import os
+
+# 添加scripts目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from utils.parquet_writer import write_parquet
+from utils.streaming_stats import (
+    KMV_SIZE, CategoricalStats, DatasetStats, NumericStats, compute_file_stats, file_stats, stats_path
+)
+
+class TestStreamingStats:
+    def setup_method(self):
+        self.data = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-05-01'] * 5 + ['2024-05-02'] * 5),
+            'Code': ['72030', '13010', '72030', None, '67580'] * 2,
+            'Close': [1.0, 2.0, 3.0, None, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0],
+        })
+
+    def test_numeric_merge_matches_pandas(self):
+        """测试分块合并的均值和标准差与pandas一致"""
+        values = np.random.default_rng(0).normal(100, 15, 1000)
+        stats = NumericStats()
+        for chunk in np.array_split(values, 7):
+            stats.update(chunk)
+
+        assert stats.count == 1000
+        assert stats.mean == pytest.approx(values.mean())
+        assert stats.std == pytest.approx(pd.Series(values).std())
+        assert stats.min == values.min()
+        assert stats.max == values.max()
+
+    def test_categorical_unique_count(self):
+        """测试唯一值数：少量值精确，大量值为近似"""
+        stats = CategoricalStats()
+        stats.merge(CategoricalStats(hashes=list(range(1, 11))))
+        assert stats.unique_count == 10
+        assert not stats.approximate
+
+        stats = CategoricalStats()
+        for start in range(0, 20000, 5000):
+            stats.update(pa.chunked_array([[str(i) for i in range(start, start + 5000)]]))
+        assert stats.approximate
+        assert len(stats.hashes) == KMV_SIZE
+        assert stats.unique_count == pytest.approx(20000, rel=0.1)
+
+    def test_categorical_top_values_space_saving(self, monkeypatch):
+        """测试淘汰后再次出现的值不丢失之前的计数（计数为上限，计数 - 误差为下限）"""
+        monkeypatch.setattr('utils.streaming_stats.TOP_K_CAPACITY', 2)
+        row_groups = [['a', 'a', 'b', 'c'], ['c', 'c', 'c'], ['b', 'a']]
+        stats = CategoricalStats()
+        for values in row_groups:
+            stats.update(pa.chunked_array([values]))
+
+        actual = pd.Series([v for values in row_groups for v in values]).value_counts()
+        assert stats.top_values(1) == {'c': 4}
+        assert stats.top_values_approximate
+        for value, count in stats.counters.items():
+            assert count - stats.errors[value] <= actual[value] <= count
+
+        restored = CategoricalStats(**stats.to_dict())
+        assert restored.top_values() == stats.top_values()
+        assert restored.floor == stats.floor
+
+    def test_compute_file_stats(self, tmp_path):
+        """测试逐个row group统计文件"""
+        file_path = tmp_path / '202405.parquet'
+        write_parquet(self.data, file_path, row_group_size=3)
+
+        summary = compute_file_stats(file_path).summary()
+
+        assert summary['total_rows'] == 10
+        assert summary['total_columns'] == 3
+        close = summary['numeric_columns']['Close']
+        assert close['mean'] == pytest.approx(self.data['Close'].mean())
+        assert close['std'] == pytest.approx(self.data['Close'].std())
+        assert close['null_count'] == 1
+        code = summary['categorical_columns']['Code']
+        assert code['unique_count'] == 3
+        assert code['null_count'] == 2
+        assert code['top_values']['72030'] == 4
+        assert not code['top_values_approximate']
+
+    def test_compute_file_stats_with_filter(self, tmp_path):
+        """测试只统计满足条件的行"""
+        file_path = tmp_path / '202405.parquet'
+        write_parquet(self.data, file_path, row_group_size=3)
+
+        row_filter = ds.field('Date') >= pd.Timestamp('2024-05-02')
+        summary = compute_file_stats(file_path, row_filter).summary()
+
+        assert summary['total_rows'] == 5
+        assert summary['numeric_columns']['Close']['mean'] == 8.0
+
+    def test_file_stats_cache(self, tmp_path):
+        """测试统计结果按内容哈希缓存，文件变化后重新计算"""
+        file_path = tmp_path / '20240501.parquet'
+        write_parquet(self.data, file_path)
+
+        first = file_stats(file_path)
+        assert stats_path(file_path).exists()
+        cached = file_stats(file_path)
+        assert cached.summary() == first.summary()
+
+        write_parquet(self.data.head(4), file_path)
+        os.utime(file_path, ns=(0, 0))
+        assert file_stats(file_path).rows == 4
+
+    def test_dict_round_trip(self, tmp_path):
+        """测试统计量序列化后可以继续合并"""
+        file_path = tmp_path / '20240501.parquet'
+        write_parquet(self.data, file_path)
+        stats = compute_file_stats(file_path)
+
+        restored = DatasetStats.from_dict(stats.to_dict())
+        restored.merge(stats)
+
+        assert restored.rows == 20
+        assert restored.numeric['Close'].mean == pytest.approx(self.data['Close'].mean())
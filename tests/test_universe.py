@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+from jquantsapi.universe import ListedUniverse
+
+
+def _snapshot(date, rows):
+    return pd.DataFrame(
+        [
+            {
+                "Date": pd.Timestamp(date),
+                "Code": code,
+                "CompanyName": name,
+                "CompanyNameEnglish": name,
+                "Sector17Code": "1",
+                "Sector33Code": "0050",
+                "ScaleCategory": "-",
+                "MarketCode": market,
+            }
+            for code, name, market in rows
+        ]
+    )
+
+
+def _universe():
+    return ListedUniverse.from_snapshots(
+        [
+            _snapshot("2022-04-01", [("13010", "A", "0101"), ("72030", "T", "0101")]),
+            _snapshot("2022-04-04", [("13010", "A", "0111"), ("72030", "T", "0111")]),
+            _snapshot("2022-04-05", [("13010", "A", "0111"), ("72030", "T", "0111")]),
+            _snapshot("2022-04-06", [("72030", "T", "0111"), ("99990", "N", "0113")]),
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "date, exp_codes, exp_markets",
+    (
+        ("2022-03-31", [], []),
+        ("2022-04-01", ["13010", "72030"], ["0101", "0101"]),
+        ("2022-04-03", ["13010", "72030"], ["0101", "0101"]),
+        ("2022-04-05", ["13010", "72030"], ["0111", "0111"]),
+        ("2022-04-06", ["72030", "99990"], ["0111", "0113"]),
+        ("2030-01-01", ["72030", "99990"], ["0111", "0113"]),
+    ),
+)
+def test_as_of(date, exp_codes, exp_markets):
+    ret = _universe().as_of(date)
+    assert ret["Code"].tolist() == exp_codes
+    assert ret["MarketCode"].tolist() == exp_markets
+
+
+def test_history():
+    universe = _universe()
+    # 変化のないスナップショットでは区間を増やさない
+    assert len(universe.intervals) == 5
+
+    ret = universe.history("13010")
+    assert ret["MarketCode"].tolist() == ["0101", "0111"]
+    assert ret["StartDate"].tolist() == [
+        pd.Timestamp("2022-04-01"),
+        pd.Timestamp("2022-04-04"),
+    ]
+    assert ret["EndDate"].tolist() == [
+        pd.Timestamp("2022-04-04"),
+        pd.Timestamp("2022-04-06"),
+    ]
+    assert pd.isna(universe.history("72030")["EndDate"].iloc[-1])
+    assert len(universe.history("00000")) == 0
+
+
+def test_add_snapshot_rejects_old_date():
+    universe = _universe()
+    with pytest.raises(ValueError):
+        universe.add_snapshot(_snapshot("2022-04-05", [("72030", "T", "0111")]))
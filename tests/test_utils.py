@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from jquantsapi import utils
+
+
+@pytest.mark.parametrize(
+    "data, columns, errors, exp",
+    (
+        (
+            {"A": ["2022-01-01", "2022-01-01"], "B": ["2022-03-31", "2022-01-01"]},
+            ["A", "B"],
+            "raise",
+            {
+                "A": ["2022-01-01", "2022-01-01"],
+                "B": ["2022-03-31", "2022-01-01"],
+            },
+        ),
+        (
+            {"A": ["2022-01-01", "", "-", None]},
+            ["A"],
+            "raise",
+            {"A": ["2022-01-01", None, None, None]},
+        ),
+        (
+            {"A": ["2022-01-01", "invalid"]},
+            ["A"],
+            "coerce",
+            {"A": ["2022-01-01", None]},
+        ),
+        (
+            {"A": ["2022-01-01"]},
+            ["A", "NotExists"],
+            "raise",
+            {"A": ["2022-01-01"]},
+        ),
+    ),
+)
+def test_to_datetime_columns(data, columns, errors, exp):
+    df = pd.DataFrame(data)
+    ret = utils.to_datetime_columns(df, columns, errors=errors)
+    for col, values in exp.items():
+        assert pd.api.types.is_datetime64_any_dtype(ret[col])
+        pd.testing.assert_series_equal(
+            ret[col],
+            pd.Series(pd.to_datetime(values), name=col),
+            check_dtype=False,
+        )
+    assert "NotExists" not in ret.columns
+
+
+def test_to_datetime_columns_raise():
+    df = pd.DataFrame({"A": ["2022-01-01", "invalid"]})
+    with pytest.raises(ValueError):
+        utils.to_datetime_columns(df, ["A"])
+
+
+def test_to_datetime_columns_keeps_datetime_and_other_columns():
+    df = pd.DataFrame(
+        {
+            "A": pd.to_datetime(["2022-01-01"]),
+            "B": ["2022-01-02"],
+            "C": ["x"],
+        }
+    )
+    ret = utils.to_datetime_columns(df, ["A", "B"])
+    assert ret["A"].iloc[0] == pd.Timestamp("2022-01-01")
+    assert ret["B"].iloc[0] == pd.Timestamp("2022-01-02")
+    assert ret["C"].iloc[0] == "x"
+    assert ret["A"].dtype == np.dtype("datetime64[ns]")